@@ -144,6 +144,75 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Sessions: process-local LRU in front of django_session (write-through)
+SESSION_ENGINE = 'GMSApp.modules.cachedsession'
+SESSION_LOCAL_CACHE_SIZE = 10000
+SESSION_LOCAL_CACHE_TTL = 60  # seconds before a cached session is re-read
+SESSION_ACTIVITY_WRITE_INTERVAL = 60  # seconds between last_activity writes
+
+
+# Audit log: records are queued and bulk-inserted by a background thread
+AUDIT_LOG_ASYNC = True
+AUDIT_LOG_BATCH_SIZE = 100  # flush every N records ...
+AUDIT_LOG_FLUSH_INTERVAL_MS = 500  # ... or every M milliseconds
+AUDIT_LOG_QUEUE_SIZE = 10000  # records beyond this are dropped and counted
+AUDIT_LOG_RETENTION_DAYS = 180  # archive_auditlog moves older rows to monthly tables
+
+
+# Role ACLs are compiled once per role and version; other processes notice a
+# version bump within this many seconds
+ACL_VERSION_CHECK_INTERVAL = 30
+
+
+# Bulk uploads are queued in background_job and processed by `manage.py run_jobs`
+JOB_POLL_INTERVAL = 2  # seconds between polls of an empty queue
+JOB_STALE_AFTER = 600  # a running job without progress for this long is marked failed
+
+
+# Seconds a cached garage detail document is served before it is rebuilt. Signals delete
+# changed documents; with the default per-process cache other processes rely on this timeout
+GARAGE_DETAIL_CACHE_TIMEOUT = 300
+
+# Rendered brand, model, city and accessory catalog responses kept per process (LRU entries)
+CATALOG_CACHE_SIZE = 512
+
+# Delta sync of the customer app catalog (/api/sync/). Tombstones of deleted rows are kept
+# this many days (`manage.py prune_sync_tombstones`); older tokens get a full sync
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+SYNC_TOKEN_OVERLAP = 60  # seconds each sync re-reads before its token, for late commits
+
+
+# Outbound SMS and WhatsApp messages are queued in outbound_message and delivered by
+# `manage.py run_outbox`; `manage.py requeue_outbox` retries failed (dead letter) ones
+OUTBOX_POLL_INTERVAL = 1  # seconds between polls when no message is due
+OUTBOX_BATCH_SIZE = 20
+OUTBOX_SENDER_THREADS = 4  # messages sent in parallel per worker
+OUTBOX_MAX_ATTEMPTS = 5  # retried with backoff doubling from OUTBOX_RETRY_BASE_DELAY up to OUTBOX_RETRY_MAX_DELAY
+OUTBOX_RETRY_BASE_DELAY = 2
+OUTBOX_RETRY_MAX_DELAY = 60
+OUTBOX_STALE_AFTER = 120  # a message claimed this long ago by a worker that stopped is sent again
+OUTBOX_RECIPIENT_RATE_LIMITS = {'sms': (3, 600)}  # channel: (messages, seconds) per recipient and worker
+OUTBOX_CHANNEL_RATES = {'sms': 20, 'whatsapp': 10}  # channel: messages per second per worker
+
+
+# Files of rows removed by the multi-select delete endpoints are queued in
+# pending_file_deletion and removed by `manage.py sweep_deleted_files`
+FILE_SWEEP_INTERVAL = 30  # seconds between sweeps of an empty queue
+FILE_SWEEP_BATCH_SIZE = 200
+FILE_SWEEP_MAX_ATTEMPTS = 5  # a file that cannot be removed is dropped after this many sweeps
+
+
+# MongoDB: one pooled client per process (GMSApp/modules/mongodbconnection.py);
+# `manage.py mongo_health` pings it and prints the pool counters
+MONGO_URI = os.getenv('MONGO_URI')
+MONGO_DB_NAME = os.getenv('MONGO_DB_NAME')
+MONGO_MAX_POOL_SIZE = 50  # connections per process
+MONGO_WAIT_QUEUE_TIMEOUT_MS = 2000  # longest wait for a free pooled connection
+MONGO_SERVER_SELECTION_TIMEOUT_MS = 5000  # longest wait for a reachable server
+MONGO_CONNECT_TIMEOUT_MS = 5000
+MONGO_SOCKET_TIMEOUT_MS = 20000
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -228,4 +297,16 @@ EMAIL_HOST_PASSWORD =  'hspi sezp mmvm yiew'
 load_dotenv(os.path.join(BASE_DIR, 'GMS/twilio_config.env'))
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
-TWILIO_WHATSAPP_FROM = 'whatsapp:+919112025454'
\ No newline at end of file
+TWILIO_WHATSAPP_FROM = 'whatsapp:+919112025454'
+WHATSAPP_PROVIDER = 'GMSApp.modules.messaging.whatsapp.TwilioProvider'  # or ...whatsapp.FakeProvider
+WHATSAPP_TIMEOUT = 10  # seconds
+WHATSAPP_JOBCARD_MESSAGES = False  # job card messages are skipped until the number is verified
+WHATSAPP_JOBCARD_TO = 'whatsapp:+919470918684'
+
+# SMS gateway (PVY Infotech). `manage.py sms_stub_gateway` runs a local stand-in
+SMS_GATEWAY_URL = os.getenv('SMS_GATEWAY_URL', 'http://msg.pvyinfotech.com/rest/services/sendSMS/sendGroupSms')
+SMS_AUTH_KEY = os.getenv('SMS_AUTH_KEY', '8f461d3fef716d11e81141753a55eda')
+SMS_SENDER_ID = 'PVYINF'
+SMS_CONNECT_TIMEOUT = 3  # seconds
+SMS_READ_TIMEOUT = 10
+SMS_POOL_SIZE = 10  # kept-alive connections to the gateway per process
\ No newline at end of file
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GMSAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'GMSApp'
+
+    def ready(self):
+        from GMSApp import signals  # noqa: F401
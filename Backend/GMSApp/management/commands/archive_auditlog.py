@@ -0,0 +1,74 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from GMSApp.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = "Move audit log rows older than the retention period into monthly auditlog_archive_YYYYMM tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'AUDIT_LOG_RETENTION_DAYS', 180),
+            help='Archive rows older than this many days',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would move')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = AuditLog.objects.filter(duration__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f'{expired.count()} audit log rows older than {cutoff:%Y-%m-%d} would be archived.')
+            return
+
+        batch_size = options['batch_size']
+        table = AuditLog._meta.db_table
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in AuditLog._meta.concrete_fields)
+        created_tables = set()
+        moved = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                expired.filter(id__gt=last_id).order_by('id').values_list('id', 'duration')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+
+            by_month = defaultdict(list)
+            for row_id, duration in batch:
+                by_month[f'{table}_archive_{duration:%Y%m}'].append(row_id)
+
+            with connection.cursor() as cursor:
+                for archive_table in by_month.keys() - created_tables:
+                    # DDL commits implicitly on MySQL, so create tables outside the move transaction
+                    cursor.execute(
+                        f'CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(archive_table)} '
+                        f'LIKE {connection.ops.quote_name(table)}'
+                    )
+                    created_tables.add(archive_table)
+
+                with transaction.atomic():
+                    for archive_table, ids in by_month.items():
+                        placeholders = ', '.join(['%s'] * len(ids))
+                        cursor.execute(
+                            f'INSERT INTO {connection.ops.quote_name(archive_table)} ({columns}) '
+                            f'SELECT {columns} FROM {connection.ops.quote_name(table)} WHERE id IN ({placeholders})',
+                            ids,
+                        )
+                    AuditLog.objects.filter(id__in=[row_id for row_id, _ in batch]).delete()
+
+            moved += len(batch)
+            self.stdout.write(f'Archived {moved} rows...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} audit log rows older than {cutoff:%Y-%m-%d} into {len(created_tables)} tables.'
+        ))
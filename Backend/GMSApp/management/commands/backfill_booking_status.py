@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from GMSApp.models import BookingTimeline, SubscriberBooking
+
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Set the current status of subscriber bookings from their latest timeline entry and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--garage', type=int, help='Only backfill bookings of this garage id')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **options):
+        bookings = SubscriberBooking.objects.order_by('id')
+        if options['garage']:
+            bookings = bookings.filter(garage_id=options['garage'])
+
+        fields = list(SubscriberBooking.STATUS_FIELDS)
+        checked = drifted = 0
+        last_id = 0
+
+        while True:
+            # The batch stays locked until written, so a status recorded meanwhile waits and then wins
+            with transaction.atomic():
+                batch = list(
+                    bookings.select_for_update().filter(id__gt=last_id)
+                    .values_list('id', 'current_status_id', 'current_status_at')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+
+                # Newest entry of each booking first; ties go to the entry inserted last
+                latest = {}
+                for booking_id, status_id, created_at in (
+                    BookingTimeline.objects.filter(booking_id__in=[row[0] for row in batch])
+                    .order_by('booking_id', '-created_at', '-id')
+                    .values_list('booking_id', 'status_id', 'created_at')
+                ):
+                    latest.setdefault(booking_id, (status_id, created_at))
+
+                changed = []
+                for booking_id, status_id, status_at in batch:
+                    expected = latest.get(booking_id, (None, None))
+                    if (status_id, status_at) != expected:
+                        drifted += 1
+                        if options['verbosity'] > 1:
+                            self.stdout.write(f"Drift booking {booking_id}: status {status_id} -> {expected[0]}")
+                        changed.append(SubscriberBooking(
+                            id=booking_id, current_status_id=expected[0], current_status_at=expected[1]
+                        ))
+                checked += len(batch)
+
+                if changed and not options['dry_run']:
+                    SubscriberBooking.objects.bulk_update(changed, fields)
+
+        action = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} bookings. {action} drift on {drifted}.'))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from GMSApp.models import DocumentSequence, Estimate, Invoice, Jobcard
+
+
+class Command(BaseCommand):
+    help = "Seed document_sequence from the existing invoice, estimate and job card numbers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--garage', type=int, help='Only seed sequences of this garage id')
+        parser.add_argument('--dry-run', action='store_true', help='Report the sequences without writing')
+
+    def handle(self, *args, **options):
+        sources = [
+            (DocumentSequence.INVOICE, Invoice.objects.values_list('garage_id', 'invoiceid'), True),
+            (DocumentSequence.ESTIMATE, Estimate.objects.values_list('garage_id', 'estimateid'), True),
+            (DocumentSequence.JOBCARD, Jobcard.objects.filter(jobcard_number__isnull=False).values_list('garage_id', 'jobcard_number'), False),
+        ]
+
+        highest = {}
+        for document_type, rows, has_period in sources:
+            if options['garage']:
+                rows = rows.filter(garage_id=options['garage'])
+            for garage_id, value in rows.iterator(chunk_size=5000):
+                number = DocumentSequence.parse_number(document_type, value)
+                if number is None:
+                    continue
+                period = value.rsplit('/', 1)[-1] if has_period else ''
+                key = (garage_id, document_type, period)
+                highest[key] = max(highest.get(key, 0), number)
+
+        for (garage_id, document_type, period), number in sorted(highest.items(), key=lambda item: (item[0][0] or 0, item[0][1], item[0][2])):
+            self.stdout.write(f'garage {garage_id} {document_type} {period or "-"}: next {number + 1}')
+            if options['dry_run']:
+                continue
+            with transaction.atomic():
+                sequence = DocumentSequence.objects.filter(garage_id=garage_id, document_type=document_type, period=period)
+                if not sequence.update(next_value=Greatest(F('next_value'), number + 1)):
+                    DocumentSequence.objects.create(
+                        garage_id=garage_id, document_type=document_type, period=period, next_value=number + 1,
+                    )
+
+        action = 'Found' if options['dry_run'] else 'Seeded'
+        self.stdout.write(self.style.SUCCESS(f'{action} {len(highest)} document sequences.'))
@@ -0,0 +1,97 @@
+import os
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from GMSApp.models import Garage, ProductCatalogues, ProductCategories, StockOutwards
+from GMSApp.modules import streamexport
+from GMSApp.modules.inventory.exports import STOCK_OUTWARDS_HEADER, _stock_outward_rows
+
+INSERT_BATCH_SIZE = 10000
+
+
+def rss_kb():
+    """ Current resident set size, or the peak so far where /proc is not available. """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Benchmark: peak RSS and time to first byte of the stock outward export for synthetic row counts. "
+            "The rows are inserted in a transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--garage', type=int, required=True, help='Garage id to attach the synthetic rows to')
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--buffered', action='store_true',
+                            help='Build the whole file in memory first, like the former HttpResponse exports')
+
+    def handle(self, *args, **options):
+        if not Garage.objects.filter(id=options['garage']).exists():
+            raise CommandError(f"Garage {options['garage']} does not exist")
+
+        garage_id = options['garage']
+        try:
+            with transaction.atomic():
+                category = ProductCategories.objects.create(garage_id=garage_id, name='Bench')
+                product = ProductCatalogues.objects.create(
+                    garage_id=garage_id, category=category, name='Bench part', measuring_unit='pcs',
+                )
+                created = 0
+                for size in sorted(options['rows']):
+                    while created < size:
+                        batch = min(INSERT_BATCH_SIZE, size - created)
+                        StockOutwards.objects.bulk_create([
+                            StockOutwards(
+                                garage_id=garage_id, product=product, quantity=1, rate=100, total_price=100,
+                                issued_to=f'Bench customer {created + i}', usage_purpose='Bench',
+                                reference_document=str(created + i), location='Bench', rack='B1',
+                            )
+                            for i in range(batch)
+                        ])
+                        created += batch
+                    self.measure(size, garage_id, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    @staticmethod
+    def buffered(blocks, fmt):
+        yield ''.join(blocks) if fmt == 'csv' else b''.join(blocks)
+
+    def measure(self, size, garage_id, options):
+        rows = _stock_outward_rows(garage_id)
+        if options['format'] == 'xlsx':
+            blocks = streamexport.stream_xlsx(STOCK_OUTWARDS_HEADER, rows)
+        else:
+            blocks = streamexport.stream_csv(STOCK_OUTWARDS_HEADER, rows)
+        if options['buffered']:
+            blocks = self.buffered(blocks, options['format'])
+
+        baseline = peak = rss_kb()
+        started = time.perf_counter()
+        first_byte = None
+        total_bytes = 0
+        for block in blocks:
+            if block and first_byte is None:
+                first_byte = time.perf_counter() - started
+            total_bytes += len(block)
+            peak = max(peak, rss_kb())
+        elapsed = time.perf_counter() - started
+
+        mode = 'buffered' if options['buffered'] else 'streaming'
+        self.stdout.write(
+            f"{size} rows {options['format']} {mode}: first byte {first_byte * 1000:.1f}ms, "
+            f"total {elapsed:.2f}s, {total_bytes / 1048576:.1f} MB, "
+            f"peak RSS +{(peak - baseline) / 1024:.1f} MB over {baseline / 1024:.1f} MB"
+        )
@@ -0,0 +1,61 @@
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from GMSApp.models import Garage, TrackInvoiceUploads
+from GMSApp.modules.transactions import invoiceimport
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark: invoice bulk import throughput in rows/second. Everything is rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--garage', type=int, required=True, help='Garage id to import into')
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--customers', type=int, default=5000, help='Distinct customer phones in the file')
+        parser.add_argument('--chunk-size', type=int, default=invoiceimport.IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if not Garage.objects.filter(id=options['garage']).exists():
+            raise CommandError(f"Garage {options['garage']} does not exist")
+
+        rows, customers = options['rows'], options['customers']
+        date_formats = ['2025-04-{:02d}', '{:02d}-04-2025', '2025/04/{:02d}', '04/{:02d}/2025', '{:02d}.04.2025']
+        df = pd.DataFrame({
+            'invoice_id': [f'BENCH/{i}/25-26' for i in range(rows)],
+            'invoice_date': [date_formats[i % 5].format(i % 28 + 1) for i in range(rows)],
+            'customer_phone': [f'9{i % customers:09d}' for i in range(rows)],
+            'customer_name': [f'Customer {i % customers}' for i in range(rows)],
+            'vehicle_model': [f'Model {i % 3}' for i in range(rows)],
+            'vehicle_make': ['Bench'] * rows,
+        })
+
+        try:
+            with transaction.atomic():
+                upload = TrackInvoiceUploads.objects.create(
+                    garage_id=options['garage'], file_name='bench', total_count=rows,
+                )
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    frame = invoiceimport.prepare_frame(df)
+                    prepared = time.perf_counter()
+                    success_count, failed = invoiceimport.import_invoices(
+                        frame, options['garage'], upload, chunk_size=options['chunk_size'],
+                    )
+                    elapsed = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(
+            f"{rows} rows ({success_count} imported, {len(failed)} failed) in {elapsed:.2f}s: "
+            f"{rows / elapsed:.0f} rows/s, prepare {prepared - started:.2f}s, "
+            f"{len(queries.captured_queries)} queries ({len(queries.captured_queries) / rows:.3f}/row)"
+        )
@@ -0,0 +1,163 @@
+import random
+import time
+from decimal import Decimal
+
+from django.db import connection, reset_queries, transaction
+from django.core.management.base import BaseCommand
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from GMSApp.models import (
+    City, Garage, RelGarageServiceCategory, RelGarageVehicleType, ServiceCategory, VehicleType,
+)
+from GMSApp.modules.api.customerUI.garage.listgarage import ListGarageAPIView, haversine
+
+INSERT_BATCH_SIZE = 2000
+
+# Centre of the synthetic city (Pune) and the spread of garages around it in degrees
+CENTRE = (18.5204, 73.8567)
+SPREAD = 0.15
+
+SCENARIOS = [
+    ('no filter', {}, None),
+    ('within 1 km', {'distence': [1]}, None),
+    ('within 3 km', {'distence': [2]}, None),
+    ('within 5 km', {'distence': [3]}, None),
+    ('4.0+ within 5 km', {'rating': [2], 'distence': [3]}, None),
+    ('service within 3 km', {'service': 'SERVICE', 'distence': [2]}, None),
+    ('rating then distance', {'sort': [1, 2]}, None),
+    ('nearest 20', {}, 20),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def reference_list(city, user_lat, user_lon, filters, limit):
+    """ The former ListGarageAPIView flow: every garage of the city, scalar haversine, filters and sort in Python. """
+    garages = []
+    for garage in Garage.objects.filter(city=city, displayed=True).order_by('position'):
+        # Per-garage city and vehicle type queries, as before
+        garage.city.name
+        list(garage.rel_garage_vehicletype.select_related('vehicletype').all())
+        distance = None
+        if garage.latitude is not None and garage.longitude is not None:
+            distance = round(haversine(user_lat, user_lon, float(garage.latitude), float(garage.longitude)), 2)
+        garages.append({'id': garage.id, 'rating': float(garage.rating), 'distance': distance})
+
+    if filters.get('rating'):
+        thresholds = [{1: 4.5, 2: 4.0, 3: 3.5, 4: 3.0}[r] for r in filters['rating']]
+        garages = [g for g in garages if any(g['rating'] >= t for t in thresholds)]
+    if filters.get('distence'):
+        max_distance = {1: 1.0, 2: 3.0, 3: 5.0}.get(filters['distence'][0], 0)
+        garages = [g for g in garages if g['distance'] is not None and g['distance'] <= max_distance]
+    if filters.get('service'):
+        with_service = set(RelGarageServiceCategory.objects.filter(
+            servicecategory_id__in=filters['service']
+        ).values_list('garage_id', flat=True))
+        garages = [g for g in garages if g['id'] in with_service]
+
+    if filters.get('sort'):
+        def key(g):
+            parts = []
+            for option in filters['sort']:
+                if option == 1:
+                    parts.append(-g['rating'] if g['rating'] > 0 else float('inf'))
+                elif option == 2:
+                    parts.append(g['distance'] if g['distance'] is not None else float('inf'))
+            return tuple(parts) + (g['id'],)
+        garages.sort(key=key)
+    else:
+        garages.sort(key=lambda g: (float('inf') if g['distance'] is None else g['distance'], g['id']))
+    return [(g['id'], g['distance']) for g in garages[:limit]]
+
+
+class Command(BaseCommand):
+    help = ("Benchmark: ListGarageAPIView, served from the city snapshot, against the former full-scan implementation on synthetic garages, "
+            "checking that both return the same garages in the same order. "
+            "The rows are inserted in a transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--garages', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=5, help='Timed requests per scenario')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        city = City.objects.create(name='Bench city', status='active')
+        vehicle_types = [VehicleType.objects.create(name=f'Bench {w}W', wheeler=w) for w in (2, 4)]
+        service = ServiceCategory.objects.create(name='Bench service', status='active')
+
+        created = 0
+        while created < options['garages']:
+            batch = min(INSERT_BATCH_SIZE, options['garages'] - created)
+            garages = Garage.objects.bulk_create([
+                Garage(
+                    city=city, name=f'Bench garage {created + i}', contact_person='Bench', phone='9000000000',
+                    email='bench@example.com', address='Bench road', state='Maharashtra', postal_code='411001',
+                    location='Bench', terms_and_conditions='', displayed=True, position=rng.randint(0, 100),
+                    rating=Decimal(rng.randint(0, 50)) / 10,
+                    # A few garages without coordinates, which sort last
+                    latitude=None if rng.random() < 0.02 else Decimal(f'{CENTRE[0] + rng.uniform(-SPREAD, SPREAD):.8f}'),
+                    longitude=Decimal(f'{CENTRE[1] + rng.uniform(-SPREAD, SPREAD):.8f}'),
+                )
+                for i in range(batch)
+            ])
+            if not connection.features.can_return_rows_from_bulk_insert:
+                garages = list(Garage.objects.filter(city=city).order_by('-id')[:batch])
+            RelGarageVehicleType.objects.bulk_create([
+                RelGarageVehicleType(garage=garage, vehicletype=vehicle_types[garage.pk % 2]) for garage in garages
+            ])
+            RelGarageServiceCategory.objects.bulk_create([
+                RelGarageServiceCategory(garage=garage, servicecategory=service) for garage in garages[::3]
+            ])
+            created += batch
+        self.stdout.write(f"{created} garages")
+
+        factory = APIRequestFactory()
+        view = ListGarageAPIView.as_view()
+        user_lat = CENTRE[0] + rng.uniform(-0.01, 0.01)
+        user_lon = CENTRE[1] + rng.uniform(-0.01, 0.01)
+
+        # The first request of the city builds its snapshot
+        started = time.perf_counter()
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            view(factory.post('/', {'location': city.name, 'latitude': user_lat, 'longitude': user_lon}, format='json'))
+        self.stdout.write(
+            f"first request (snapshot build): {(time.perf_counter() - started) * 1000:.1f}ms in {len(queries)} queries"
+        )
+
+        for label, filters, limit in SCENARIOS:
+            filters = {k: [service.id] if v == 'SERVICE' else v for k, v in filters.items()}
+            body = {'location': city.name, 'latitude': user_lat, 'longitude': user_lon, 'filter': filters}
+            if limit:
+                body['limit'] = limit
+
+            started = time.perf_counter()
+            for _ in range(options['requests']):
+                expected = reference_list(city, user_lat, user_lon, filters, limit)
+            reference_ms = (time.perf_counter() - started) * 1000 / options['requests']
+
+            started = time.perf_counter()
+            for _ in range(options['requests']):
+                reset_queries()
+                with CaptureQueriesContext(connection) as queries:
+                    response = view(factory.post('/', body, format='json'))
+            view_ms = (time.perf_counter() - started) * 1000 / options['requests']
+
+            actual = [(g['id'], g['distance']) for g in response.data['data']]
+            verdict = 'identical' if actual == expected else 'MISMATCH'
+            self.stdout.write(
+                f"{label}: {len(actual)} garages, former {reference_ms:.1f}ms, "
+                f"now {view_ms:.1f}ms in {len(queries)} queries, {verdict}"
+            )
@@ -0,0 +1,59 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from GMSApp.modules import cachedsession, managesession
+
+DB_ENGINE = 'django.contrib.sessions.backends.db'
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark: django_session queries per request for the db and cached session engines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests to simulate per engine')
+
+    def handle(self, *args, **options):
+        engines = [DB_ENGINE]
+        if settings.SESSION_ENGINE != DB_ENGINE:
+            engines.append(settings.SESSION_ENGINE)
+
+        original_store = managesession.SessionStore
+        try:
+            for engine in engines:
+                managesession.SessionStore = import_module(engine).SessionStore
+                self._run(engine, options['requests'])
+        finally:
+            managesession.SessionStore = original_store
+
+    def _run(self, engine, requests):
+        cachedsession.local_cache.clear()
+        response = managesession.set_session_keys({'userid': 0, 'useremail': 'bench@localhost'}, HttpResponse())
+        session_key = response.cookies['session_key'].value
+
+        view = managesession.check_session_timeout(lambda request, context: HttpResponse())
+        factory = RequestFactory()
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(requests):
+                request = factory.get('/')
+                request.COOKIES['session_key'] = session_key
+                view(request)
+            elapsed = time.perf_counter() - started
+
+        managesession.SessionStore(session_key=session_key).delete()
+
+        session_queries = [q for q in queries.captured_queries if 'django_session' in q['sql']]
+        writes = [q for q in session_queries if not q['sql'].lstrip().upper().startswith('SELECT')]
+        self.stdout.write(
+            f"{engine}: {requests} requests, "
+            f"{len(session_queries) / requests:.2f} session queries/request "
+            f"({len(writes)} writes), {elapsed * 1000 / requests:.3f} ms/request"
+        )
@@ -0,0 +1,86 @@
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from GMSApp.models import OutboundMessage
+from GMSApp.modules import outbox
+from GMSApp.modules.messaging import sms
+from GMSApp.modules.messaging.stubgateway import StubGateway
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Benchmark: SMS delivery against a local stub gateway, one connection per message as the login "
+            "view used to send them against the pooled gateway client, and through the outbox sender. "
+            "The outbox rows are inserted in a transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=500)
+        parser.add_argument('--latency', type=float, default=0.005, help='Stub gateway latency in seconds')
+
+    def handle(self, *args, **options):
+        stub = StubGateway(latency=options['latency']).start()
+        try:
+            self.run(stub, options['messages'])
+        finally:
+            stub.stop()
+
+    def measure(self, stub, label, send, count):
+        before = dict(stub.counters)
+        started = time.perf_counter()
+        send()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label}: {count / elapsed:.0f} messages/s, "
+            f"{stub.counters['requests'] - before['requests']} requests over "
+            f"{stub.counters['connections'] - before['connections']} connections"
+        )
+
+    def run(self, stub, count):
+        mobiles = [f'9{i:09d}' for i in range(count)]
+        text = sms.OTP_MESSAGE.format(otp='1234')
+
+        def former():
+            for mobile in mobiles:
+                requests.get(stub.url, params={'mobileNos': mobile, 'message': text}).json()
+
+        client = sms.GatewayClient(url=stub.url, auth_key='bench')
+
+        def pooled():
+            for mobile in mobiles:
+                client.send(mobile, text)
+
+        self.measure(stub, 'connection per message (former)', former, count)
+        self.measure(stub, 'pooled client', pooled, count)
+
+        # The outbox sender end to end, rate limits off, delivering to the stub
+        original_client, original_pid = sms._client, sms._client_pid
+        sms._client, sms._client_pid = client, sms.os.getpid()
+        try:
+            with transaction.atomic():
+                OutboundMessage.objects.bulk_create([
+                    OutboundMessage(channel=OutboundMessage.SMS, recipient=mobile, payload={'text': text})
+                    for mobile in mobiles
+                ])
+                sender = outbox.Sender(rate_limits={}, channel_rates={})
+
+                def drain():
+                    while True:
+                        messages = outbox.claim_due()
+                        if not messages:
+                            break
+                        for message in messages:
+                            sender.deliver(message)
+
+                self.measure(stub, 'outbox sender', drain, count)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            sms._client, sms._client_pid = original_client, original_pid
+            client.close()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from GMSApp.modules.mongodbconnection import mongo_health
+
+
+class Command(BaseCommand):
+    help = "Ping MongoDB through the pooled client and print the pool counters. Fails when the server is unreachable."
+
+    def handle(self, *args, **options):
+        health = mongo_health()
+        for name, value in health['pool'].items():
+            self.stdout.write(f"{name}: {value:g}" if isinstance(value, float) else f"{name}: {value}")
+        if not health['ok']:
+            raise CommandError(f"MongoDB unreachable after {health['latency_ms']}ms: {health['error']}")
+        self.stdout.write(self.style.SUCCESS(f"MongoDB ok, ping {health['latency_ms']}ms."))
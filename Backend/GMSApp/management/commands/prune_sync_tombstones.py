@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from GMSApp.models import SyncTombstone
+from GMSApp.modules.api.customerUI.sync.catalogsync import SYNC_TOMBSTONE_RETENTION_DAYS
+
+
+class Command(BaseCommand):
+    help = "Delete catalog sync tombstones older than the retention. Schedule daily; older sync tokens get a full sync."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        deleted, _ = SyncTombstone.objects.filter(
+            deleted_at__lt=timezone.now() - timedelta(days=options['days'])
+        ).delete()
+        self.stdout.write(f'Deleted {deleted} tombstones older than {options["days"]} days.')
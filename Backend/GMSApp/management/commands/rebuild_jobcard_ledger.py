@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from GMSApp.models import Jobcard
+from GMSApp.modules.transactions.jobsheets import jobcard_utils
+
+
+class Command(BaseCommand):
+    help = "Recompute the Jobcard ledger columns from parts, services and payments and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--garage', type=int, help='Only rebuild job cards of this garage id')
+        parser.add_argument('--batch-size', type=int, default=jobcard_utils.LEDGER_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **options):
+        jobcards = Jobcard.objects.order_by('id')
+        if options['garage']:
+            jobcards = jobcards.filter(garage_id=options['garage'])
+
+        batch_size = options['batch_size']
+        fields = list(Jobcard.LEDGER_FIELDS)
+        checked = drifted = 0
+        last_id = 0
+
+        while True:
+            batch = list(jobcards.filter(id__gt=last_id).values('id', 'jobcard_number', *fields)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]['id']
+
+            ledgers = jobcard_utils.compute_ledgers([row['id'] for row in batch])
+            changed = []
+            for row in batch:
+                ledger = ledgers[row['id']]
+                drift = {field: (row[field], ledger[field]) for field in fields if row[field] != ledger[field]}
+                if drift:
+                    drifted += 1
+                    self.stdout.write(
+                        f"Drift jobcard {row['id']} ({row['jobcard_number']}): "
+                        + ', '.join(f'{field} {old} -> {new}' for field, (old, new) in drift.items())
+                    )
+                    changed.append(Jobcard(id=row['id'], **ledger))
+            checked += len(batch)
+
+            if changed and not options['dry_run']:
+                with transaction.atomic():
+                    Jobcard.objects.bulk_update(changed, fields)
+
+        action = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} job cards. {action} drift on {drifted}.'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from GMSApp.models import OutboundMessage
+from GMSApp.modules import outbox
+
+
+class Command(BaseCommand):
+    help = "Queue failed (dead letter) outbound messages again, e.g. after a provider outage or a configuration fix."
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Only these message ids')
+        parser.add_argument('--channel', choices=[channel for channel, _ in OutboundMessage.CHANNEL_CHOICES])
+        parser.add_argument('--dry-run', action='store_true', help='List the failed messages without queuing them')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            failed = OutboundMessage.objects.filter(status=OutboundMessage.FAILED).order_by('id')
+            if options['channel']:
+                failed = failed.filter(channel=options['channel'])
+            if options['ids']:
+                failed = failed.filter(id__in=options['ids'])
+            for message in failed:
+                self.stdout.write(f'{message}: {message.attempts} attempts, {message.last_error}')
+            self.stdout.write(self.style.SUCCESS(f'{len(failed)} failed messages.'))
+            return
+
+        count = outbox.requeue_failed(options['channel'], options['ids'])
+        self.stdout.write(self.style.SUCCESS(f'Queued {count} failed messages again.'))
@@ -0,0 +1,52 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from GMSApp.modules import jobqueue
+
+
+class Command(BaseCommand):
+    help = "Process queued bulk upload jobs. Run one or more of these next to the web server."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0 = no limit)')
+        parser.add_argument('--sleep', type=float, default=getattr(settings, 'JOB_POLL_INTERVAL', 2),
+                            help='Seconds to wait between polls of an empty queue')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        worker = jobqueue.worker_name()
+        processed = 0
+        self.stdout.write(f'Worker {worker} waiting for jobs.')
+
+        while not self.stopping:
+            close_old_connections()
+            jobqueue.fail_stale_jobs()
+            job = jobqueue.claim_next(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            started = time.monotonic()
+            job = jobqueue.run(job)
+            processed += 1
+            self.stdout.write(f'Job #{job.id} {job.job_type}: {job.status} in {time.monotonic() - started:.1f}s '
+                              f'({job.success_count} ok, {job.failed_count} failed)')
+
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker} stopped after {processed} jobs.'))
+
+    def stop(self, signum, frame):
+        # Let the current job finish, then leave the loop
+        self.stopping = True
@@ -0,0 +1,66 @@
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from GMSApp.models import OutboundMessage
+from GMSApp.modules import outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued SMS, WhatsApp and other outbound messages. Run one or more of these next to the web server."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when no message is due')
+        parser.add_argument('--batch-size', type=int, default=outbox.OUTBOX_BATCH_SIZE, help='Messages claimed at a time')
+        parser.add_argument('--threads', type=int, default=getattr(settings, 'OUTBOX_SENDER_THREADS', 4),
+                            help='Messages sent in parallel')
+        parser.add_argument('--sleep', type=float, default=getattr(settings, 'OUTBOX_POLL_INTERVAL', 1),
+                            help='Seconds to wait between polls when no message is due')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        self.sender = outbox.Sender()
+        self.counts = {}
+        self.counts_lock = threading.Lock()
+        self.verbosity = options['verbosity']
+        self.stdout.write(f"Outbox sender waiting for messages ({options['threads']} threads).")
+
+        with ThreadPoolExecutor(max_workers=options['threads'], thread_name_prefix='outbox-sender') as pool:
+            while not self.stopping:
+                close_old_connections()
+                outbox.release_stale()
+                messages = outbox.claim_due(options['batch_size'])
+                if not messages:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+                # The whole batch is done before the next claim
+                list(pool.map(self.deliver, messages))
+
+        summary = ', '.join(f'{count} {result}' for result, count in sorted(self.counts.items())) or 'nothing'
+        self.stdout.write(self.style.SUCCESS(f'Outbox sender stopped: {summary}.'))
+
+    def deliver(self, message):
+        close_old_connections()
+        if self.stopping:
+            # Not attempted, hand it back
+            OutboundMessage.objects.filter(id=message.id).update(status=OutboundMessage.PENDING)
+            return
+        result = self.sender.deliver(message)
+        with self.counts_lock:
+            self.counts[result] = self.counts.get(result, 0) + 1
+        if self.verbosity > 1:
+            self.stdout.write(f'{message}: {message.last_error or "ok"}')
+
+    def stop(self, signum, frame):
+        # Let the messages being sent finish, then leave the loop
+        self.stopping = True
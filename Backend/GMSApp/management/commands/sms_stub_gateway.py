@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from GMSApp.modules.messaging.stubgateway import StubGateway
+
+
+class Command(BaseCommand):
+    help = ("Run a local stand-in for the SMS gateway. Point SMS_GATEWAY_URL at the printed URL "
+            "to deliver OTPs to it instead of the real gateway.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds before each response')
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 503')
+
+    def handle(self, *args, **options):
+        stub = StubGateway(options['host'], options['port'], options['latency'], options['fail_rate'])
+        self.stdout.write(f'Stub SMS gateway listening on {stub.url}')
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stub.stop()
+            counters = ', '.join(f'{count} {name}' for name, count in stub.counters.items())
+            self.stdout.write(self.style.SUCCESS(f'Stub SMS gateway stopped: {counters}.'))
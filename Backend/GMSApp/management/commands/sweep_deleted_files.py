@@ -0,0 +1,40 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from GMSApp.modules import bulkdelete
+
+
+class Command(BaseCommand):
+    help = "Remove the files of bulk-deleted rows. Run it next to the web server, or from cron with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when no file is queued')
+        parser.add_argument('--batch-size', type=int, default=bulkdelete.FILE_SWEEP_BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=getattr(settings, 'FILE_SWEEP_INTERVAL', 30),
+                            help='Seconds to wait between sweeps of an empty queue')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        total_removed = total_failed = 0
+        while not self.stopping:
+            close_old_connections()
+            removed, failed = bulkdelete.sweep_files(options['batch_size'])
+            total_removed += removed
+            total_failed += failed
+            if failed or removed < options['batch_size']:
+                # Queue drained, or only files that failed just now are left
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Removed {total_removed} files, {total_failed} failed attempts.'))
+
+    def stop(self, signum, frame):
+        self.stopping = True
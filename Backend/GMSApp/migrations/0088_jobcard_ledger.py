@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0087_stockinwards_price_includes_gst'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobcard',
+            name='paid_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='jobcard',
+            name='parts_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='jobcard',
+            name='pending_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='jobcard',
+            name='services_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='jobcard',
+            name='tax_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='jobcard',
+            index=models.Index(fields=['garage', 'pending_total'], name='jobcard_garage_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0088_jobcard_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['username', 'duration'], name='auditlog_user_duration_idx'),
+        ),
+    ]
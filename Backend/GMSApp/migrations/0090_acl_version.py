@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0089_auditlog_user_duration_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AclVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'acl_version',
+            },
+        ),
+    ]
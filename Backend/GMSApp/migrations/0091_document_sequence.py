@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0090_acl_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_type', models.CharField(choices=[('invoice', 'Invoice'), ('estimate', 'Estimate'), ('jobcard', 'Jobcard')], max_length=20)),
+                ('period', models.CharField(blank=True, default='', max_length=20)),
+                ('next_value', models.PositiveBigIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('garage', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='document_sequences', to='GMSApp.garage')),
+            ],
+            options={
+                'db_table': 'document_sequence',
+                'unique_together': {('garage', 'document_type', 'period')},
+            },
+        ),
+    ]
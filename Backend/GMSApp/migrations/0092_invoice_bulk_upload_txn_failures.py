@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0091_document_sequence'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='invoicebulkuploadtxn',
+            name='customer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='invoice_bulk_upload_txn', to='GMSApp.customer'),
+        ),
+        migrations.AlterField(
+            model_name='invoicebulkuploadtxn',
+            name='vehicle',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='invoice_bulk_upload_txn', to='GMSApp.vehicle'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0092_invoice_bulk_upload_txn_failures'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(choices=[('invoice_upload', 'Invoice Upload'), ('invoice_services_upload', 'Invoice Services Upload'), ('invoice_parts_upload', 'Invoice Parts Upload'), ('current_stock_upload', 'Current Stock Upload'), ('stock_inward_upload', 'Stock Inward Upload'), ('stock_outward_upload', 'Stock Outward Upload')], max_length=50)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('file_name', models.CharField(max_length=255)),
+                ('file_path', models.CharField(max_length=255)),
+                ('created_by', models.CharField(blank=True, default='', max_length=255)),
+                ('total_count', models.IntegerField(default=0)),
+                ('processed_count', models.IntegerField(default=0)),
+                ('success_count', models.IntegerField(default=0)),
+                ('failed_count', models.IntegerField(default=0)),
+                ('eta_seconds', models.IntegerField(blank=True, null=True)),
+                ('message', models.TextField(blank=True, default='')),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('garage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='background_jobs', to='GMSApp.garage')),
+                ('track_invoice_uploads', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='GMSApp.trackinvoiceuploads')),
+            ],
+            options={
+                'db_table': 'background_job',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'id'], name='background_job_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0093_background_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='garage',
+            index=models.Index(fields=['city', 'latitude', 'longitude'], name='garage_city_lat_lon_idx'),
+        ),
+    ]
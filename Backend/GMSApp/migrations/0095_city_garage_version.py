@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0094_garage_city_lat_lon_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CityGarageVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'city_garage_version',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='garage',
+            name='garage_city_lat_lon_idx',
+        ),
+        migrations.AddField(
+            model_name='citygarageversion',
+            name='city',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='garage_version', to='GMSApp.city'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0096_catalog_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=50)),
+                ('row_id', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'sync_tombstone',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='accessories',
+            index=models.Index(fields=['updated_at'], name='accessories_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='banner',
+            index=models.Index(fields=['updated_at'], name='banner_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brand',
+            index=models.Index(fields=['updated_at'], name='brand_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cc',
+            index=models.Index(fields=['updated_at'], name='cc_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(fields=['updated_at'], name='city_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='model',
+            index=models.Index(fields=['updated_at'], name='model_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicecategory',
+            index=models.Index(fields=['updated_at'], name='servicecategory_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='synctombstone',
+            index=models.Index(fields=['deleted_at'], name='sync_tombstone_deleted_idx'),
+        ),
+    ]
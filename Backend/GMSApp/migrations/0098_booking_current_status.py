@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0097_catalog_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscriberbooking',
+            name='current_status',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='current_subscriberbooking', to='GMSApp.bookingstatus'),
+        ),
+        migrations.AddField(
+            model_name='subscriberbooking',
+            name='current_status_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='subscriberbooking',
+            index=models.Index(fields=['garage', 'current_status'], name='booking_garage_status_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0099_outbound_message'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboundmessage',
+            name='channel',
+            field=models.CharField(choices=[('sms', 'SMS'), ('whatsapp', 'WhatsApp')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='outboundmessage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed (dead letter)'), ('cancelled', 'Cancelled')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0101_pending_file_deletion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['garage', 'created_at', 'id'], name='customer_garage_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='estimate',
+            index=models.Index(fields=['garage', 'created_at', 'id'], name='estimate_garage_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='estimate',
+            index=models.Index(fields=['garage', 'status', 'created_at', 'id'], name='estimate_garage_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['garage', 'created_at', 'id'], name='invoice_garage_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['garage', 'status', 'created_at', 'id'], name='invoice_garage_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobcard',
+            index=models.Index(fields=['garage', 'created_at', 'id'], name='jobcard_garage_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobcard',
+            index=models.Index(fields=['garage', 'status', 'created_at', 'id'], name='jobcard_garage_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productcatalogues',
+            index=models.Index(fields=['garage', 'created_at', 'id'], name='product_garage_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockinwards',
+            index=models.Index(fields=['garage', 'created_at', 'id'], name='stockinward_garage_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='users',
+            index=models.Index(fields=['garagegroup', 'created_at', 'id'], name='users_group_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['garage', 'updated_at', 'id'], name='vehicle_garage_updated_idx'),
+        ),
+    ]
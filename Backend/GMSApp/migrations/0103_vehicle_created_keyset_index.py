@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('GMSApp', '0102_list_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vehicle',
+            name='vehicle_garage_updated_idx',
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['garage', 'created_at', 'id'], name='vehicle_garage_created_idx'),
+        ),
+    ]
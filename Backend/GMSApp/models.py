@@ -7,7 +7,9 @@ from decimal import Decimal
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
 # Create your models here.
@@ -111,6 +113,20 @@ class City(models.Model):
     class Meta:
         db_table = "city"
         ordering = ['-created_at']
+        indexes = [
+            # Delta sync of the customer app catalog
+            models.Index(fields=['updated_at'], name='city_updated_at_idx'),
+        ]
+
+
+class CityGarageVersion(models.Model):
+    # One row per city, bumped whenever a garage of the city, its vehicle types or its service categories change
+    city = models.OneToOneField('City', on_delete=models.CASCADE, related_name='garage_version')
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'city_garage_version'
 
 
 class Garage(models.Model):   
@@ -519,6 +535,9 @@ class Customer(models.Model):
     class Meta:        
         unique_together = ('garage', 'phone')
         db_table = "customer"
+        indexes = [
+            models.Index(fields=['garage', 'created_at', 'id'], name='customer_garage_created_idx'),
+        ]
 
 
 class JobcardBrands(models.Model):    
@@ -659,6 +678,117 @@ class Vehicle(models.Model):
 
     class Meta:
         db_table = "vehicle"
+        indexes = [
+            models.Index(fields=['garage', 'created_at', 'id'], name='vehicle_garage_created_idx'),
+        ]
+
+
+class DocumentSequence(models.Model):
+    """
+    Next document number per (garage, document type, period). Numbers are
+    handed out by allocate() with one row-locked UPDATE, so concurrent
+    creation never reads the same "last" document.
+    """
+    INVOICE = 'invoice'
+    ESTIMATE = 'estimate'
+    JOBCARD = 'jobcard'
+    DOCUMENT_TYPE_CHOICES = [
+        (INVOICE, 'Invoice'),
+        (ESTIMATE, 'Estimate'),
+        (JOBCARD, 'Jobcard'),
+    ]
+    # First number of a new sequence with no existing documents
+    START_VALUES = {INVOICE: 1, ESTIMATE: 1, JOBCARD: 101}
+
+    garage = models.ForeignKey('Garage', on_delete=models.CASCADE, related_name='document_sequences', blank=True, null=True)
+    document_type = models.CharField(max_length=20, choices=DOCUMENT_TYPE_CHOICES)
+    period = models.CharField(max_length=20, blank=True, default='')
+    next_value = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'document_sequence'
+        unique_together = ('garage', 'document_type', 'period')
+
+    @staticmethod
+    def current_period():
+        """ Period of invoice and estimate numbers, e.g. 25-26 """
+        today = timezone.now().date()
+        return f"{str(today.year)[2:]}-{str(today.year + 1)[2:]}"
+
+    @classmethod
+    def allocate(cls, garage_id, document_type, period='', count=1):
+        """
+        Reserves count consecutive numbers and returns the first one. The row
+        stays locked until the surrounding transaction commits. A missing row
+        is seeded from the existing documents.
+        """
+        sequence = cls.objects.filter(garage_id=garage_id, document_type=document_type, period=period)
+        with transaction.atomic():
+            if not sequence.update(next_value=F('next_value') + count):
+                try:
+                    with transaction.atomic():
+                        first = cls.seed_value(garage_id, document_type, period)
+                        cls.objects.create(
+                            garage_id=garage_id, document_type=document_type,
+                            period=period, next_value=first + count,
+                        )
+                        return first
+                except IntegrityError:
+                    # Created concurrently, fall back to the locked update
+                    sequence.update(next_value=F('next_value') + count)
+            return sequence.values_list('next_value', flat=True).get() - count
+
+    @classmethod
+    def peek(cls, garage_id, document_type, period=''):
+        """ Next number without reserving it, for pre-filling forms. """
+        next_value = cls.objects.filter(
+            garage_id=garage_id, document_type=document_type, period=period
+        ).values_list('next_value', flat=True).first()
+        return next_value or cls.seed_value(garage_id, document_type, period)
+
+    @classmethod
+    def advance_past(cls, garage_id, document_type, period, number):
+        """ Makes sure number is never allocated, for manually entered numbers. """
+        sequence = cls.objects.filter(garage_id=garage_id, document_type=document_type, period=period)
+        if not sequence.update(next_value=Greatest(F('next_value'), number + 1)):
+            cls.allocate(garage_id, document_type, period, count=0)
+
+    @classmethod
+    def seed_value(cls, garage_id, document_type, period=''):
+        """ First free number after the documents created before the sequence existed. """
+        numbers = [
+            number for number in (
+                cls.parse_number(document_type, value)
+                for value in cls.existing_numbers(garage_id, document_type, period)
+            ) if number is not None
+        ]
+        return max(numbers) + 1 if numbers else cls.START_VALUES[document_type]
+
+    @staticmethod
+    def existing_numbers(garage_id, document_type, period=''):
+        if document_type == DocumentSequence.INVOICE:
+            return Invoice.objects.filter(
+                garage_id=garage_id, invoiceid__endswith=f'/{period}'
+            ).values_list('invoiceid', flat=True).iterator()
+        if document_type == DocumentSequence.ESTIMATE:
+            return Estimate.objects.filter(
+                garage_id=garage_id, estimateid__endswith=f'/{period}'
+            ).values_list('estimateid', flat=True).iterator()
+        return Jobcard.objects.filter(
+            garage_id=garage_id, jobcard_number__isnull=False
+        ).values_list('jobcard_number', flat=True).iterator()
+
+    @staticmethod
+    def parse_number(document_type, value):
+        """ Incremental part of garage_id/number/period or PREFIX-number, None if not parseable. """
+        try:
+            if document_type == DocumentSequence.JOBCARD:
+                return int(value.rsplit('-', 1)[1])
+            parts = value.split('/')
+            return int(parts[-2]) if len(parts) >= 2 else None
+        except (ValueError, IndexError, AttributeError):
+            return None
 
 
 class Invoice(models.Model):    
@@ -679,36 +809,12 @@ class Invoice(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.invoiceid:
-            today = timezone.now().date()
             # Get financial year in format 25-26
-            financial_year = f"{str(today.year)[2:]}-{str(today.year + 1)[2:]}"
-            
-            # Get the latest invoice for this garage in this financial year
-            last_invoice = Invoice.objects.filter(
-                garage=self.garage,
-                invoicedate__year=today.year
-            ).order_by('id').last()
-
-            if last_invoice and last_invoice.invoiceid:
-                try:
-                    # Split the invoice ID by '/' and get the second-to-last part (incremental number)
-                    parts = last_invoice.invoiceid.split('/')
-                    if len(parts) >= 2:
-                        last_increment = int(parts[-2])  # Get the second-to-last part
-                        next_increment = last_increment + 1
-                    else:
-                        raise ValueError("Invalid invoice ID format")
-                except (ValueError, IndexError):
-                    # If any error occurs, start with 1
-                    next_increment = 1
-            else:
-                next_increment = 1
+            financial_year = DocumentSequence.current_period()
+            next_increment = DocumentSequence.allocate(self.garage_id, DocumentSequence.INVOICE, financial_year)
 
             # Format: garage_id/incremental_number/financial_year
-            if self.garage:
-                self.invoiceid = f"{self.garage.id}/{next_increment}/{financial_year}"
-            else:
-                self.invoiceid = f"0/{next_increment}/{financial_year}"
+            self.invoiceid = f"{self.garage_id or 0}/{next_increment}/{financial_year}"
         
         super().save(*args, **kwargs)
 
@@ -733,6 +839,10 @@ class Invoice(models.Model):
     class Meta:
         db_table = "invoice"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['garage', 'created_at', 'id'], name='invoice_garage_created_idx'),
+            models.Index(fields=['garage', 'status', 'created_at', 'id'], name='invoice_garage_status_idx'),
+        ]
 
 
 class TrackInvoiceUploads(models.Model):
@@ -780,8 +890,9 @@ class TrackInvoiceUploads(models.Model):
 class InvoiceBulkUploadTXN(models.Model):
     invoice_id = models.CharField(max_length=100, unique=True)
     track_invoice_uploads = models.ForeignKey('TrackInvoiceUploads', on_delete=models.CASCADE, related_name='invoice_bulk_upload_txn')
-    customer = models.ForeignKey('Customer', on_delete=models.CASCADE, related_name='invoice_bulk_upload_txn')
-    vehicle = models.ForeignKey('Vehicle', on_delete=models.CASCADE, related_name='invoice_bulk_upload_txn')
+    # Empty for rows that failed before a customer and vehicle were resolved
+    customer = models.ForeignKey('Customer', on_delete=models.CASCADE, related_name='invoice_bulk_upload_txn', blank=True, null=True)
+    vehicle = models.ForeignKey('Vehicle', on_delete=models.CASCADE, related_name='invoice_bulk_upload_txn', blank=True, null=True)
     status = models.TextField(default='pending')
     final_status = models.TextField(default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -792,6 +903,168 @@ class InvoiceBulkUploadTXN(models.Model):
         ordering = ['-created_at']
 
 
+class BackgroundJob(models.Model):
+    """
+    A bulk upload queued by a request and processed by `manage.py run_jobs`.
+    The worker writes progress counters here while it runs, so the page can
+    poll them instead of waiting for the upload to finish.
+    """
+    INVOICE_UPLOAD = 'invoice_upload'
+    INVOICE_SERVICES_UPLOAD = 'invoice_services_upload'
+    INVOICE_PARTS_UPLOAD = 'invoice_parts_upload'
+    CURRENT_STOCK_UPLOAD = 'current_stock_upload'
+    STOCK_INWARD_UPLOAD = 'stock_inward_upload'
+    STOCK_OUTWARD_UPLOAD = 'stock_outward_upload'
+    JOB_TYPE_CHOICES = [
+        (INVOICE_UPLOAD, 'Invoice Upload'),
+        (INVOICE_SERVICES_UPLOAD, 'Invoice Services Upload'),
+        (INVOICE_PARTS_UPLOAD, 'Invoice Parts Upload'),
+        (CURRENT_STOCK_UPLOAD, 'Current Stock Upload'),
+        (STOCK_INWARD_UPLOAD, 'Stock Inward Upload'),
+        (STOCK_OUTWARD_UPLOAD, 'Stock Outward Upload'),
+    ]
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    garage = models.ForeignKey('Garage', on_delete=models.CASCADE, related_name='background_jobs')
+    track_invoice_uploads = models.ForeignKey('TrackInvoiceUploads', on_delete=models.CASCADE, related_name='jobs', blank=True, null=True)
+    job_type = models.CharField(max_length=50, choices=JOB_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    file_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=255)
+    created_by = models.CharField(max_length=255, blank=True, default='')
+    total_count = models.IntegerField(default=0)
+    processed_count = models.IntegerField(default=0)
+    success_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    eta_seconds = models.IntegerField(blank=True, null=True)
+    message = models.TextField(blank=True, default='')
+    worker = models.CharField(max_length=100, blank=True, default='')
+    started_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'background_job'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='background_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_job_type_display()} #{self.id} ({self.status})"
+
+    def report_progress(self, processed_count, success_count, failed_count, total_count=None):
+        """
+        Stores the counters and an ETA extrapolated from the rate so far.
+        Doubles as the worker's heartbeat.
+        """
+        now = timezone.now()
+        if total_count is not None:
+            self.total_count = total_count
+        self.processed_count = processed_count
+        self.success_count = success_count
+        self.failed_count = failed_count
+        self.eta_seconds = None
+        if self.started_at and 0 < processed_count < self.total_count:
+            elapsed = (now - self.started_at).total_seconds()
+            self.eta_seconds = int(elapsed / processed_count * (self.total_count - processed_count))
+        self.heartbeat_at = now
+        BackgroundJob.objects.filter(pk=self.pk).update(
+            total_count=self.total_count,
+            processed_count=processed_count,
+            success_count=success_count,
+            failed_count=failed_count,
+            eta_seconds=self.eta_seconds,
+            heartbeat_at=now,
+            updated_at=now,
+        )
+
+
+class OutboundMessage(models.Model):
+    """
+    A message written by a request and delivered by `manage.py run_outbox`,
+    so the request never waits for the provider. Failed deliveries are
+    retried with exponential backoff until OUTBOX_MAX_ATTEMPTS; then the
+    message is left failed, the dead-letter state, until
+    `manage.py requeue_outbox` queues it again.
+    """
+    SMS = 'sms'
+    WHATSAPP = 'whatsapp'
+    CHANNEL_CHOICES = [
+        (SMS, 'SMS'),
+        (WHATSAPP, 'WhatsApp'),
+    ]
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed (dead letter)'),
+        (CANCELLED, 'Cancelled'),
+    ]
+
+    channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'outbound_message'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_message_due_idx'),
+            models.Index(fields=['recipient', 'status'], name='outbound_message_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.recipient} #{self.id} ({self.status})"
+
+
+class PendingFileDeletion(models.Model):
+    """
+    A file of a bulk-deleted row, removed by `manage.py sweep_deleted_files`.
+    It is queued in the transaction that deletes the row, so the file is only
+    removed once that delete has committed.
+    """
+    path = models.CharField(max_length=500)
+    # Also remove the file's directory once it is empty, e.g. per-upload folders
+    remove_empty_dir = models.BooleanField(default=False)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'pending_file_deletion'
+        ordering = ['id']
+
+    def __str__(self):
+        return self.path
+
+
 # class BulkUploadInvoices(models.Model):
 #     track_invoice_uploads = models.ForeignKey('TrackInvoiceUploads', on_delete=models.CASCADE, related_name='bulk_upload_invoices', null=True, blank=True)
 #     # for invoice
@@ -914,36 +1187,12 @@ class Estimate(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.estimateid:
-            today = timezone.now().date()
             # Get financial year in format 25-26
-            financial_year = f"{str(today.year)[2:]}-{str(today.year + 1)[2:]}"
-            
-            # Get the latest estimate for this garage in this financial year
-            last_estimate = Estimate.objects.filter(
-                garage=self.garage,
-                estimatedate__year=today.year
-            ).order_by('id').last()
-
-            if last_estimate and last_estimate.estimateid:
-                try:
-                    # Split the estimate ID by '/' and get the second-to-last part (incremental number)
-                    parts = last_estimate.estimateid.split('/')
-                    if len(parts) >= 2:
-                        last_increment = int(parts[-2])  # Get the second-to-last part
-                        next_increment = last_increment + 1
-                    else:
-                        raise ValueError("Invalid estimate ID format")
-                except (ValueError, IndexError):
-                    # If any error occurs, start with 1
-                    next_increment = 1
-            else:
-                next_increment = 1
+            financial_year = DocumentSequence.current_period()
+            next_increment = DocumentSequence.allocate(self.garage_id, DocumentSequence.ESTIMATE, financial_year)
 
             # Format: garage_id/incremental_number/financial_year
-            if self.garage:
-                self.estimateid = f"{self.garage.id}/{next_increment}/{financial_year}"
-            else:
-                self.estimateid = f"0/{next_increment}/{financial_year}"
+            self.estimateid = f"{self.garage_id or 0}/{next_increment}/{financial_year}"
         
         super().save(*args, **kwargs)
 
@@ -965,6 +1214,10 @@ class Estimate(models.Model):
     class Meta:
         db_table = "estimate"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['garage', 'created_at', 'id'], name='estimate_garage_created_idx'),
+            models.Index(fields=['garage', 'status', 'created_at', 'id'], name='estimate_garage_status_idx'),
+        ]
       
 
 class AccessModules(models.Model):
@@ -1058,6 +1311,15 @@ class BusinessPermissions(models.Model):
         db_table = 'business_permissions'
 
 
+class AclVersion(models.Model):
+    # Single row, bumped whenever roles permissions or the access tables change
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'acl_version'
+
+
 class Roles(models.Model): 
     name = models.CharField(max_length=255, unique=True)    
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1146,7 +1408,10 @@ class Users(models.Model):
 
     class Meta:
         db_table = 'users' 
-        ordering = ['-created_at']   
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['garagegroup', 'created_at', 'id'], name='users_group_created_idx'),
+        ]
 
 
 class RelGarageUser(models.Model):
@@ -1186,6 +1451,9 @@ class AuditLog(models.Model):
     class Meta:
         db_table = 'auditlog'  
         ordering = ['-duration']        
+        indexes = [
+            models.Index(fields=['username', 'duration'], name='auditlog_user_duration_idx'),
+        ]
 
 
 class Employees(models.Model):
@@ -1436,7 +1704,10 @@ class ProductCatalogues(models.Model):
 
     class Meta:
         db_table = "product_catalogues" 
-        ordering = ['-created_at']  
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['garage', 'created_at', 'id'], name='product_garage_created_idx'),
+        ]
 
 
 class StockInwards(models.Model):    
@@ -1473,6 +1744,9 @@ class StockInwards(models.Model):
     class Meta:
         db_table = "inventory_stock_inwards"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['garage', 'created_at', 'id'], name='stockinward_garage_created_idx'),
+        ]
 
 
 class StockOutwards(models.Model):
@@ -1687,6 +1961,10 @@ class ServiceCategory(models.Model):
 
     class Meta:
         db_table = "servicecategory"
+        indexes = [
+            # Delta sync of the customer app catalog
+            models.Index(fields=['updated_at'], name='servicecategory_updated_at_idx'),
+        ]
 
 
 class RelGarageServiceCategory(models.Model):
@@ -1793,6 +2071,29 @@ class RelCityUser(models.Model):
         ordering = ['-created_at']
 
 
+class SyncTombstone(models.Model):
+    # Deleted catalog rows, kept for SYNC_TOMBSTONE_RETENTION_DAYS so delta syncs can report them
+    table = models.CharField(max_length=50)
+    row_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sync_tombstone'
+        indexes = [
+            models.Index(fields=['deleted_at'], name='sync_tombstone_deleted_idx'),
+        ]
+
+
+class CatalogVersion(models.Model):
+    # One row per customer app catalog (brand, model, city, accessory), bumped whenever a source table changes
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'catalog_version'
+
+
 class Brand(models.Model):  
     STATUS = [
         ('active', 'Active'),
@@ -1832,6 +2133,10 @@ class Brand(models.Model):
     class Meta:
         db_table = "brand"  
         ordering = ['-created_at']      
+        indexes = [
+            # Delta sync of the customer app catalog
+            models.Index(fields=['updated_at'], name='brand_updated_at_idx'),
+        ]
 
 
 class CC(models.Model):        
@@ -1877,6 +2182,10 @@ class CC(models.Model):
     class Meta:
         db_table = "cc"
         ordering = ['-created_at']
+        indexes = [
+            # Delta sync of the customer app catalog
+            models.Index(fields=['updated_at'], name='cc_updated_at_idx'),
+        ]
 
 
 class Model(models.Model):      
@@ -1921,6 +2230,10 @@ class Model(models.Model):
     class Meta:
         db_table = "model" 
         ordering = ['-created_at']  
+        indexes = [
+            # Delta sync of the customer app catalog
+            models.Index(fields=['updated_at'], name='model_updated_at_idx'),
+        ]
 
 
 class SubscriberVehicle(models.Model):
@@ -2032,9 +2345,27 @@ class SubscriberBooking(models.Model):
     # payment_status = models.CharField(max_length=255, default='pending')
     required_estimate = models.BooleanField(default=False)
     cancel_reason = models.TextField(blank=True, null=True)
+    # Latest timeline entry, maintained by BookingTimeline.record / backfill_booking_status
+    current_status = models.ForeignKey(
+        'BookingStatus', on_delete=models.SET_NULL,
+        related_name='current_subscriberbooking', null=True, blank=True
+    )
+    current_status_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    STATUS_FIELDS = ('current_status', 'current_status_at')
+
+    def save(self, *args, **kwargs):
+        # Never write back a current status loaded earlier in the request, a
+        # timeline entry may have been recorded in the meantime
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.STATUS_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def delete(self, *args, **kwargs):
         # List of related objects to check
         related_objects = [
@@ -2058,6 +2389,9 @@ class SubscriberBooking(models.Model):
     class Meta:
         db_table = "subscriberbooking"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['garage', 'current_status'], name='booking_garage_status_idx'),
+        ]
 
 
 class BookingTimeline(models.Model):
@@ -2066,6 +2400,20 @@ class BookingTimeline(models.Model):
     remark = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def record(cls, booking_id, status, remark=None):
+        """
+        Adds a timeline entry and makes it the current status of the booking,
+        in one transaction. A concurrent entry created later is never
+        overwritten by this one.
+        """
+        with transaction.atomic():
+            entry = cls.objects.create(booking_id=booking_id, status=status, remark=remark)
+            SubscriberBooking.objects.filter(id=booking_id).filter(
+                Q(current_status_at__isnull=True) | Q(current_status_at__lte=entry.created_at)
+            ).update(current_status=entry.status, current_status_at=entry.created_at)
+        return entry
+
     class Meta:
         unique_together = ('booking', 'status')
         db_table = "subscriberbookingtimeline"
@@ -2159,6 +2507,10 @@ class Accessories(models.Model):
     class Meta:
         db_table = "accessories" 
         ordering = ['-created_at']     
+        indexes = [
+            # Delta sync of the customer app catalog
+            models.Index(fields=['updated_at'], name='accessories_updated_at_idx'),
+        ]
 
 
 class SubscriberBookingAccessories(models.Model):        
@@ -2204,6 +2556,10 @@ class Banner(models.Model):
     class Meta:
         db_table = "banner"
         ordering = ['order'] 
+        indexes = [
+            # Delta sync of the customer app catalog
+            models.Index(fields=['updated_at'], name='banner_updated_at_idx'),
+        ]
 
 
 class RelGarageService(models.Model):
@@ -2499,13 +2855,31 @@ class Jobcard(models.Model):
         'Users', on_delete=models.CASCADE,
         related_name="jobcard", null=True, blank=True
     )
+
+    # Financial ledger, maintained from parts, services and payments
+    parts_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    services_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    tax_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    paid_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    pending_total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+
     random_uuid = models.UUIDField(default=uuid.uuid4, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
 
+    # Written only by jobcard_utils.refresh_jobcard_ledger / rebuild_jobcard_ledger
+    LEDGER_FIELDS = ('parts_total', 'services_total', 'tax_total', 'paid_total', 'pending_total')
+
     def save(self, *args, **kwargs):
         self.mode = 'online' if self.booking else 'offline'
+        # Never write back ledger values loaded earlier in the request, a part,
+        # service or payment edit may have refreshed them in the meantime
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.LEDGER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
@@ -2559,6 +2933,11 @@ class Jobcard(models.Model):
         db_table = "jobcard"
         # unique_together = ('garage', 'customer', 'vehicle', 'mode')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['garage', 'pending_total'], name='jobcard_garage_pending_idx'),
+            models.Index(fields=['garage', 'created_at', 'id'], name='jobcard_garage_created_idx'),
+            models.Index(fields=['garage', 'status', 'created_at', 'id'], name='jobcard_garage_status_idx'),
+        ]
 
     def get_damage_photos(self):
         """
@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import  Accessories
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from django.conf import settings
 from datetime import datetime
 import logging, os
@@ -178,15 +178,10 @@ def d_accounts_accessories(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    accessories_obj = get_object_or_404(Accessories, id=id)
-                    if accessories_obj:
-                        deleted_data.append(accessories_obj.id) 
-                        accessories_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                deleted_count = bulkdelete.bulk_delete(Accessories, product_ids)
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
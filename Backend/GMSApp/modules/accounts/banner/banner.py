@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import  Banner, City
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from django.conf import settings
 from datetime import datetime
 import logging, os
@@ -180,15 +180,10 @@ def d_accounts_banner(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    banner_obj = get_object_or_404(Banner, id=id)
-                    if banner_obj:
-                        deleted_data.append(banner_obj.id) 
-                        banner_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                deleted_count = bulkdelete.bulk_delete(Banner, product_ids)
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
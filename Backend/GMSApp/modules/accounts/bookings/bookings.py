@@ -5,7 +5,7 @@ from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import OuterRef, Subquery
+from django.db.models import F
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
@@ -16,12 +16,13 @@ from GMSApp.models import (
     BookingStatus,
     BookingTimeline,
     Customer,
+    DocumentSequence,
     GarageStaff,
     Jobcard,
     JobcardMechanic,
     SubscriberBooking,
 )
-from GMSApp.modules import audit, managesession, templatespath
+from GMSApp.modules import audit, bulkdelete, managesession, templatespath
 
 # @managesession.check_session_timeout
 # def r_accounts_bookings(request, context):
@@ -120,15 +121,10 @@ def r_accounts_bookings(request, context):
         )
 
         # ---- 3️⃣ Annotate Latest Status ----
-        latest_timeline = (
-            BookingTimeline.objects
-            .filter(booking_id=OuterRef('pk'))
-            .order_by('-created_at')
-        )
-
+        # Denormalized on the booking by BookingTimeline.record
         bookings_objs = bookings_queryset.annotate(
-            latest_status=Subquery(latest_timeline.values('status__displayname')[:1]),
-            latest_status_name=Subquery(latest_timeline.values('status__name')[:1])
+            latest_status=F('current_status__displayname'),
+            latest_status_name=F('current_status__name')
         )
 
         # ---- 4️⃣ Compute Status Counts ----
@@ -168,11 +164,6 @@ def r_accounts_bookings(request, context):
 
 @managesession.check_session_timeout
 def v_accounts_bookings(request, context, id):    
-    # Get the booking with its latest status from the timeline
-    latest_timeline = BookingTimeline.objects.filter(
-        booking_id=OuterRef('pk')
-    ).order_by('-created_at')
-    
     # Get the booking with its latest status annotated
     booking_obj = get_object_or_404(
         SubscriberBooking.objects.select_related(
@@ -182,9 +173,9 @@ def v_accounts_bookings(request, context, id):
                     'subscribervehicle__model__cc',
                     'subscriberaddress__city'
                 ).annotate(
-            latest_status_id=Subquery(latest_timeline.values('status_id')[:1]),
-            latest_status=Subquery(latest_timeline.values('status__displayname')[:1]),
-            latest_status_name=Subquery(latest_timeline.values('status__name')[:1])
+            latest_status_id=F('current_status_id'),
+            latest_status=F('current_status__displayname'),
+            latest_status_name=F('current_status__name')
         ),
         id=id
     )
@@ -360,15 +351,16 @@ def d_accounts_bookings(request, context):
         try:
             with transaction.atomic():
                 booking_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in booking_ids:
-                    bookings_obj = get_object_or_404(SubscriberBooking, id=id)
-                    if bookings_obj:
-                        deleted_data.append(bookings_obj.id) 
-                        bookings_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                # Only the bookings this account can list
+                booking_objs = SubscriberBooking.objects.all()
+                if context.get('usertype') == 'admin':
+                    booking_objs = booking_objs.filter(subscriberaddress__city_id__in=context.get('allowed_city_ids', []))
+                elif context.get('usertype') != 'business':
+                    booking_objs = booking_objs.filter(garage_id__in=context.get('allowed_garage_ids', []))
+                deleted_count = bulkdelete.bulk_delete(SubscriberBooking, booking_ids, booking_objs)
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
@@ -424,11 +416,7 @@ def create_booking_jobcard(request, context):
             )
 
             # Generate jobcard number
-            last_jobcard = Jobcard.objects.filter(
-                garage_id=context['garage_id']
-            ).order_by('-jobcard_number').only('jobcard_number').first()
-            
-            new_jobcard_number = _generate_jobcard_number(last_jobcard) if last_jobcard else "JOB-101"
+            new_jobcard_number = _generate_jobcard_number(context['garage_id'])
 
             # Create jobcard
             jobcard = Jobcard.objects.create(
@@ -463,13 +451,9 @@ def create_booking_jobcard(request, context):
             'message': 'An error occurred while processing your request'
         }, status=400)
 
-def _generate_jobcard_number(last_jobcard):
+def _generate_jobcard_number(garage_id):
     """Helper method to generate jobcard number"""
-    try:
-        prefix, number = last_jobcard.jobcard_number.split("-")
-        return f"{prefix}-{int(number) + 1}"
-    except (ValueError, AttributeError):
-        return f"JOB-{last_jobcard.id + 1}"
+    return f"JOB-{DocumentSequence.allocate(garage_id, DocumentSequence.JOBCARD)}"
 
 def _assign_mechanic_to_jobcard(jobcard, booking_obj):
     """Helper method to assign mechanic to jobcard if available"""
@@ -495,11 +479,7 @@ def _update_booking_status(booking_id, jobcard_number):
     """Helper method to update booking status"""
     try:
         status_obj = BookingStatus.objects.get(name='job_card_created')
-        BookingTimeline.objects.create(
-            booking_id=booking_id,
-            status=status_obj,
-            remark=jobcard_number
-        )
+        BookingTimeline.record(booking_id, status_obj, jobcard_number)
         return "Status updated successfully"
     except BookingStatus.DoesNotExist:
         return "Status update failed"
@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import  Brand
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from django.conf import settings
 from datetime import datetime
 import logging, os
@@ -164,15 +164,10 @@ def d_accounts_brand(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    brand_obj = get_object_or_404(Brand, id=id)
-                    if brand_obj:
-                        deleted_data.append(brand_obj.id) 
-                        brand_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                deleted_count = bulkdelete.bulk_delete(Brand, product_ids)
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
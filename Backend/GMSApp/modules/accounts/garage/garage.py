@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import  Garage, GarageService, UsersAccesses, ServiceCategory, RelGarageServiceCategory, City, GarageBusinessHours, VehicleType, RelGarageVehicleType
-from GMSApp.modules import templatespath, managesession, audit, customfunctions
+from GMSApp.modules import templatespath, managesession, audit, customfunctions, bulkdelete
 from django.conf import settings
 from datetime import datetime
 from decimal import Decimal
@@ -557,15 +557,10 @@ def d_accounts_garage(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    garage_obj = get_object_or_404(Garage, id=id)
-                    if garage_obj:
-                        deleted_data.append(garage_obj.id) 
-                        garage_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                deleted_count = bulkdelete.bulk_delete(Garage, product_ids)
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import Garage, RelGarageService, GarageService, CC
-from GMSApp.modules import templatespath, managesession, audit, customfunctions
+from GMSApp.modules import templatespath, managesession, audit, customfunctions, bulkdelete
 from django.conf import settings
 from datetime import datetime
 import logging, os
@@ -156,15 +156,10 @@ def d_accounts_garage_service(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    relgarageservice_obj = get_object_or_404(RelGarageService, id=id)
-                    if relgarageservice_obj:
-                        deleted_data.append(relgarageservice_obj.id) 
-                        relgarageservice_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                deleted_count = bulkdelete.bulk_delete(RelGarageService, product_ids)
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
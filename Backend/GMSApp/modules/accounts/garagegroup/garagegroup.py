@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import  Garage, GarageGroup, RelGarageGarageGroup
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 import logging
 
 
@@ -175,15 +175,10 @@ def d_accounts_garagegroup(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    garagegroup_obj = get_object_or_404(GarageGroup, id=id)
-                    if garagegroup_obj:
-                        deleted_data.append(garagegroup_obj.id) 
-                        garagegroup_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                deleted_count = bulkdelete.bulk_delete(GarageGroup, product_ids)
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
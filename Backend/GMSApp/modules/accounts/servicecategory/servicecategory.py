@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import  ServiceCategory, City, RelCityServiceCategory
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from django.conf import settings
 from datetime import datetime
 import logging, os
@@ -231,15 +231,10 @@ def d_accounts_servicecategory(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    servicecategory_obj = get_object_or_404(ServiceCategory, id=id)
-                    if servicecategory_obj:
-                        deleted_data.append(servicecategory_obj.id) 
-                        servicecategory_obj.delete()
+                deleted_count = bulkdelete.bulk_delete(ServiceCategory, product_ids)
 
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
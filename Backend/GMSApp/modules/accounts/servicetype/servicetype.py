@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import  GarageServicetype
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from GMSApp.modules.acl import acls
 from django.conf import settings
 from datetime import datetime
@@ -110,15 +110,10 @@ def d_accounts_servicetype(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    servicetype_obj = get_object_or_404(GarageServicetype, id=id)
-                    if servicetype_obj:
-                        deleted_data.append(servicetype_obj.id) 
-                        servicetype_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                deleted_count = bulkdelete.bulk_delete(GarageServicetype, product_ids)
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
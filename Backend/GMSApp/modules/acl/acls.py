@@ -1,7 +1,11 @@
-from GMSApp.models import AccessModules, BusinessPermissions, AccessSubmodules, AccessPermissions, RolesPermissions
-from django.db.models import Prefetch
+from GMSApp.models import AccessModules, BusinessPermissions, AccessSubmodules, AccessPermissions, RolesPermissions, AclVersion
+from django.db.models import Prefetch, F
 from collections import defaultdict
+from types import MappingProxyType
 from django.conf import settings
+from django.db import transaction
+import threading
+import time
 import logging
 
 
@@ -31,33 +35,62 @@ def fetchAllBusinessAcl():
 
 
 def fetchRolesAcl(role_id):
-    # Get allowed permissions for the role
-    allowed_permissions = RolesPermissions.objects.filter(role_id=role_id).values_list('permission_id', flat=True)
+    """
+    Returns the compiled ACL of a role as a read-only mapping of
+    module -> submodule -> frozenset of permission types, e.g.
+    'delete' in acl['Users']['Auditlog']. Compiled ACLs are memoized per
+    process and recompiled when the ACL version changes.
+    """
+    version = current_acl_version()
+    with _compiled_lock:
+        cached = _compiled_acls.get(role_id)
+    if cached and cached[0] == version:
+        return cached[1]
 
-    # Get allowed submodules
-    allowed_submodules = AccessSubmodules.objects.filter(permissions__id__in=allowed_permissions).distinct()
+    acl = compileRolesAcl(role_id)
+    with _compiled_lock:
+        _compiled_acls[role_id] = (version, acl)
+    return acl
 
-    # Get allowed modules
-    allowed_modules = AccessModules.objects.filter(submodules__in=allowed_submodules).distinct()
 
-    # Prefetch submodules and permissions
-    allowed_modules = allowed_modules.prefetch_related(
-        Prefetch('submodules', queryset=allowed_submodules.prefetch_related(
-            Prefetch('permissions', queryset=AccessPermissions.objects.filter(id__in=allowed_permissions))
-        ))
+def compileRolesAcl(role_id):
+    rows = RolesPermissions.objects.filter(role_id=role_id).values_list(
+        'permission__submodule__module__name', 'permission__submodule__name', 'permission__permission_type'
     )
 
     # Create a nested dictionary structure
-    acl_structure = defaultdict(lambda: defaultdict(list))
-
-    for module in allowed_modules:
-        module_name = module.name.replace(" ", "_")  # Replace spaces with underscores
-        for submodule in module.submodules.all():
-            submodule_name = submodule.name.replace(" ", "_")  # Replace spaces with underscores
-            for permission in submodule.permissions.all():
-                permission_name = permission.permission_type
-                acl_structure[module_name][submodule_name].append(permission_name)
-
-    acl_structure = dict(acl_structure)  # Convert defaultdict to normal dict for readability
-    # logging.getLogger(__name__).info(f"acl_structure: {acl_structure}")
-    return acl_structure
\ No newline at end of file
+    acl_structure = defaultdict(lambda: defaultdict(set))
+    for module_name, submodule_name, permission_name in rows:
+        # Replace spaces with underscores
+        acl_structure[module_name.replace(" ", "_")][submodule_name.replace(" ", "_")].add(permission_name)
+
+    return MappingProxyType({
+        module_name: MappingProxyType({
+            submodule_name: frozenset(permissions) for submodule_name, permissions in submodules.items()
+        })
+        for module_name, submodules in acl_structure.items()
+    })
+
+
+# Compiled role ACLs: role_id -> (acl version, compiled acl)
+_compiled_acls = {}
+_compiled_lock = threading.Lock()
+_version_state = {'version': None, 'checked_at': 0.0}
+ACL_VERSION_CHECK_INTERVAL = getattr(settings, 'ACL_VERSION_CHECK_INTERVAL', 30)
+
+
+def current_acl_version():
+    """ Returns the ACL version, re-reading it at most once per check interval. """
+    now = time.monotonic()
+    if _version_state['version'] is None or now - _version_state['checked_at'] > ACL_VERSION_CHECK_INTERVAL:
+        _version_state['version'] = AclVersion.objects.values_list('version', flat=True).first() or 0
+        _version_state['checked_at'] = now
+    return _version_state['version']
+
+
+def bump_acl_version(**kwargs):
+    """ Invalidates compiled ACLs in every process. Connected to the ACL model signals. """
+    if not AclVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        AclVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+    # Re-read on next use in this process instead of waiting for the interval
+    transaction.on_commit(lambda: _version_state.update(version=None))
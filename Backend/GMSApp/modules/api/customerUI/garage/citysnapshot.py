@@ -0,0 +1,132 @@
+"""
+In-memory snapshots of the displayed garages of a city, for the customer
+garage list.
+
+A snapshot holds the garage rows ready for GarageSerializer plus column
+arrays (ids, coordinates, ratings) and boolean masks per wheeler and per
+service category, so a request only filters masks and computes distances.
+Snapshots are built with three queries, memoized per process and rebuilt
+when the city's CityGarageVersion changes; the version is bumped by the
+Garage, RelGarageVehicleType, RelGarageServiceCategory and VehicleType
+signals.
+"""
+import threading
+from collections import defaultdict
+
+import numpy as np
+from django.db.models import F
+
+from GMSApp.models import City, CityGarageVersion, Garage, RelGarageServiceCategory, RelGarageVehicleType
+
+GARAGE_FIELDS = (
+    'id', 'name', 'logo', 'address', 'landmark', 'state', 'postal_code', 'latitude', 'longitude',
+    'rating', 'location', 'is_exclusive', 'is_verified', 'is_offer', 'offer_text',
+)
+
+
+class CitySnapshot:
+    """ Displayed garages of a city; rows and arrays share the same index. """
+
+    def __init__(self, rows, wheelers, services):
+        self.rows = rows
+        self.ids = np.array([row['id'] for row in rows], dtype=np.int64)
+        self.lats = np.array([np.nan if row['latitude'] is None else float(row['latitude']) for row in rows])
+        self.lons = np.array([np.nan if row['longitude'] is None else float(row['longitude']) for row in rows])
+        self.ratings = np.array([row['rating'] for row in rows])
+        self.wheelers = wheelers
+        self.services = services
+
+    def __len__(self):
+        return len(self.rows)
+
+    def wheeler_mask(self, wheeler):
+        return self.wheelers.get(int(wheeler), np.zeros(len(self), dtype=bool))
+
+    def service_mask(self, service_ids):
+        mask = np.zeros(len(self), dtype=bool)
+        for service_id in service_ids:
+            if int(service_id) in self.services:
+                mask |= self.services[int(service_id)]
+        return mask
+
+
+def build_snapshot(city_id):
+    rows = list(Garage.objects.filter(city_id=city_id, displayed=True).order_by('id').values(*GARAGE_FIELDS))
+    index = {}
+    for i, row in enumerate(rows):
+        row['rating'] = float(row['rating']) if row['rating'] is not None else 0.0
+        row['vehicle_types'] = []
+        index[row['id']] = i
+
+    wheelers = defaultdict(lambda: np.zeros(len(rows), dtype=bool))
+    for rel in RelGarageVehicleType.objects.filter(garage__city_id=city_id, garage__displayed=True).values(
+        'garage_id', 'vehicletype__id', 'vehicletype__name', 'vehicletype__wheeler', 'vehicletype__is_ev'
+    ):
+        i = index[rel['garage_id']]
+        rows[i]['vehicle_types'].append({
+            'id': rel['vehicletype__id'],
+            'name': rel['vehicletype__name'],
+            'wheeler': rel['vehicletype__wheeler'],
+            'is_ev': rel['vehicletype__is_ev']
+        })
+        wheelers[rel['vehicletype__wheeler']][i] = True
+
+    services = defaultdict(lambda: np.zeros(len(rows), dtype=bool))
+    for garage_id, servicecategory_id in RelGarageServiceCategory.objects.filter(
+        garage__city_id=city_id, garage__displayed=True
+    ).values_list('garage_id', 'servicecategory_id'):
+        services[servicecategory_id][index[garage_id]] = True
+
+    return CitySnapshot(rows, dict(wheelers), dict(services))
+
+
+def get_snapshot(city_id, version):
+    """ Returns the snapshot of a city at version, building it when the memoized one is older. """
+    with _snapshots_lock:
+        cached = _snapshots.get(city_id)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    snapshot = build_snapshot(city_id)
+    with _snapshots_lock:
+        _snapshots[city_id] = (version, snapshot)
+    return snapshot
+
+
+# city_id -> (city garage version, snapshot)
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def bump_city_garage_version(city_id):
+    if city_id is None:
+        return
+    if not CityGarageVersion.objects.filter(city_id=city_id).update(version=F('version') + 1):
+        CityGarageVersion.objects.get_or_create(city_id=city_id, defaults={'version': 1})
+
+
+def remember_garage_city(sender, instance, **kwargs):
+    """ pre_save of Garage: keeps the stored city so a move invalidates both cities. """
+    if instance.pk:
+        instance._snapshot_city_id = Garage.objects.filter(pk=instance.pk).values_list('city_id', flat=True).first()
+
+
+def garage_changed(sender, instance, **kwargs):
+    bump_city_garage_version(instance.city_id)
+    previous_city_id = getattr(instance, '_snapshot_city_id', None)
+    if previous_city_id != instance.city_id:
+        bump_city_garage_version(previous_city_id)
+
+
+def garage_relation_changed(sender, instance, **kwargs):
+    """ RelGarageVehicleType and RelGarageServiceCategory rows """
+    bump_city_garage_version(Garage.objects.filter(pk=instance.garage_id).values_list('city_id', flat=True).first())
+
+
+def vehicle_type_changed(sender, instance, **kwargs):
+    """ Vehicle type names are part of every snapshot row, so every city is rebuilt """
+    CityGarageVersion.objects.update(version=F('version') + 1)
+    CityGarageVersion.objects.bulk_create([
+        CityGarageVersion(city_id=city_id, version=1)
+        for city_id in City.objects.filter(garage_version__isnull=True).values_list('id', flat=True)
+    ])
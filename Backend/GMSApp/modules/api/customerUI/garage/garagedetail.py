@@ -0,0 +1,139 @@
+"""
+Pre-serialized garage detail documents for the FetchGarage API.
+
+A document is built with one garage query and three prefetches, and stored
+in the Django cache under the garage id with image paths left relative;
+absolute URLs depend on the request host and are added per response. The
+Garage, RelGarageService, GarageService, GarageBanner,
+RelGarageServiceCategory and ServiceCategory signals delete the affected
+documents. Deletes reach every process only with a shared cache backend;
+with the default per-process cache, GARAGE_DETAIL_CACHE_TIMEOUT bounds how
+long other processes serve the previous document.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+
+from GMSApp.models import Garage, GarageBanner, RelGarageService, RelGarageServiceCategory
+
+GARAGE_DETAIL_CACHE_TIMEOUT = getattr(settings, 'GARAGE_DETAIL_CACHE_TIMEOUT', 300)
+
+
+def cache_key(garage_id):
+    return f'garage_detail:{garage_id}'
+
+
+def build_document(garage_id):
+    """ Garage detail with relative image paths, plus the hash of its content. """
+    garage = get_object_or_404(
+        Garage.objects.select_related('city').prefetch_related(
+            Prefetch('rel_garage_service', to_attr='active_services', queryset=RelGarageService.objects.filter(
+                status='active'
+            ).select_related('service__service_type', 'cc')),
+            Prefetch('garage_banner', to_attr='active_banners', queryset=GarageBanner.objects.filter(
+                status='active'
+            ).order_by('order')),
+            Prefetch('rel_garage_servicecategory', to_attr='service_categories',
+                     queryset=RelGarageServiceCategory.objects.select_related('servicecategory')),
+        ),
+        id=garage_id,
+    )
+
+    # Group services and addons by CC
+    services_by_cc = {}
+    addons_by_cc = {}
+    for rel_service in garage.active_services:
+        cc_name = rel_service.cc.name if rel_service.cc else 'Other'
+        service_data = {
+            'name': rel_service.service.name,
+            'price': float(rel_service.price)
+        }
+        if rel_service.service.service_type.name.lower() == 'add-on':
+            addons_by_cc.setdefault(cc_name, []).append(service_data)
+        else:
+            services_by_cc.setdefault(cc_name, []).append(service_data)
+
+    address_parts = [
+        garage.address if garage.address else None,
+        garage.landmark if garage.landmark else None,
+        garage.city.name if garage.city else None,
+        garage.state if garage.state else None,
+        str(garage.postal_code) if garage.postal_code else None
+    ]
+
+    document = {
+        'name': garage.name,
+        'image': garage.logo,
+        'address': ', '.join(filter(None, [str(part).strip() for part in address_parts if part and str(part).strip()])),
+        'description': garage.about,
+        'location': {
+            'latitude': float(garage.latitude) if garage.latitude else None,
+            'longitude': float(garage.longitude) if garage.longitude else None
+        },
+        'banners': [{'image': banner.image_path} for banner in garage.active_banners],
+        'services': {
+            'service': [{cc_name: services} for cc_name, services in services_by_cc.items()],
+            'addon': [{cc_name: addons} for cc_name, addons in addons_by_cc.items()],
+        },
+        'contact_person': garage.contact_person,
+        'owner': garage.contact_person,
+        'phone': garage.phone,
+        'email': garage.email,
+        'service_provided': [
+            {'name': rel.servicecategory.name, 'image': rel.servicecategory.image_path}
+            for rel in garage.service_categories if rel.servicecategory.image_path
+        ],
+    }
+    content_hash = hashlib.sha1(json.dumps(document, sort_keys=True).encode()).hexdigest()
+    return document, content_hash
+
+
+def get_document(garage_id):
+    """ (document, content hash) of a garage from the cache, building it on a miss. """
+    entry = cache.get(cache_key(garage_id))
+    if entry is None:
+        entry = build_document(garage_id)
+        cache.set(cache_key(garage_id), entry, GARAGE_DETAIL_CACHE_TIMEOUT)
+    return entry
+
+
+def render(document, base_url):
+    """ Copy of a document with absolute image URLs for base_url. """
+    def url(path):
+        return f"{base_url}/{path.lstrip('/')}" if path else None
+
+    return dict(
+        document,
+        image=url(document['image']),
+        banners=[{'image': url(banner['image'])} for banner in document['banners']],
+        service_provided=[dict(category, image=url(category['image'])) for category in document['service_provided']],
+    )
+
+
+def invalidate(garage_ids):
+    keys = [cache_key(garage_id) for garage_id in garage_ids]
+    cache.delete_many(keys)
+    # Again after commit, in case a request rebuilt the document from the old rows meanwhile
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def garage_changed(sender, instance, **kwargs):
+    invalidate([instance.pk])
+
+
+def garage_relation_changed(sender, instance, **kwargs):
+    """ RelGarageService, GarageBanner and RelGarageServiceCategory rows """
+    invalidate([instance.garage_id])
+
+
+def garage_service_changed(sender, instance, **kwargs):
+    invalidate(RelGarageService.objects.filter(service=instance).values_list('garage_id', flat=True))
+
+
+def service_category_changed(sender, instance, **kwargs):
+    invalidate(RelGarageServiceCategory.objects.filter(servicecategory=instance).values_list('garage_id', flat=True))
@@ -2,6 +2,7 @@ from rest_framework import serializers, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from GMSApp.models import Accessories
+from GMSApp.modules.api.utils import catalog
 
 class AccessorySerializer(serializers.ModelSerializer):
     """
@@ -50,23 +51,7 @@ class AccessoryListAPIView(APIView):
     
     def get(self, request, format=None):
         try:
-            # Get all active accessories ordered by creation date (newest first)
-            accessories = Accessories.objects.filter(
-                status='active'
-            ).order_by('-created_at')
-            
-            # Serialize the data
-            serializer = AccessorySerializer(
-                accessories,
-                many=True,
-                context=self.get_serializer_context()
-            )
-            
-            return Response({
-                'status': 'success',
-                'message': 'Accessories retrieved successfully',
-                'data': serializer.data
-            }, status=status.HTTP_200_OK)
+            return catalog.catalog_response(request, catalog.ACCESSORIES, (), self.build)
             
         except Exception as e:
             return Response({
@@ -74,3 +59,22 @@ class AccessoryListAPIView(APIView):
                 'message': str(e),
                 'data': []
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def build(self, request):
+        # Get all active accessories ordered by creation date (newest first)
+        accessories = Accessories.objects.filter(
+            status='active'
+        ).order_by('-created_at')
+        
+        # Serialize the data
+        serializer = AccessorySerializer(
+            accessories,
+            many=True,
+            context=self.get_serializer_context()
+        )
+        
+        return {
+            'status': 'success',
+            'message': 'Accessories retrieved successfully',
+            'data': serializer.data
+        }, status.HTTP_200_OK
@@ -2,6 +2,7 @@ from rest_framework import serializers, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from GMSApp.models import Brand
+from GMSApp.modules.api.utils import catalog
 
 class BrandSerializer(serializers.ModelSerializer):
     """
@@ -41,21 +42,7 @@ class BrandListAPIView(APIView):
             
     def get(self, request, format=None):
         try:
-            # Get all active brands ordered by creation date
-            brands = Brand.objects.filter(status='active').order_by('-created_at')
-            
-            # Serialize the data with request context
-            serializer = BrandSerializer(
-                brands, 
-                many=True,
-                context=self.get_serializer_context()
-            )
-            
-            return Response({
-                'success': True,
-                'message': 'Brands retrieved successfully',
-                'data': serializer.data
-            }, status=status.HTTP_200_OK)
+            return catalog.catalog_response(request, catalog.BRANDS, (), self.build)
             
         except Exception as e:
             return Response({
@@ -63,3 +50,20 @@ class BrandListAPIView(APIView):
                 'message': 'Error retrieving brands',
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def build(self, request):
+        # Get all active brands ordered by creation date
+        brands = Brand.objects.filter(status='active').order_by('-created_at')
+        
+        # Serialize the data with request context
+        serializer = BrandSerializer(
+            brands, 
+            many=True,
+            context=self.get_serializer_context()
+        )
+        
+        return {
+            'success': True,
+            'message': 'Brands retrieved successfully',
+            'data': serializer.data
+        }, status.HTTP_200_OK
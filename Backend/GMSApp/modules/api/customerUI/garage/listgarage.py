@@ -1,10 +1,12 @@
 from math import atan2, cos, radians, sin, sqrt
 
+import numpy as np
 from rest_framework import serializers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from GMSApp.models import City, Garage, RelGarageServiceCategory, RelGarageVehicleType
+from GMSApp.models import City
+from GMSApp.modules.api.customerUI.garage import citysnapshot, nearby
 
 
 class GarageSerializer(serializers.Serializer):
@@ -142,7 +144,8 @@ class ListGarageAPIView(APIView):
         "rating": [], // [1,2,3,4] 1 for 4.5+ stars and 2 for 4.0+ stars and 3 for 3.5+ stars and 4 for 3.0+ stars
         "distence": [], // [1] or [2] or [3] 1 for 1km and 2 for 3km and 3 for 5km
         "service": [] // [1,2,3,5] service category IDs
-        }
+        },
+    "limit": 20 // optional, only the first N garages
     }
     """
     
@@ -175,9 +178,9 @@ class ListGarageAPIView(APIView):
             user_lat = float(latitude)
             user_lon = float(longitude)
             
-            # First get the city ID for the location
+            # First get the city ID for the location, with its garage snapshot version
             try:
-                city = City.objects.get(name__iexact=location)
+                city = City.objects.values('id', 'name', 'garage_version__version').get(name__iexact=location)
             except City.DoesNotExist:
                 return Response(
                     {
@@ -187,76 +190,21 @@ class ListGarageAPIView(APIView):
                     },
                     status=status.HTTP_404_NOT_FOUND
                 )
-                
+
+            # Garages of the city, served from the in-memory snapshot
+            snapshot = citysnapshot.get_snapshot(city['id'], city['garage_version__version'] or 0)
+
             # Apply filters if provided
             filters = request.data.get('filter', {})
             wheeler_values = request.data.get('vehicle_type_wheeler', None)
-            # Build garage query filters
-            garage_filters = {'city': city, 'displayed': True}
-            
+            limit = request.data.get('limit')
+            limit = int(limit) if limit else None
+            candidates = np.ones(len(snapshot), dtype=bool)
+
             # Filter by vehicle_type_wheeler if specified
             if wheeler_values:
-                garage_ids_with_wheelers = RelGarageVehicleType.objects.filter(
-                    vehicletype__wheeler=wheeler_values
-                ).values_list('garage_id', flat=True)
-                garages = Garage.objects.filter(
-                    id__in=garage_ids_with_wheelers,
-                    **garage_filters
-                ).order_by('position')
-            else:
-                garages = Garage.objects.filter(**garage_filters).order_by('position')
-            
-            garage_data_list = []
-            for garage in garages:
-                # Create a dictionary with garage data and address information
-                city_name = garage.city.name if hasattr(garage, 'city') and garage.city and hasattr(garage.city, 'name') else ''
-                
-                # Get vehicle types for this garage
-                vehicle_types = []
-                for rel in garage.rel_garage_vehicletype.select_related('vehicletype').all():
-                    vehicle_types.append({
-                        'id': rel.vehicletype.id,
-                        'name': rel.vehicletype.name,
-                        'wheeler': rel.vehicletype.wheeler,
-                        'is_ev': rel.vehicletype.is_ev
-                    })
-                
-                garage_data = {
-                    'id': garage.id,
-                    'name': garage.name,
-                    'logo': garage.logo,
-                    'city': city_name,
-                    'address': garage.address if hasattr(garage, 'address') else '',
-                    'landmark': garage.landmark if hasattr(garage, 'landmark') else '',
-                    'state': garage.state if hasattr(garage, 'state') else '',
-                    'postal_code': garage.postal_code if hasattr(garage, 'postal_code') else '',
-                    'latitude': garage.latitude,
-                    'longitude': garage.longitude,
-                    'distance': None,  # Default to None for missing distances
-                    'rating': float(garage.rating) if hasattr(garage, 'rating') and garage.rating is not None else 0.0,
-                    'location': garage.location if hasattr(garage, 'location') else '',
-                    'is_exclusive': garage.is_exclusive if hasattr(garage, 'is_exclusive') else False,
-                    'is_verified': garage.is_verified if hasattr(garage, 'is_verified') else False,
-                    'is_offer': garage.is_offer if hasattr(garage, 'is_offer') else False,
-                    'offer_text': garage.offer_text if hasattr(garage, 'offer_text') else None,
-                    'vehicle_types': vehicle_types
-                }
-                
-                # Only calculate distance if both coordinates are valid
-                if garage.latitude is not None and garage.longitude is not None:
-                    try:
-                        distance = haversine(
-                            user_lat, 
-                            user_lon,
-                            float(garage.latitude),
-                            float(garage.longitude)
-                        )
-                        garage_data['distance'] = round(distance, 2)
-                    except (ValueError, TypeError):
-                        pass  # Keep None as distance
-                
-                garage_data_list.append(garage_data)
-            
+                candidates &= snapshot.wheeler_mask(wheeler_values)
+
             # Filter by rating if specified
             if 'rating' in filters and filters['rating']:
                 # Map rating filter values to minimum rating thresholds
@@ -266,58 +214,73 @@ class ListGarageAPIView(APIView):
                     3: 3.5,  # 3.5+ stars
                     4: 3.0   # 3.0+ stars
                 }
-                # Get all selected rating thresholds
+                # Matching ANY of the selected thresholds means matching the lowest one
                 selected_thresholds = [rating_map[r] for r in filters['rating']]
-                # Filter garages that match ANY of the selected rating thresholds
-                garage_data_list = [g for g in garage_data_list 
-                                 if g['rating'] is not None 
-                                 and any(g['rating'] >= threshold for threshold in selected_thresholds)]
-            
+                candidates &= snapshot.ratings >= min(selected_thresholds)
+
             # Filter by distance if specified
+            max_distance = None
             if 'distence' in filters and filters['distence']:
                 distance_filter = filters['distence'][0]  # Get the first (and only) value from the array
-                max_distance = 0                
+                max_distance = 0
                 # Map filter values to actual distances in km
                 if distance_filter == 1:
                     max_distance = 1.0  # Within 1 km
                 elif distance_filter == 2:
                     max_distance = 3.0  # Within 3 km
                 elif distance_filter == 3:
-                    max_distance = 5.0  # Within 5 km                
-                # Filter garages within the specified distance
-                garage_data_list = [g for g in garage_data_list 
-                                 if g['distance'] is not None 
-                                 and g['distance'] <= max_distance]
-            
+                    max_distance = 5.0  # Within 5 km
+                # Bounding box pre-filter, widened by the rounding margin as
+                # distances are compared rounded to 2 places
+                min_lat, max_lat, min_lon, max_lon = nearby.bounding_box(user_lat, user_lon, max_distance + 0.005)
+                candidates &= (snapshot.lats >= min_lat) & (snapshot.lats <= max_lat)
+                if min_lon is not None:
+                    candidates &= (snapshot.lons >= min_lon) & (snapshot.lons <= max_lon)
+
             # Filter by service if specified
             if 'service' in filters and filters['service']:
-                service_ids = filters['service']
-                garage_ids_with_services = set(RelGarageServiceCategory.objects.filter(
-                    servicecategory_id__in=service_ids
-                ).values_list('garage_id', flat=True))
-                garage_data_list = [g for g in garage_data_list 
-                                 if g['id'] in garage_ids_with_services]               
-            
+                candidates &= snapshot.service_mask(filters['service'])
+
+            # Vectorized haversine over the candidates; garages without
+            # coordinates get NaN and keep None as distance
+            indexes = np.flatnonzero(candidates)
+            distances = nearby.haversine_km(user_lat, user_lon, snapshot.lats[indexes], snapshot.lons[indexes])
+            garage_data_list = []
+            for i, distance in zip(indexes.tolist(), distances.tolist()):
+                garage_data = dict(snapshot.rows[i], city=city['name'], distance=None)
+                if garage_data['latitude'] is not None and garage_data['longitude'] is not None:
+                    if nearby.on_rounding_edge(distance):
+                        # NumPy and math may differ in the last bit; settle halves the scalar way
+                        distance = haversine(user_lat, user_lon, float(garage_data['latitude']), float(garage_data['longitude']))
+                    garage_data['distance'] = round(distance, 2)
+                if max_distance is None or (garage_data['distance'] is not None and garage_data['distance'] <= max_distance):
+                    garage_data_list.append(garage_data)
+
             # Apply sorting if specified
             if 'sort' in filters and filters['sort']:
-                sort_options = filters['sort']                
+                sort_options = filters['sort']
                 # Define a key function for sorting
                 def get_sort_key(garage):
-                    key_parts = []         
+                    key_parts = []
                     for option in sort_options:
                         if option == 1:  # Sort by rating (highest first)
                             key_parts.append(-garage['rating'] if garage['rating'] is not None and garage['rating'] > 0 else float('inf'))
                         elif option == 2:  # Sort by distance (nearest first)
-                            key_parts.append(garage['distance'] if garage['distance'] is not None else float('inf'))                    
+                            key_parts.append(garage['distance'] if garage['distance'] is not None else float('inf'))
                     # Always use ID as the final tiebreaker
                     key_parts.append(garage['id'])
-                    return tuple(key_parts)                
+                    return tuple(key_parts)
                 # Sort the list using our key function
                 garage_data_list.sort(key=get_sort_key)
+                if limit:
+                    garage_data_list = garage_data_list[:limit]
 
             else:
-                # Default sort by distance if no sort specified
-                garage_data_list.sort(key=lambda x: (float('inf') if x['distance'] is None else x['distance'], x['id']))
+                # Default sort by distance (rounded, as returned) and id; with
+                # a limit only the nearest are partially sorted
+                rounded = np.array([np.nan if g['distance'] is None else g['distance'] for g in garage_data_list])
+                order = nearby.nearest_order(rounded, [g['id'] for g in garage_data_list], limit)
+                garage_data_list = [garage_data_list[i] for i in order.tolist()]
             
             # Serialize the data
             serializer = GarageSerializer(
@@ -3,6 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.db.models import Q
 from GMSApp.models import Model
+from GMSApp.modules.api.utils import catalog
 
 class ModelSerializer(serializers.ModelSerializer):
     """
@@ -53,24 +54,7 @@ class ModelListAPIView(APIView):
                     'message': 'id parameter is required'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Get all active models for the specified brand, ordered by name
-            models = Model.objects.filter(
-                brand_id=brand_id,
-                status='active'
-            ).order_by('name')
-            
-            # Serialize the data with request context
-            serializer = ModelSerializer(
-                models, 
-                many=True,
-                context=self.get_serializer_context()
-            )
-            
-            return Response({
-                'success': True,
-                'message': 'Models retrieved successfully',
-                'data': serializer.data
-            }, status=status.HTTP_200_OK)
+            return catalog.catalog_response(request, catalog.MODELS, (brand_id,), self.build)
             
         except Exception as e:
             return Response({
@@ -78,3 +62,23 @@ class ModelListAPIView(APIView):
                 'message': 'Error retrieving models',
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def build(self, request):
+        # Get all active models for the specified brand, ordered by name
+        models = Model.objects.filter(
+            brand_id=request.query_params.get('id'),
+            status='active'
+        ).order_by('name')
+        
+        # Serialize the data with request context
+        serializer = ModelSerializer(
+            models, 
+            many=True,
+            context=self.get_serializer_context()
+        )
+        
+        return {
+            'success': True,
+            'message': 'Models retrieved successfully',
+            'data': serializer.data
+        }, status.HTTP_200_OK
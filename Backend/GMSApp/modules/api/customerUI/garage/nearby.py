@@ -0,0 +1,62 @@
+"""
+Helpers for nearest-garage search: a bounding box for the indexed
+latitude/longitude pre-filter, a vectorized haversine and a partial sort
+for the nearest N.
+"""
+from math import asin, cos, degrees, radians, sin
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # same radius as listgarage.haversine
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Returns (min_lat, max_lat, min_lon, max_lon) enclosing every point within
+    radius_km of (lat, lon). The longitude bounds are None when the circle
+    reaches a pole or crosses the antimeridian.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    delta_lat = degrees(angular)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+
+    ratio = sin(angular) / cos(radians(lat))
+    if ratio >= 1:
+        return min_lat, max_lat, None, None
+    delta_lon = degrees(asin(ratio))
+    min_lon, max_lon = lon - delta_lon, lon + delta_lon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def haversine_km(lat, lon, lats, lons):
+    """ Great circle distances in km from (lat, lon) to each point of the lats/lons arrays. """
+    lat1, lon1 = radians(lat), radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def nearest_order(distances, ids, limit=None):
+    """
+    Indexes ordering by (distance, id), missing distances (NaN) last. With
+    limit only the nearest limit are returned: np.argpartition picks the
+    candidates, ties at the cut-off included, and only those are sorted.
+    """
+    keys = np.where(np.isnan(distances), np.inf, distances)
+    ids = np.asarray(ids)
+    if limit is not None and limit < len(keys):
+        cutoff = np.partition(keys, limit - 1)[limit - 1]
+        candidates = np.flatnonzero(keys <= cutoff)
+        order = candidates[np.lexsort((ids[candidates], keys[candidates]))]
+        return order[:limit]
+    return np.lexsort((ids, keys))
+
+
+def on_rounding_edge(distance, places=2, tolerance=1e-9):
+    """ True when distance is within tolerance of a half unit of the rounding place. """
+    scaled = distance * 10 ** places
+    return abs(scaled - int(scaled) - 0.5) < tolerance
@@ -1,8 +1,8 @@
 from rest_framework import serializers, status
-from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from GMSApp.models import Banner, City, RelCityServiceCategory, ServiceCategory
+from GMSApp.modules.api.utils import catalog
 
 
 class CitySerializer(serializers.ModelSerializer):
@@ -57,6 +57,10 @@ class ActiveCityListAPIView(APIView):
     - GET /api/active-cities/?city=pune - Gets all active cities and banners for the specified city
     """
     def get(self, request, format=None):
+        city_name = request.query_params.get('city', '').strip().lower()
+        return catalog.catalog_response(request, catalog.CITIES, (city_name,), self.build)
+
+    def build(self, request):
         city_name = request.query_params.get('city', '').strip().lower()
         response_data = {}
         
@@ -128,21 +132,18 @@ class ActiveCityListAPIView(APIView):
                 message = f'Active cities, banners and services for {city_name} retrieved successfully'
                 
             except City.DoesNotExist:
-                return Response(
-                    {
-                        'status': 'error', 
-                        'message': 'City not found or inactive',
-                        'data': {
-                            'cities': city_name
-                        }
-                    },
-                    status=status.HTTP_404_NOT_FOUND
-                )
+                return {
+                    'status': 'error', 
+                    'message': 'City not found or inactive',
+                    'data': {
+                        'cities': city_name
+                    }
+                }, status.HTTP_404_NOT_FOUND
         else:
             message = 'Active cities retrieved successfully'
         
-        return Response({
+        return {
             'status': 'success',
             'message': message,
             'data': response_data
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status.HTTP_200_OK
\ No newline at end of file
@@ -1,13 +1,13 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-import requests
+from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-import urllib.parse
 import random
-from django.shortcuts import get_object_or_404
-from GMSApp.models import SendOtp
+from GMSApp.models import OutboundMessage, SendOtp
+from GMSApp.modules import outbox
+from GMSApp.modules.messaging import sms
 
 @method_decorator(csrf_exempt, name='dispatch')
 class SendSMSAPI(APIView):
@@ -15,7 +15,7 @@ class SendSMSAPI(APIView):
     
     def post(self, request, *args, **kwargs):
         """
-        Send SMS with OTP to a single mobile number and save to SendOtp model
+        Save an OTP to the SendOtp model and queue the SMS with it for a single mobile number
         Expected POST data:
         {
             "mobile": "98xxxxxxxx"
@@ -32,61 +32,23 @@ class SendSMSAPI(APIView):
         # Generate 6-digit OTP
         otp = str(random.randint(1000, 9999))
         
-        SENDER_ID = "PVYINF"
-        AUTH_KEY = "8f461d3fef716d11e81141753a55eda"
-
-        # Construct the full URL with parameters
-        base_url = "http://msg.pvyinfotech.com/rest/services/sendSMS/sendGroupSms"
-        full_url = (
-            f"{base_url}?"
-            f"AUTH_KEY={AUTH_KEY}&"
-            f"message=Dear%20user%20of%20BIKEDOOT,%20Your%20Login%20OTP%20is%20{otp}.%20Pls%20do%20not%20share%20it%20with%20anyone.%20Regards%20PVY%20INFOTECH&"
-            f"senderId={SENDER_ID}&"
-            "routeId=1&"
-            f"mobileNos={mobile}&"
-            "smsContentType=english"
-        )
-        
-        # Set headers
-        headers = {
-            "Content-Type": "application/json",
-            "Cache-Control": "no-cache"
-        }
-        
-        try:
-            # Make the GET request to the SMS gateway
-            response = requests.get(full_url, headers=headers)
-            response.raise_for_status()
-            
-            # Parse the response
-            result = response.json()
-            
-            # Check if the SMS was sent successfully
-            if isinstance(result, dict) and result.get('responseCode') == '3001':
-                # Save OTP to database
-                SendOtp.objects.create(
-                    phone=mobile,
-                    otp=otp
-                )
-                return Response({
-                    "status": True, 
-                    "message": "SMS with OTP sent successfully"
-                })
-            else:
-                return Response(
-                    {                        
-                        "status": False,
-                        "message": "Failed to send SMS"
-                    }, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-                
-        except requests.exceptions.RequestException as e:
-            return Response(
-                {
-                               
-                    "status": False,
-                    "message": f"Failed to send SMS: {str(e)}"
-                }, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        # Save the OTP and queue the SMS; `manage.py run_outbox` delivers it
+        with transaction.atomic():
+            SendOtp.objects.create(
+                phone=mobile,
+                otp=otp
+            )
+            outbox.enqueue(
+                OutboundMessage.SMS,
+                mobile,
+                {'text': sms.OTP_MESSAGE.format(otp=otp)},
+                replace_pending=True,
             )
+        
+        return Response(
+            {
+                "status": True, 
+                "message": "SMS with OTP queued for delivery"
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
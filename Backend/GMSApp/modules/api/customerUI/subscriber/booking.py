@@ -1,6 +1,7 @@
 import logging
 
 from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from rest_framework import serializers, status
 from rest_framework.decorators import action
@@ -21,25 +22,36 @@ from GMSApp.models import (
     SubscriberVehicle,
     Vehicle,
 )
+from GMSApp.modules.api.utils.relatedids import BulkRelatedIdsMixin, RelatedIdField
 
 logger = logging.getLogger(__name__)
 
-class BookingTimelineSerializer(serializers.ModelSerializer):
-    booking = serializers.PrimaryKeyRelatedField(queryset=SubscriberBooking.objects.all())
-    status = serializers.PrimaryKeyRelatedField(queryset=BookingStatus.objects.all())
+class BookingTimelineSerializer(BulkRelatedIdsMixin, serializers.ModelSerializer):
+    booking = RelatedIdField(SubscriberBooking, source='booking_id')
+    status = RelatedIdField(BookingStatus, source='status_id')
     
     class Meta:
         model = BookingTimeline
         fields = ['id', 'booking', 'status', 'remark', 'created_at']
         read_only_fields = ['created_at']
 
-class SubscriberBookingSerializer(serializers.ModelSerializer):
-    subscriber = serializers.PrimaryKeyRelatedField(queryset=Subscriber.objects.all())
-    subscribervehicle = serializers.PrimaryKeyRelatedField(queryset=SubscriberVehicle.objects.all())
-    subscriberaddress = serializers.PrimaryKeyRelatedField(queryset=SubscriberAddress.objects.all())
-    garage = serializers.PrimaryKeyRelatedField(queryset=Garage.objects.all())
-    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all(), required=False, allow_null=True)
-    vehicle = serializers.PrimaryKeyRelatedField(queryset=Vehicle.objects.all(), required=False, allow_null=True)
+
+def with_timeline(bookings):
+    """ Prefetches the timeline of every booking, newest first, with its status, in one query. """
+    return bookings.prefetch_related(Prefetch(
+        'bookingtimeline',
+        queryset=BookingTimeline.objects.select_related('status').order_by('-created_at'),
+        to_attr='timeline_entries',
+    ))
+
+
+class SubscriberBookingSerializer(BulkRelatedIdsMixin, serializers.ModelSerializer):
+    subscriber = RelatedIdField(Subscriber, source='subscriber_id')
+    subscribervehicle = RelatedIdField(SubscriberVehicle, source='subscribervehicle_id')
+    subscriberaddress = RelatedIdField(SubscriberAddress, source='subscriberaddress_id')
+    garage = RelatedIdField(Garage, source='garage_id')
+    customer = RelatedIdField(Customer, source='customer_id', required=False, allow_null=True)
+    vehicle = RelatedIdField(Vehicle, source='vehicle_id', required=False, allow_null=True)
     current_status = serializers.SerializerMethodField()
     timeline = serializers.SerializerMethodField()
     
@@ -65,9 +77,16 @@ class SubscriberBookingSerializer(serializers.ModelSerializer):
             )
         ]
     
+    def timeline_entries(self, obj):
+        # Prefetched by with_timeline(); otherwise loaded once and kept on the booking
+        if not hasattr(obj, 'timeline_entries'):
+            obj.timeline_entries = list(obj.bookingtimeline.select_related('status').order_by('-created_at'))
+        return obj.timeline_entries
+    
     def get_current_status(self, obj):
-        latest_timeline = obj.bookingtimeline.order_by('-created_at').first()
-        if latest_timeline and hasattr(latest_timeline, 'status'):
+        entries = self.timeline_entries(obj)
+        if entries:
+            latest_timeline = entries[0]
             return {
                 'status': latest_timeline.status.name,  # Use name field instead of status
                 'displayname': latest_timeline.status.displayname,  # Use displayname field
@@ -76,9 +95,7 @@ class SubscriberBookingSerializer(serializers.ModelSerializer):
         return None
     
     def get_timeline(self, obj):
-        # Use the correct related name 'bookingtimeline' (all lowercase)
-        timeline = obj.bookingtimeline.order_by('-created_at')
-        return BookingTimelineSerializer(timeline, many=True).data
+        return BookingTimelineSerializer(self.timeline_entries(obj), many=True).data
     
     def validate_booking_date(self, value):
         if value < timezone.now().date():
@@ -101,10 +118,7 @@ class SubscriberBookingSerializer(serializers.ModelSerializer):
         # Create initial timeline entry with 'booking_confirmed' status
         try:
             status_obj = BookingStatus.objects.get(name='booking_confirmed')
-            BookingTimeline.objects.create(
-                booking=booking,
-                status=status_obj
-            )
+            BookingTimeline.record(booking.id, status_obj)
         except BookingStatus.DoesNotExist:
             pass
             
@@ -174,11 +188,7 @@ class BookingStatusUpdateView(APIView):
             )
 
         try:
-            timeline = BookingTimeline.objects.create(
-                booking=booking,
-                status=status_obj,
-                remark=remark
-            )
+            timeline = BookingTimeline.record(booking.id, status_obj, remark)
             return Response(
                 {
                     'status': True,
@@ -294,8 +304,7 @@ class SubscriberBookingAPI(APIView):
                     )
                 
                 # Check if booking is already cancelled
-                latest_status = booking.bookingtimeline.order_by('-created_at').first()
-                if latest_status and latest_status.status.status == 'cancelled':
+                if booking.current_status_id and booking.current_status.name == 'cancelled':
                     return Response(
                         {
                             'status': False,
@@ -307,10 +316,7 @@ class SubscriberBookingAPI(APIView):
                 # Create new timeline entry for cancellation
                 try:
                     status_obj = BookingStatus.objects.get(name='cancelled')
-                    BookingTimeline.objects.create(
-                        booking=booking,
-                        status=status_obj
-                    )
+                    BookingTimeline.record(booking.id, status_obj)
                     
                     return Response(
                         {
@@ -354,9 +360,9 @@ class SubscriberBookingAPI(APIView):
                     raise ValueError("subscriber_id must be a positive integer")
                 
                 # Get all bookings for the subscriber
-                bookings = SubscriberBooking.objects.filter(
+                bookings = with_timeline(SubscriberBooking.objects.filter(
                     subscriber_id=subscriber_id
-                ).order_by('-booking_date', '-id')
+                ).order_by('-booking_date', '-id'))
                 
                 # Serialize the data
                 serializer = SubscriberBookingSerializer(bookings, many=True)
@@ -398,7 +404,7 @@ class SubscriberBookingAPI(APIView):
             )
         
         try:
-            booking = SubscriberBooking.objects.get(id=booking_id)
+            booking = with_timeline(SubscriberBooking.objects).get(id=booking_id)
             serializer = SubscriberBookingSerializer(booking)
             
             return Response(
@@ -470,6 +476,10 @@ class SubscriberBookingAPI(APIView):
         
         # Save the booking first without customer association
         booking = serializer.save()
+        # The serializer only checked the related ids: load the rows used below in one query
+        booking = SubscriberBooking.objects.select_related(
+            'subscriber', 'garage', 'subscriberaddress', 'subscribervehicle__model__brand'
+        ).get(pk=booking.pk)
         
         # Get or create customer from subscriber
         try:
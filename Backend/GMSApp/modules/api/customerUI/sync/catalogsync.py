@@ -0,0 +1,114 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from dateutil.parser import parse
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from GMSApp.models import Accessories, Banner, Brand, CC, City, Model, ServiceCategory, SyncTombstone
+
+# Response key -> (model, fields); rows with an image_path also get an absolute 'image'
+SYNC_TABLES = {
+    'brands': (Brand, ('id', 'name', 'status', 'image_path')),
+    'models': (Model, ('id', 'brand_id', 'cc_id', 'vehicletype', 'name', 'status', 'image_path')),
+    'ccs': (CC, ('id', 'name', 'from_value', 'to_value', 'status')),
+    'cities': (City, ('id', 'name', 'status')),
+    'banners': (Banner, ('id', 'city_id', 'order', 'status', 'image_path')),
+    'accessories': (Accessories, ('id', 'name', 'price', 'gst', 'description', 'status', 'image_path')),
+    'service_categories': (ServiceCategory, ('id', 'name', 'status', 'image_path')),
+}
+SYNC_SOURCES = {model: table for table, (model, _) in SYNC_TABLES.items()}
+
+TOKEN_SALT = 'catalog-sync'
+# Rows saved just before a sync may commit after it; the next sync starts this many seconds earlier
+SYNC_TOKEN_OVERLAP = getattr(settings, 'SYNC_TOKEN_OVERLAP', 60)
+SYNC_TOMBSTONE_RETENTION_DAYS = getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+
+
+def make_token(moment):
+    return signing.dumps({'t': moment.isoformat()}, salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token):
+    """ Returns the moment a token was issued for, or raises ValueError. """
+    try:
+        return parse(signing.loads(token, salt=TOKEN_SALT)['t'])
+    except (signing.BadSignature, KeyError, TypeError, OverflowError) as e:
+        raise ValueError(str(e))
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """ post_delete of a synced catalog table """
+    SyncTombstone.objects.create(table=SYNC_SOURCES[sender], row_id=instance.pk)
+
+
+class CatalogSyncAPIView(APIView):
+    """
+    API endpoint returning the catalog rows created, updated or deleted since a sync token
+
+    Query Parameters:
+    - since: token returned by the previous sync (optional; without it, or
+      when it is older than the tombstone retention, everything is returned
+      and "full" is true)
+
+    Example: /api/sync/?since=<token>
+
+    Response data:
+    {
+        "token": "<token for the next sync>",
+        "full": false,
+        "brands": {"upserted": [{...}], "deleted": [3, 7]},
+        "models": {...}, "ccs": {...}, "cities": {...}, "banners": {...},
+        "accessories": {...}, "service_categories": {...}
+    }
+    Rows near the token boundary can be sent again; clients apply upserts by id.
+    """
+
+    def get(self, request, format=None):
+        now = timezone.now()
+        since = None
+        token = request.query_params.get('since')
+        if token:
+            try:
+                since = read_token(token)
+            except ValueError:
+                return Response({
+                    'status': 'error',
+                    'message': 'Invalid sync token, sync again without since',
+                    'data': []
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Tombstones older than the retention are pruned, so such tokens get everything
+        full = since is None or since < now - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+        base_url = f"{request.scheme}://{request.get_host()}"
+
+        deleted = {}
+        if not full:
+            for table, row_id in SyncTombstone.objects.filter(deleted_at__gte=since).values_list('table', 'row_id'):
+                deleted.setdefault(table, []).append(row_id)
+
+        response_data = {'token': make_token(now - timedelta(seconds=SYNC_TOKEN_OVERLAP)), 'full': full}
+        for table, (model, fields) in SYNC_TABLES.items():
+            rows = model.objects.order_by('id')
+            if not full:
+                rows = rows.filter(updated_at__gte=since)
+            upserted = []
+            for row in rows.values(*fields):
+                for field, value in row.items():
+                    if isinstance(value, Decimal):
+                        row[field] = str(value)  # as the catalog serializers render decimals
+                if 'image_path' in row:
+                    image_path = row.pop('image_path')
+                    row['image'] = f"{base_url}/{image_path.lstrip('/')}" if image_path else None
+                upserted.append(row)
+            response_data[table] = {'upserted': upserted, 'deleted': deleted.get(table, [])}
+
+        return Response({
+            'status': 'success',
+            'message': 'Catalog changes retrieved successfully',
+            'data': response_data
+        }, status=status.HTTP_200_OK)
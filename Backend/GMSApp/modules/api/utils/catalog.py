@@ -0,0 +1,110 @@
+"""
+Versioned catalog responses for the customer app's near-static endpoints
+(brands, models, cities, accessories).
+
+Every catalog has a CatalogVersion row, bumped by the signals of its source
+tables. Responses carry a strong ETag over the catalog version, the request
+parameters and the host the image URLs are built for, so If-None-Match is
+answered with 304 after a single version query. Rendered JSON is kept in a
+process-local LRU keyed by the same values.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from GMSApp.models import (
+    Accessories, Banner, Brand, CatalogVersion, City, Model, RelCityServiceCategory, ServiceCategory,
+)
+from GMSApp.modules.api.utils import conditional
+
+BRANDS = 'brand'
+MODELS = 'model'
+CITIES = 'city'
+ACCESSORIES = 'accessory'
+
+# Source table -> catalog whose responses it appears in
+CATALOG_SOURCES = {
+    Brand: BRANDS,
+    Model: MODELS,
+    City: CITIES,
+    Banner: CITIES,
+    ServiceCategory: CITIES,
+    RelCityServiceCategory: CITIES,
+    Accessories: ACCESSORIES,
+}
+
+# Clients keep catalog responses and revalidate them with If-None-Match
+CATALOG_CACHE_CONTROL = 'public, no-cache'
+CATALOG_CACHE_SIZE = getattr(settings, 'CATALOG_CACHE_SIZE', 512)
+
+
+class RenderedCache:
+    """ Thread-safe LRU of key -> (status code, rendered JSON). """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+rendered_cache = RenderedCache(CATALOG_CACHE_SIZE)
+
+
+def catalog_version(name):
+    return CatalogVersion.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+
+def bump_catalog_version(name):
+    if not CatalogVersion.objects.filter(name=name).update(version=F('version') + 1):
+        CatalogVersion.objects.get_or_create(name=name, defaults={'version': 1})
+
+
+def catalog_changed(sender, **kwargs):
+    """ post_save / post_delete of a catalog source table """
+    bump_catalog_version(CATALOG_SOURCES[sender])
+
+
+def catalog_response(request, name, params, build):
+    """
+    Response of a catalog endpoint. build(request) returns (data, status
+    code) and is only called when the rendered JSON for the catalog
+    version, params and host is not cached. 200 responses carry the ETag.
+    """
+    base_url = f"{request.scheme}://{request.get_host()}"
+    version = catalog_version(name)
+    etag = conditional.make_etag(name, version, base_url, *params)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified_response(etag, CATALOG_CACHE_CONTROL)
+
+    key = (name, version, base_url, *params)
+    entry = rendered_cache.get(key)
+    if entry is None:
+        data, status_code = build(request)
+        entry = (status_code, JSONRenderer().render(data))
+        rendered_cache.set(key, entry)
+
+    status_code, content = entry
+    response = HttpResponse(content, status=status_code, content_type='application/json')
+    if status_code == status.HTTP_200_OK:
+        response['ETag'] = etag
+        response['Cache-Control'] = CATALOG_CACHE_CONTROL
+    return response
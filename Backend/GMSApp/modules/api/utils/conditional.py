@@ -0,0 +1,31 @@
+"""
+Conditional GET helpers for the customer API: strong ETags derived from
+payload versions and 304 answers to If-None-Match.
+"""
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """ Strong, quoted ETag over the given parts. """
+    return quote_etag(hashlib.sha1('\x1f'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def is_not_modified(request, etag):
+    """ True when the If-None-Match header of the request matches etag (weak comparison, per RFC 9110). """
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in (e.removeprefix('W/') for e in etags)
+
+
+def not_modified_response(etag, cache_control=None):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = etag
+    if cache_control:
+        response['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,80 @@
+"""
+Foreign key fields for write serializers that validate their ids in bulk.
+
+PrimaryKeyRelatedField fetches the related row of every field it parses,
+one query each. RelatedIdField only parses the id (point its source at the
+<fk>_id attribute) and BulkRelatedIdsMixin checks all of them with a single
+UNION query, reporting missing rows with PrimaryKeyRelatedField's messages
+next to the other field errors.
+"""
+from collections.abc import Mapping
+
+from django.db.models import CharField, Value
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+
+class RelatedIdField(serializers.Field):
+    default_error_messages = serializers.PrimaryKeyRelatedField.default_error_messages
+
+    def __init__(self, model, **kwargs):
+        self.model = model
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+    def to_representation(self, value):
+        return value
+
+
+def missing_related_ids(fields, attrs):
+    """ {field name: id} of the RelatedIdField values in attrs without a row, in one query """
+    checks = {
+        name: (field.model, attrs[field.source])
+        for name, field in fields.items()
+        if isinstance(field, RelatedIdField) and attrs.get(field.source) is not None
+    }
+    if not checks:
+        return {}
+
+    querysets = [
+        model.objects.filter(pk=pk).order_by().annotate(
+            field_name=Value(name, output_field=CharField())
+        ).values_list('field_name', flat=True)
+        for name, (model, pk) in checks.items()
+    ]
+    found = set(querysets[0].union(*querysets[1:], all=True))
+    return {name: pk for name, (_, pk) in checks.items() if name not in found}
+
+
+class BulkRelatedIdsMixin:
+    def to_internal_value(self, data):
+        try:
+            attrs = super().to_internal_value(data)
+            errors = {}
+        except serializers.ValidationError as exc:
+            if not isinstance(data, Mapping):
+                raise
+            # Still check the ids that parsed, as PrimaryKeyRelatedField would have
+            errors = exc.detail
+            attrs = {}
+            for name, field in self.fields.items():
+                if isinstance(field, RelatedIdField) and name not in errors:
+                    try:
+                        attrs[field.source] = field.run_validation(field.get_value(data))
+                    except (serializers.ValidationError, SkipField):
+                        pass
+
+        for name, pk in missing_related_ids(self.fields, attrs).items():
+            errors[name] = [self.fields[name].error_messages['does_not_exist'].format(pk_value=pk)]
+        if errors:
+            ordered = {name: errors[name] for name in self.fields if name in errors}
+            ordered.update(errors)
+            raise serializers.ValidationError(ordered)
+        return attrs
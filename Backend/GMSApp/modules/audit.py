@@ -1,9 +1,144 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
 from GMSApp.models import AuditLog
 
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """
+    Buffers audit log records in an in-process queue and writes them from a
+    background thread with bulk_create, every batch_size records or every
+    flush_interval_ms milliseconds, whichever comes first.
+
+    The queue is bounded: when it is full new records are dropped and
+    counted in `dropped` instead of blocking the request. `duration`
+    (auto_now_add) is stamped when the batch is written, at most one flush
+    interval after the call.
+    """
+
+    def __init__(self, batch_size=100, flush_interval_ms=500, max_queue_size=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._stop = None
+
+    def _ensure_started(self):
+        # (Re)start after fork: threads and queues do not survive it
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def enqueue(self, record):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+        # Drain whatever is left on shutdown
+        self._flush_pending()
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush_pending(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            AuditLog.objects.bulk_create([AuditLog(**record) for record in batch])
+            self.written += len(batch)
+        except Exception:
+            logger.exception("Audit log batch insert failed, retrying row by row")
+            # Isolate the bad rows so one record cannot drop the whole batch
+            for record in batch:
+                try:
+                    AuditLog.objects.create(**record)
+                    self.written += 1
+                except Exception:
+                    self.failed += 1
+                    logger.exception("Audit log record dropped: %s", record)
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """ Writes all queued records from the calling thread. """
+        if self._pid == os.getpid():
+            self._flush_pending()
+
+    def shutdown(self, timeout=5):
+        """ Stops the worker thread after it has written the queued records. """
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+writer = AuditLogWriter(
+    batch_size=getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 100),
+    flush_interval_ms=getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL_MS', 500),
+    max_queue_size=getattr(settings, 'AUDIT_LOG_QUEUE_SIZE', 10000),
+)
+atexit.register(writer.shutdown)
+
+
 def create_audit_log(user, action, event, result_code):
-    AuditLog.objects.create(
-        username=user,
-        action=action,
-        event=event,
-        result_code=result_code
-    )  
\ No newline at end of file
+    record = {
+        'username': user,
+        'action': action,
+        'event': event,
+        'result_code': result_code,
+    }
+    if not getattr(settings, 'AUDIT_LOG_ASYNC', True):
+        AuditLog.objects.create(**record)
+        return
+    writer.enqueue(record)
@@ -0,0 +1,18 @@
+from django.http import JsonResponse
+from GMSApp.models import BackgroundJob
+from GMSApp.modules import managesession
+
+
+@managesession.check_session_timeout
+def r_background_job(request, context, id):
+    """ Progress of a queued bulk upload, polled by the upload pages. """
+    job = BackgroundJob.objects.filter(id=id, garage_id=context['garage_id']).values(
+        'id', 'job_type', 'status', 'file_name', 'total_count', 'processed_count',
+        'success_count', 'failed_count', 'eta_seconds', 'message',
+    ).first()
+    if job is None:
+        return JsonResponse({'status': False, 'message': 'Job not found.'}, status=404)
+
+    job['percent'] = int(job['processed_count'] * 100 / job['total_count']) if job['total_count'] else 0
+    job['finished'] = job['status'] in (BackgroundJob.DONE, BackgroundJob.FAILED)
+    return JsonResponse({'status': True, 'job': job})
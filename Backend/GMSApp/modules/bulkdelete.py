@@ -0,0 +1,395 @@
+"""
+Set-based deletes for the multi-select delete endpoints.
+
+bulk_delete() replaces the per-row loop of .first() and model.delete():
+the association checks that each model's delete() makes with one .exists()
+per relation and row are run for the whole id set, one grouped query per
+relation, and every blocked id is reported in a single ValidationError.
+Otherwise the rows are deleted with one queryset delete, which cascades
+table by table, and their files are queued in pending_file_deletion for
+`manage.py sweep_deleted_files` instead of being removed in the request.
+"""
+import logging
+import os
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from GMSApp.models import (
+    CC,
+    Accessories,
+    Banner,
+    BookingTimeline,
+    Brand,
+    City,
+    Customer,
+    Estimate,
+    Garage,
+    GarageBanner,
+    GarageGroup,
+    GarageService,
+    GarageServicetype,
+    GarageStaff,
+    Invoice,
+    Jobcard,
+    Model,
+    PendingFileDeletion,
+    ProductBrands,
+    ProductCatalogues,
+    ProductCategories,
+    ProductModel,
+    Roles,
+    ServiceCategory,
+    StockInwards,
+    SubscriberBooking,
+    Suppliers,
+    TXNService,
+    Users,
+    Vehicle,
+)
+
+FILE_SWEEP_BATCH_SIZE = getattr(settings, 'FILE_SWEEP_BATCH_SIZE', 200)
+FILE_SWEEP_MAX_ATTEMPTS = getattr(settings, 'FILE_SWEEP_MAX_ATTEMPTS', 5)
+
+
+def staff_in_booking_timeline(ids):
+    """ GarageStaff ids referenced in a booking timeline remark, as GarageStaff.delete() checks. """
+    remarks = list(BookingTimeline.objects.filter(
+        reduce(or_, (Q(remark__contains=str(staff_id)) for staff_id in ids))
+    ).values_list('remark', flat=True))
+    return {
+        staff_id: 'booking timeline records'
+        for staff_id in ids if any(str(staff_id) in remark for remark in remarks)
+    }
+
+
+# Model -> what its delete() guards and cleans up:
+#   associations: (reverse accessor, description) whose rows block the delete
+#   checks: callables(ids) returning {id: description} of further blocked ids
+#   files: (field, directory below BASE_DIR, remove the emptied directory);
+#          a list-valued field holds several paths
+BULK_DELETE_RULES = {
+    City: {
+        'associations': [
+            ('garage', 'garage'),
+            ('banner', 'banner'),
+            ('rel_city_user', 'rel city user'),
+            ('rel_city_servicecategory', 'rel city servicecategory'),
+            ('subscriberaddress', 'subscriber address'),
+        ],
+    },
+    Garage: {
+        'associations': [
+            ('rel_garage_garagegroup', 'rel garage garagegroup'),
+            ('customer', 'customer'),
+            ('vehicle', 'vehicle'),
+            ('txn_service', 'txn service'),
+            ('invoices', 'invoices'),
+            ('estimates', 'estimates'),
+            ('rel_garage_user', 'rel garage user'),
+            ('product_catalogues', 'product catalogues'),
+            ('stock_inwards', 'stock inwards'),
+            ('stock_outwards', 'stock outwards'),
+            ('inventory_supplier', 'inventory supplier'),
+            ('inventory_categories', 'inventory categories'),
+            ('inventory_brands', 'inventory brands'),
+            ('rel_garage_servicecategory', 'rel garage servicecategory'),
+            ('rel_garage_service', 'rel garage service'),
+            ('garage_banner', 'garage banner'),
+            ('subscriberbooking', 'subscriber booking'),
+            ('invoice_bulk_uploads', 'invoice bulk uploads'),
+            ('jobcard_brands', 'jobcard brands'),
+            ('jobcard_models', 'jobcard models'),
+            ('jobcard', 'jobcard'),
+            ('jobtype', 'jobtype'),
+            ('garage_vehicle_issue', 'garage vehicle issue'),
+            # Not checked by Garage.delete(), which never got past them, but they would
+            # CASCADE, and the staff attachments would never be queued for removal
+            ('garage_vehicle_damage', 'garage vehicle damage'),
+            ('garage_vehicle_accessory', 'garage vehicle accessory'),
+            ('garage_staff', 'garage staff'),
+            ('garage_business_hours', 'garage business hours'),
+            ('rel_garage_vehicletype', 'rel garage vehicletype'),
+            ('document_sequences', 'document sequences'),
+            ('background_jobs', 'background jobs'),
+        ],
+        'files': [('logo', '', False), ('authorized_signatory', '', False)],
+    },
+    GarageStaff: {
+        'associations': [
+            ('jobcard', 'jobcard'),
+            ('jobcard_garage_staff', 'jobcard garage staff'),
+            ('jobcard_mechanic', 'jobcard mechanic'),
+        ],
+        'checks': [staff_in_booking_timeline],
+        'files': [('attachment', '', False)],
+    },
+    GarageGroup: {
+        'associations': [
+            ('rel_garage_garagegroup', 'rel garage garagegroup'),
+            ('users', 'users'),
+        ],
+    },
+    Customer: {
+        'associations': [
+            ('vehicle', 'vehicle'),
+            ('invoices', 'invoices'),
+            ('estimates', 'estimates'),
+            ('invoice_bulk_upload_txn', 'invoice bulk upload txn'),
+            ('jobcard', 'jobcard'),
+        ],
+    },
+    Invoice: {
+        'associations': [
+            ('invoice_product_catalogues', 'invoice product catalogues'),
+            ('invoice_services', 'invoice services'),
+        ],
+    },
+    Estimate: {
+        'associations': [
+            ('estimate_product_catalogues', 'estimate product catalogues'),
+            ('estimate_services', 'estimate services'),
+        ],
+    },
+    Roles: {
+        'associations': [
+            ('roles_permissions', 'roles permissions'),
+            ('users', 'users'),
+        ],
+    },
+    Users: {
+        'associations': [
+            ('rel_garage_user', 'rel garage user'),
+            ('rel_city_user', 'rel city user'),
+            # Users.delete() never got past its first check; these would CASCADE
+            ('users_accesses', 'users accesses'),
+            ('jobcard', 'jobcard'),
+        ],
+    },
+    Suppliers: {
+        'associations': [('stock_inwards', 'stock inwards')],
+    },
+    ProductCategories: {
+        'associations': [('product_catalogues', 'product catalogues')],
+    },
+    ProductBrands: {
+        'associations': [
+            ('product_catalogues', 'product catalogues'),
+            ('product_model', 'product model'),
+            ('rel_product_catalogues_brands', 'rel product catalogues brands'),
+        ],
+    },
+    ProductModel: {
+        'associations': [('rel_product_catalogues_model', 'rel product catalogues model')],
+    },
+    ProductCatalogues: {
+        'associations': [
+            ('stock_inwards', 'stock inwards'),
+            ('stock_outwards', 'stock outwards'),
+            ('invoice_product_catalogues', 'invoice product catalogues'),
+            ('estimate_product_catalogues', 'estimate product catalogues'),
+            ('rel_product_catalogues_model', 'rel product catalogues model'),
+            ('rel_product_catalogues_brands', 'rel product catalogues brands'),
+        ],
+    },
+    StockInwards: {
+        'files': [('supplier_invoice_path', '', False)],
+    },
+    TXNService: {
+        'associations': [
+            ('invoice_services', 'invoice services'),
+            ('estimate_services', 'estimate services'),
+        ],
+    },
+    ServiceCategory: {
+        'associations': [
+            ('rel_garage_servicecategory', 'rel garage servicecategory'),
+            ('rel_city_servicecategory', 'rel city servicecategory'),
+        ],
+        'files': [('image_path', '', False)],
+    },
+    GarageServicetype: {
+        'associations': [('garage_service', 'garage service')],
+    },
+    GarageService: {
+        'associations': [
+            ('rel_garage_service', 'rel garage service'),
+            ('subscriberbookingservices', 'subscriber booking services'),
+        ],
+    },
+    Brand: {
+        'associations': [('model', 'model')],
+        'files': [('image_path', '', False)],
+    },
+    CC: {
+        'associations': [
+            ('model', 'model'),
+            ('rel_garage_service', 'rel garage service'),
+        ],
+    },
+    Model: {
+        'associations': [('subscribervehicle', 'subscriber vehicle')],
+        'files': [('image_path', '', False)],
+    },
+    SubscriberBooking: {
+        'associations': [
+            ('subscriberbookingaccessories', 'subscriber booking accessories'),
+            ('subscriberbookingservices', 'subscriber booking services'),
+            ('bookingtimeline', 'booking timeline'),
+            ('subscriberbookingreview', 'subscriber booking review'),
+            ('jobcard', 'jobcard'),
+        ],
+    },
+    Accessories: {
+        'associations': [('subscriberbookingaccessories', 'subscriber booking accessories')],
+        'files': [('image_path', '', False)],
+    },
+    Banner: {
+        'files': [('image_path', '', False)],
+    },
+    GarageBanner: {
+        'files': [('image_path', '', False)],
+    },
+    Vehicle: {
+        'associations': [
+            ('invoices', 'invoices'),
+            ('estimates', 'estimates'),
+            ('invoice_bulk_upload_txn', 'invoice bulk upload txn'),
+            ('jobcard', 'jobcard'),
+        ],
+        'files': [('image_path', '', False)],
+    },
+    Jobcard: {
+        # Parts, services, payments and the other job card rows go with it (CASCADE)
+        'files': [('damagephotos', 'static', True), ('diagram_image', 'static', True)],
+    },
+}
+
+
+def _relation(model, accessor):
+    for relation in model._meta.related_objects:
+        if relation.get_accessor_name() == accessor:
+            return relation
+    raise ImproperlyConfigured(f'{model.__name__} has no relation {accessor!r}')
+
+
+def blocked_ids(model, ids):
+    """ Returns {id: [description, ...]} of the ids whose delete the model's rules forbid. """
+    rules = BULK_DELETE_RULES.get(model, {})
+    blocked = {}
+    if not ids:
+        return blocked
+    for accessor, description in rules.get('associations', []):
+        relation = _relation(model, accessor)
+        in_use = (
+            relation.related_model._base_manager
+            .filter(**{f'{relation.field.name}__in': ids})
+            .order_by()
+            .values_list(relation.field.attname, flat=True)
+            .distinct()
+        )
+        for related_id in in_use:
+            blocked.setdefault(related_id, []).append(description)
+    for check in rules.get('checks', []):
+        for blocked_id, description in check(ids).items():
+            blocked.setdefault(blocked_id, []).append(description)
+    return blocked
+
+
+def _file_paths(value, directory):
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return [os.path.join(settings.BASE_DIR, directory, path.lstrip('/')) for path in values if path]
+
+
+def blocked_message(blocked):
+    """ The single error listing every blocked id and what it is associated with. """
+    details = '; '.join(
+        f"ID {blocked_id}: {', '.join(descriptions)}" for blocked_id, descriptions in sorted(blocked.items())
+    )
+    return f"Deletion Failed: {len(blocked)} of the selected rows are associated. {details}."
+
+
+def _delete(model, ids, queryset, skip_blocked):
+    rules = BULK_DELETE_RULES.get(model, {})
+    files = rules.get('files', [])
+    queryset = model._base_manager.all() if queryset is None else queryset
+
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(pk__in=list(dict.fromkeys(ids))).order_by()
+            .values_list('pk', *[field for field, _, _ in files])
+        )
+        blocked = blocked_ids(model, [row[0] for row in rows])
+        if blocked and not skip_blocked:
+            raise ValidationError(blocked_message(blocked))
+        rows = [row for row in rows if row[0] not in blocked]
+        if not rows:
+            return 0, blocked
+
+        _, deleted = model._base_manager.filter(pk__in=[row[0] for row in rows]).delete()
+
+        PendingFileDeletion.objects.bulk_create([
+            PendingFileDeletion(path=path, remove_empty_dir=remove_empty_dir)
+            for row in rows
+            for (field, directory, remove_empty_dir), value in zip(files, row[1:])
+            for path in _file_paths(value, directory)
+        ])
+    return deleted.get(model._meta.label, 0), blocked
+
+
+def bulk_delete(model, ids, queryset=None):
+    """
+    Deletes the rows of model with the given ids (those missing are ignored)
+    and returns how many were deleted. Raises ValidationError naming every
+    blocked id, deleting nothing, when any of them is still associated.
+    queryset narrows the rows that may be deleted, e.g. to one garage.
+    """
+    return _delete(model, ids, queryset, skip_blocked=False)[0]
+
+
+def delete_unblocked(model, ids, queryset=None):
+    """ Like bulk_delete(), but deletes the ids that are not blocked. Returns (deleted, blocked). """
+    return _delete(model, ids, queryset, skip_blocked=True)
+
+
+def sweep_files(limit=FILE_SWEEP_BATCH_SIZE):
+    """
+    Removes up to limit queued files, and their directories where asked
+    once empty. Returns (removed, failed). A file that is already gone
+    counts as removed; one that cannot be removed stays queued until
+    FILE_SWEEP_MAX_ATTEMPTS, then it is dropped with a logged error.
+    """
+    root = os.path.realpath(settings.BASE_DIR)
+    removed = failed = 0
+    with transaction.atomic():
+        pending = list(PendingFileDeletion.objects.select_for_update(skip_locked=True).order_by('id')[:limit])
+        done = []
+        for item in pending:
+            path = os.path.realpath(item.path)
+            try:
+                if os.path.commonpath([root, path]) != root:
+                    raise ValueError('Outside of BASE_DIR, not removed')
+                if os.path.isfile(path):
+                    os.remove(path)
+                directory = os.path.dirname(path)
+                if item.remove_empty_dir and directory != root and os.path.isdir(directory) and not os.listdir(directory):
+                    os.rmdir(directory)
+            except (OSError, ValueError) as e:
+                failed += 1
+                item.attempts += 1
+                item.last_error = str(e)
+                if item.attempts >= FILE_SWEEP_MAX_ATTEMPTS:
+                    logging.getLogger(__name__).error(f"Giving up removing {item.path}: {e}")
+                    done.append(item.id)
+                else:
+                    item.save(update_fields=['attempts', 'last_error'])
+            else:
+                removed += 1
+                done.append(item.id)
+        if done:
+            PendingFileDeletion.objects.filter(id__in=done).delete()
+    return removed, failed
@@ -0,0 +1,135 @@
+"""
+Session engine with a process-local LRU cache in front of django_session.
+
+Reads are served from the local cache while an entry is younger than
+SESSION_LOCAL_CACHE_TTL seconds, writes go to the database first and then
+refresh the cache (write-through). Enable with
+SESSION_ENGINE = 'GMSApp.modules.cachedsession'.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from dateutil.parser import parse
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.utils import timezone
+
+
+class LocalSessionCache:
+    """ Thread-safe LRU of session_key -> cache entry dict. """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_key):
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is None or entry['expire_date'] <= timezone.now():
+                self._entries.pop(session_key, None)
+                self.misses += 1
+                return None
+            if time.monotonic() - entry['loaded_at'] > self.ttl:
+                # Stale: keep it so unsaved activity can be merged, but reload
+                self.misses += 1
+                return dict(entry, stale=True)
+            self._entries.move_to_end(session_key)
+            self.hits += 1
+            return entry
+
+    def set(self, session_key, data, expire_date, persisted_activity):
+        with self._lock:
+            self._entries[session_key] = {
+                'data': dict(data),
+                'expire_date': expire_date,
+                'persisted_activity': persisted_activity,
+                'loaded_at': time.monotonic(),
+            }
+            self._entries.move_to_end(session_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def update_data(self, session_key, data):
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is not None:
+                entry['data'] = dict(data)
+
+    def delete(self, session_key):
+        with self._lock:
+            self._entries.pop(session_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalSessionCache(
+    max_size=getattr(settings, 'SESSION_LOCAL_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'SESSION_LOCAL_CACHE_TTL', 60),
+)
+
+
+def _latest_activity(*values):
+    """ Returns the most recent of the given last_activity strings. """
+    values = [value for value in values if value]
+    return max(values, key=parse) if values else None
+
+
+class SessionStore(DBStore):
+
+    def load(self):
+        entry = local_cache.get(self.session_key) if self.session_key else None
+        if entry is not None and not entry.get('stale'):
+            return dict(entry['data'])
+
+        session_key = self.session_key
+        session = self._get_session_from_db()
+        if not session:
+            if session_key:
+                local_cache.delete(session_key)
+            return {}
+
+        data = self.decode(session.session_data)
+        persisted_activity = data.get('last_activity')
+        if entry is not None:
+            # Keep activity recorded here but not yet written to the database
+            last_activity = _latest_activity(persisted_activity, entry['data'].get('last_activity'))
+            if last_activity:
+                data['last_activity'] = last_activity
+        local_cache.set(self.session_key, data, session.expire_date, persisted_activity)
+        return dict(data)
+
+    def save(self, must_create=False):
+        super().save(must_create=must_create)
+        data = self._session
+        local_cache.set(self.session_key, data, self.get_expiry_date(), data.get('last_activity'))
+
+    def save_activity(self, interval):
+        """
+        Records the current session data in the local cache and writes it to
+        the database only if the persisted last_activity is at least
+        interval seconds old. Returns True when the database was written.
+        """
+        entry = local_cache.get(self.session_key)
+        persisted_activity = entry.get('persisted_activity') if entry else None
+        last_activity = self.get('last_activity')
+        if (
+            entry is None
+            or not persisted_activity
+            or not last_activity
+            or (parse(last_activity) - parse(persisted_activity)).total_seconds() >= interval
+        ):
+            self.save()
+            return True
+        local_cache.update_data(self.session_key, self._session)
+        return False
+
+    def delete(self, session_key=None):
+        local_cache.delete(session_key or self.session_key)
+        super().delete(session_key)
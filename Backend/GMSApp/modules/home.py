@@ -3,13 +3,11 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 
 from dateutil.relativedelta import relativedelta
-from django.db import connection
-from django.db.models import Count, OuterRef, Subquery
+from django.db.models import Count, DecimalField, F, Func, Q, Sum, Value
 from django.shortcuts import render
 
 from GMSApp.models import (
     BookingStatus,
-    BookingTimeline,
     Estimate,
     Invoice,
     Jobcard,
@@ -26,21 +24,47 @@ from GMSApp.models import (
 from GMSApp.modules import audit, managesession, templatespath
 
 
+def _jobcard_daily_totals(garage_id, start_date, end_date):
+    """
+    Returns {current_date: (job_count, revenue)} for the garage between the
+    given dates. Revenue is truncated per job card, like the chart buckets.
+    """
+    rows = (
+        Jobcard.objects.filter(garage_id=garage_id, current_date__range=(start_date, end_date))
+        .order_by()
+        .values('current_date')
+        .annotate(
+            jobs=Count('id'),
+            revenue=Sum(Func(F('paid_total'), Value(0), function='TRUNCATE', output_field=DecimalField())),
+        )
+    )
+    return {row['current_date']: (row['jobs'], int(row['revenue'] or 0)) for row in rows}
+
+
 @managesession.check_session_timeout
 def r_home(request, context):
     if request.method == 'GET':
-        job_cards = Jobcard.objects.filter(garage_id=context['garage_id'])
-        products = ProductCatalogues.objects.filter(garage_id=context['garage_id'])
+        # Job card KPIs (single conditional aggregate)
+        jobcard_counts = Jobcard.objects.filter(garage_id=context['garage_id']).aggregate(
+            total=Count('id'),
+            open=Count('id', filter=Q(status='open')),
+            finalized=Count('id', filter=Q(status='finalized')),
+            paid=Sum('paid_total'),
+            pending=Sum('pending_total'),
+        )
+        context['total_jobcard_count'] = jobcard_counts['total']
+        context['open_jobcard_count'] = jobcard_counts['open']
+        context['finalized_jobcard_count'] = jobcard_counts['finalized']
 
-        context['revenue'] = 0
-        context['pending_balance'] = Decimal('0')
-        context['purchase'] = 0
-        context['open_jobcard_count'] = 0
-        context['finalized_jobcard_count'] = 0
-        context['total_jobcard_count'] = 0
-        context['product_catalogues_count'] = 0
-        context['total_revenue'] = 0
-        context['total_payments'] = 0
+        if context['total_jobcard_count']:
+            context['revenue'] = float(jobcard_counts['paid'])
+            context['total_revenue'] = float(jobcard_counts['paid'])
+            context['total_payments'] = float(jobcard_counts['paid'])
+        else:
+            context['revenue'] = 0
+            context['total_revenue'] = 0
+            context['total_payments'] = 0
+        context['pending_balance'] = jobcard_counts['pending'] or Decimal('0')
 
         # Initialize chart data structures
         today = datetime.now().date()
@@ -56,59 +80,30 @@ def r_home(request, context):
         monthly_labels = [f'Week {i+1}' for i in range(4)]
         six_months_labels = [(today - relativedelta(months=5-i)).strftime('%b') for i in range(6)]
 
-        for job_card in job_cards:
-            context['total_jobcard_count'] += 1
-            if job_card.status == 'open':
-                context['open_jobcard_count'] += 1
-            elif job_card.status == 'finalized':
-                context['finalized_jobcard_count'] += 1
-            
-            # Get payment info from jobcard payment view
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT * FROM garage.vw_jobcard_payment 
-                    WHERE garage_id = %s AND jobcard_id = %s 
-                """, [context['garage_id'], job_card.id])
-                    
-                columns = [col[0] for col in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                
-                if results:
-                    payment_info = results[0]
-                    service_total = Decimal(str(payment_info.get('service_total', 0) or 0))
-                    parts_total = Decimal(str(payment_info.get('parts_total', 0) or 0))
-                    payment_total = Decimal(str(payment_info.get('payment_total', 0) or 0))
-                    payment = float(payment_total)
-                    pending = float(service_total + parts_total - payment_total)
-                else:
-                    payment = 0.0
-                    pending = 0.0
-            
-            context['total_payments'] += payment
-            context['revenue'] += payment
-            context['total_revenue'] += payment
-            context['pending_balance'] += Decimal(str(pending))
-            
-            if job_card.current_date:
-                job_date = job_card.current_date
-                
-                # Weekly data (last 7 days)
-                days_diff = (today - job_date).days
-                if 0 <= days_diff < 7:
-                    weekly_jobs[6 - days_diff] += 1
-                    weekly_revenue[6 - days_diff] += int(payment)
-                
-                # Monthly data (last 4 weeks)
-                weeks_diff = days_diff // 7
-                if 0 <= weeks_diff < 4:
-                    monthly_jobs[3 - weeks_diff] += 1
-                    monthly_revenue[3 - weeks_diff] += int(payment)
-                
-                # 6 months data
-                months_diff = (today.year - job_date.year) * 12 + (today.month - job_date.month)
-                if 0 <= months_diff < 6:
-                    six_months_jobs[5 - months_diff] += 1
-                    six_months_revenue[5 - months_diff] += int(payment)
+        # The six month window is the widest one: from the first day of the
+        # month five months back to the last day of the current month
+        window_start = (today - relativedelta(months=5)).replace(day=1)
+        window_end = today + relativedelta(day=31)
+        daily_totals = _jobcard_daily_totals(context['garage_id'], window_start, window_end)
+
+        for job_date, (jobs, revenue) in daily_totals.items():
+            # Weekly data (last 7 days)
+            days_diff = (today - job_date).days
+            if 0 <= days_diff < 7:
+                weekly_jobs[6 - days_diff] += jobs
+                weekly_revenue[6 - days_diff] += revenue
+
+            # Monthly data (last 4 weeks)
+            weeks_diff = days_diff // 7
+            if 0 <= weeks_diff < 4:
+                monthly_jobs[3 - weeks_diff] += jobs
+                monthly_revenue[3 - weeks_diff] += revenue
+
+            # 6 months data
+            months_diff = (today.year - job_date.year) * 12 + (today.month - job_date.month)
+            if 0 <= months_diff < 6:
+                six_months_jobs[5 - months_diff] += jobs
+                six_months_revenue[5 - months_diff] += revenue
         
         # Store chart data in context (as JSON strings for template)
         context['chart_data'] = {
@@ -129,9 +124,16 @@ def r_home(request, context):
             }
         }
 
-        for item in products:
-            context['purchase'] += item.purchase_price * item.inward_stock
-            context['product_catalogues_count'] += 1
+        # Stock valuation (single aggregate)
+        product_totals = ProductCatalogues.objects.filter(garage_id=context['garage_id']).aggregate(
+            purchase=Sum(
+                F('purchase_price') * F('inward_stock'),
+                output_field=DecimalField(max_digits=20, decimal_places=2),
+            ),
+            count=Count('id'),
+        )
+        context['purchase'] = product_totals['purchase'] if product_totals['purchase'] is not None else 0
+        context['product_catalogues_count'] = product_totals['count']
         
         # Inventory
         context['stock_outwards_count'] = StockOutwards.objects.filter(garage_id=context['garage_id']).count()
@@ -175,16 +177,9 @@ def r_home(request, context):
         }
         
         # Get booking status counts
-        # Get the latest status for each booking
-        latest_timeline = BookingTimeline.objects.filter(
-            booking_id=OuterRef('pk')
-        ).order_by('-created_at')
-
-        # Get bookings with their latest status
+        # Bookings carry their latest status (garage/current_status index)
         bookings_with_status = SubscriberBooking.objects.filter(
             garage_id=context['garage_id']
-        ).annotate(
-            latest_status_id=Subquery(latest_timeline.values('status_id')[:1])
         )
 
         # Define all possible statuses with their display names
@@ -227,11 +222,12 @@ def r_home(request, context):
         all_status_counts = {status: 0 for status in all_statuses}
         
         # Update counts for existing statuses
-        for status_obj in BookingStatus.objects.all():
-            if status_obj.name in all_status_counts:
-                all_status_counts[status_obj.name] = bookings_with_status.filter(
-                    latest_status_id=status_obj.id
-                ).count()
+        latest_status_counts = {
+            row['current_status_id']: row['count']
+            for row in bookings_with_status.order_by().values('current_status_id').annotate(count=Count('id'))
+        }
+        for status_obj in BookingStatus.objects.filter(name__in=all_statuses):
+            all_status_counts[status_obj.name] = latest_status_counts.get(status_obj.id, 0)
         
         # Prepare status data with display names and counts
         status_data = [
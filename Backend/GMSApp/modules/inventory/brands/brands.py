@@ -6,7 +6,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import ProductBrands
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from datetime import datetime, timedelta
 import logging
 
@@ -95,15 +95,10 @@ def d_inv_brands(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    product_brands_obj = ProductBrands.objects.filter(id=id).first()
-                    if product_brands_obj:
-                        deleted_data.append(product_brands_obj.id) 
-                        product_brands_obj.delete()
+                deleted_count = bulkdelete.bulk_delete(ProductBrands, product_ids, ProductBrands.objects.filter(garage_id=context['garage_id']))
 
-                if deleted_data:
-                    msg = f"{len(deleted_data)} product brands deleted"
+                if deleted_count:
+                    msg = f"{deleted_count} product brands deleted"
                     sts = True
                 else:
                     msg = "Failed to delete product brands"
@@ -6,7 +6,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import ProductCategories
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from datetime import datetime, timedelta
 import logging
 
@@ -98,15 +98,10 @@ def d_inv_categories(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    product_categories_obj = ProductCategories.objects.filter(id=id).first()
-                    if product_categories_obj:
-                        deleted_data.append(product_categories_obj.id) 
-                        product_categories_obj.delete()
+                deleted_count = bulkdelete.bulk_delete(ProductCategories, product_ids, ProductCategories.objects.filter(garage_id=context['garage_id']))
 
-                if deleted_data:
-                    msg = f"{len(deleted_data)} product categories deleted"
+                if deleted_count:
+                    msg = f"{deleted_count} product categories deleted"
                     sts = True
                 else:
                     msg = "Failed to delete product categories"
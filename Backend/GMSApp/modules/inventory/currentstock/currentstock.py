@@ -3,7 +3,6 @@ import logging
 
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
 from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
@@ -17,7 +16,8 @@ from GMSApp.models import (
     RelProductCataloguesModel,
     Suppliers,
 )
-from GMSApp.modules import audit, managesession, templatespath
+from GMSApp.modules import audit, bulkdelete, managesession, templatespath
+from GMSApp.modules.keysetpaginator import KeysetPaginator
 
 
 @managesession.check_session_timeout
@@ -42,10 +42,8 @@ def r_inv_current_stock(request, context):
         #     product.discount_amount = (product.price * product.discount) / 100
         
         # Pagination
-        paginator = Paginator(product_catalogues_objs, 100)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        context['product_catalogues_objs'] =  page_obj
+        paginator = KeysetPaginator(product_catalogues_objs, 100, params=request.GET)
+        context['product_catalogues_objs'] = paginator.get_page(request.GET.get('cursor'))
         context['product_catalogues'] = product_catalogues
         context['suppliers'] = suppliers
         
@@ -316,15 +314,10 @@ def d_inv_current_stock(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    product_catalogues_obj = ProductCatalogues.objects.filter(id=id).first()
-                    if product_catalogues_obj:
-                        deleted_data.append(product_catalogues_obj.id) 
-                        product_catalogues_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} stock deleted"
+                deleted_count = bulkdelete.bulk_delete(ProductCatalogues, product_ids, ProductCatalogues.objects.filter(garage_id=context['garage_id']))
+
+                if deleted_count:
+                    msg = f"{deleted_count} stock deleted"
                     sts = True
                 else:
                     msg = "Failed to delete stock"
@@ -1,133 +1,118 @@
-import csv
-from datetime import datetime
+from GMSApp.models import ProductCatalogues, StockInwards, StockOutwards
+from GMSApp.modules import managesession, streamexport
 
-from django.http import HttpResponse
 
-from GMSApp.models import ProductCatalogues, StockInwards, StockOutwards
-from GMSApp.modules import managesession
+def _date(value, fmt='%Y-%m-%d'):
+    return value.strftime(fmt) if value else ''
+
+
+PRODUCT_CATALOGUES_HEADER = [
+    'HSN Code', 'Name', 'Part Number', 'Model', 'CC', 'Category', 'Sub Category',
+    'Brand', 'Description', 'Inward Stock', 'Outward Stock', 'Current Stock',
+    'Price', 'GST %', 'Discount %', 'Purchase Price', 'Measuring Unit',
+    'Min Stock', 'Price Includes GST', 'Stock Status', 'Created At', 'Updated At'
+]
+PRODUCT_CATALOGUES_FIELDS = (
+    'code', 'name', 'part_number', 'model', 'cc', 'category__name', 'sub_category',
+    'brand__name', 'description', 'inward_stock', 'outward_stock', 'price', 'gst',
+    'discount', 'purchase_price', 'measuring_unit', 'min_stock', 'price_includes_gst',
+    'created_at', 'updated_at',
+)
+
+
+def _product_catalogue_rows(garage_id):
+    queryset = ProductCatalogues.objects.filter(garage_id=garage_id)
+    for chunk in streamexport.iterate_rows(queryset, PRODUCT_CATALOGUES_FIELDS):
+        for (_, code, name, part_number, model, cc, category, sub_category, brand, description,
+             inward_stock, outward_stock, price, gst, discount, purchase_price, measuring_unit,
+             min_stock, price_includes_gst, created_at, updated_at) in chunk:
+            # Same rule as ProductCatalogues.stock_status
+            current_stock = inward_stock - outward_stock
+            if current_stock <= 0:
+                stock_status = "Out of Stock"
+            elif current_stock <= min_stock:
+                stock_status = "Low Stock"
+            else:
+                stock_status = "In Stock"
+            yield [
+                code or '', name, part_number or '', model or '', cc or '', category or '',
+                sub_category or '', brand or '', description or '', inward_stock, outward_stock,
+                current_stock, price, gst, discount, purchase_price, measuring_unit, min_stock,
+                'Yes' if price_includes_gst else 'No', stock_status,
+                _date(created_at, '%Y-%m-%d %H:%M:%S'), _date(updated_at, '%Y-%m-%d %H:%M:%S'),
+            ]
+
+
+STOCK_INWARDS_HEADER = [
+    'Product Name', 'HSN Code', 'Brand', 'Quantity', 'Rate', 'Discount %',
+    'GST %', 'Total Price', 'Supplier', 'Invoice No', 'Invoice Date',
+    'Location', 'Rack', 'Track Expiry', 'Expiry Date', 'Warranty',
+    'Remarks', 'Created At', 'Updated At'
+]
+STOCK_INWARDS_FIELDS = (
+    'product__name', 'product__code', 'product__brand__name', 'quantity', 'rate', 'discount',
+    'gst', 'total_price', 'supplier__supplier', 'supplier_invoice_no', 'supplier_invoice_date',
+    'location', 'rack', 'track_expiry', 'expiry_date', 'warranty', 'remarks', 'created_at', 'updated_at',
+)
+
+
+def _stock_inward_rows(garage_id):
+    queryset = StockInwards.objects.filter(garage_id=garage_id)
+    for chunk in streamexport.iterate_rows(queryset, STOCK_INWARDS_FIELDS):
+        for (_, product_name, code, brand, quantity, rate, discount, gst, total_price, supplier,
+             supplier_invoice_no, supplier_invoice_date, location, rack, track_expiry, expiry_date,
+             warranty, remarks, created_at, updated_at) in chunk:
+            yield [
+                product_name, code or '', brand or '', quantity, rate, discount, gst, total_price,
+                supplier, supplier_invoice_no or '', _date(supplier_invoice_date), location or '',
+                rack or '', 'Yes' if track_expiry else 'No', _date(expiry_date),
+                _date(warranty, '%Y-%m-%d %H:%M:%S'), remarks or '',
+                _date(created_at, '%Y-%m-%d %H:%M:%S'), _date(updated_at, '%Y-%m-%d %H:%M:%S'),
+            ]
+
+
+STOCK_OUTWARDS_HEADER = [
+    'Product Name', 'HSN Code', 'Brand', 'Quantity', 'Rate', 'Discount %',
+    'GST %', 'Total Price', 'Issued To', 'Issued Date', 'Usage Purpose',
+    'Reference Document', 'Location', 'Rack', 'Remarks', 'Created At', 'Updated At'
+]
+STOCK_OUTWARDS_FIELDS = (
+    'product__name', 'product__code', 'product__brand__name', 'quantity', 'rate', 'discount',
+    'gst', 'total_price', 'issued_to', 'issued_date', 'usage_purpose', 'reference_document',
+    'location', 'rack', 'remarks', 'created_at', 'updated_at',
+)
+
+
+def _stock_outward_rows(garage_id):
+    queryset = StockOutwards.objects.filter(garage_id=garage_id)
+    for chunk in streamexport.iterate_rows(queryset, STOCK_OUTWARDS_FIELDS):
+        for (_, product_name, code, brand, quantity, rate, discount, gst, total_price, issued_to,
+             issued_date, usage_purpose, reference_document, location, rack, remarks,
+             created_at, updated_at) in chunk:
+            yield [
+                product_name, code or '', brand or '', quantity, rate, discount, gst, total_price,
+                issued_to or '', _date(issued_date), usage_purpose or '', reference_document or '',
+                location or '', rack or '', remarks or '',
+                _date(created_at, '%Y-%m-%d %H:%M:%S'), _date(updated_at, '%Y-%m-%d %H:%M:%S'),
+            ]
 
 
 @managesession.check_session_timeout
 def export_product_catalogues_csv(request, context):
-    garage_id = context['garage_id']
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="product_catalogues_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'HSN Code', 'Name', 'Part Number', 'Model', 'CC', 'Category', 'Sub Category', 
-        'Brand', 'Description', 'Inward Stock', 'Outward Stock', 'Current Stock',
-        'Price', 'GST %', 'Discount %', 'Purchase Price', 'Measuring Unit', 
-        'Min Stock', 'Price Includes GST', 'Stock Status', 'Created At', 'Updated At'
-    ])
-    
-    products = ProductCatalogues.objects.filter(garage_id=garage_id).select_related('category', 'brand')
-    for product in products:
-        writer.writerow([
-            product.code or '',
-            product.name,
-            product.part_number or '',
-            product.model or '',
-            product.cc or '',
-            product.category.name if product.category else '',
-            product.sub_category or '',
-            product.brand.name if product.brand else '',
-            product.description or '',
-            product.inward_stock,
-            product.outward_stock,
-            product.current_stock,
-            product.price,
-            product.gst,
-            product.discount,
-            product.purchase_price,
-            product.measuring_unit,
-            product.min_stock,
-            'Yes' if product.price_includes_gst else 'No',
-            product.stock_status,
-            product.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            product.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
-    
-    return response
+    return streamexport.export_response(
+        request, 'product_catalogues', PRODUCT_CATALOGUES_HEADER, _product_catalogue_rows(context['garage_id'])
+    )
 
 
 @managesession.check_session_timeout
 def export_stock_inwards_csv(request, context):
-    garage_id = context['garage_id']
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="stock_inwards_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Product Name', 'HSN Code', 'Brand', 'Quantity', 'Rate', 'Discount %', 
-        'GST %', 'Total Price', 'Supplier', 'Invoice No', 'Invoice Date', 
-        'Location', 'Rack', 'Track Expiry', 'Expiry Date', 'Warranty', 
-        'Remarks', 'Created At', 'Updated At'
-    ])
-    
-    stock_inwards = StockInwards.objects.filter(garage_id=garage_id).select_related('product', 'product__brand', 'supplier')
-    for stock in stock_inwards:
-        writer.writerow([
-            stock.product.name,
-            stock.product.code or '',
-            stock.product.brand.name if stock.product.brand else '',
-            stock.quantity,
-            stock.rate,
-            stock.discount,
-            stock.gst,
-            stock.total_price,
-            stock.supplier.supplier,
-            stock.supplier_invoice_no or '',
-            stock.supplier_invoice_date.strftime('%Y-%m-%d') if stock.supplier_invoice_date else '',
-            stock.location or '',
-            stock.rack or '',
-            'Yes' if stock.track_expiry else 'No',
-            stock.expiry_date.strftime('%Y-%m-%d') if stock.expiry_date else '',
-            stock.warranty.strftime('%Y-%m-%d %H:%M:%S') if stock.warranty else '',
-            stock.remarks or '',
-            stock.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            stock.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
-    
-    return response
+    return streamexport.export_response(
+        request, 'stock_inwards', STOCK_INWARDS_HEADER, _stock_inward_rows(context['garage_id'])
+    )
 
 
 @managesession.check_session_timeout
 def export_stock_outwards_csv(request, context):
-    garage_id = context['garage_id']
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="stock_outwards_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Product Name', 'HSN Code', 'Brand', 'Quantity', 'Rate', 'Discount %', 
-        'GST %', 'Total Price', 'Issued To', 'Issued Date', 'Usage Purpose', 
-        'Reference Document', 'Location', 'Rack', 'Remarks', 'Created At', 'Updated At'
-    ])
-    
-    stock_outwards = StockOutwards.objects.filter(garage_id=garage_id).select_related('product', 'product__brand')
-    for stock in stock_outwards:
-        writer.writerow([
-            stock.product.name,
-            stock.product.code or '',
-            stock.product.brand.name if stock.product.brand else '',
-            stock.quantity,
-            stock.rate,
-            stock.discount,
-            stock.gst,
-            stock.total_price,
-            stock.issued_to or '',
-            stock.issued_date.strftime('%Y-%m-%d') if stock.issued_date else '',
-            stock.usage_purpose or '',
-            stock.reference_document or '',
-            stock.location or '',
-            stock.rack or '',
-            stock.remarks or '',
-            stock.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            stock.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
-    
-    return response
\ No newline at end of file
+    return streamexport.export_response(
+        request, 'stock_outwards', STOCK_OUTWARDS_HEADER, _stock_outward_rows(context['garage_id'])
+    )
@@ -6,7 +6,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import ProductModel, ProductBrands
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 import logging
 
 
@@ -134,15 +134,10 @@ def d_inv_model(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    product_model_obj = get_object_or_404(ProductModel, id=id)
-                    if product_model_obj:
-                        deleted_data.append(product_model_obj.id) 
-                        product_model_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} records deleted"
+                deleted_count = bulkdelete.bulk_delete(ProductModel, product_ids, ProductModel.objects.filter(brand__garage_id=context['garage_id']))
+
+                if deleted_count:
+                    msg = f"{deleted_count} records deleted"
                     sts = True
                 else:
                     msg = "Failed to delete records"
@@ -5,13 +5,13 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
 from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 
 from GMSApp.models import ProductCatalogues, StockInwards, Suppliers
-from GMSApp.modules import audit, managesession, templatespath
+from GMSApp.modules import audit, bulkdelete, managesession, templatespath
+from GMSApp.modules.keysetpaginator import KeysetPaginator
 
 
 @managesession.check_session_timeout
@@ -22,14 +22,16 @@ def r_inv_stock_inward(request, context):
             "id", "name", "part_number", "code"
         )
         suppliers = Suppliers.objects.filter(garage_id=garage_id).only("id", "supplier")
-        stock_inwards = (
-            StockInwards.objects.filter(garage_id=garage_id)
-            .select_related("product", "supplier")
-            .order_by("-id")
+        stock_inwards = StockInwards.objects.filter(garage_id=garage_id).select_related(
+            "product", "supplier"
         )
 
-        # Add calculated purchase price to each stock inward record
-        for stock_inward in stock_inwards:
+        # Pagination
+        paginator = KeysetPaginator(stock_inwards, 100, params=request.GET)
+        page_obj = paginator.get_page(request.GET.get("cursor"))
+
+        # Add calculated purchase price to each stock inward record on the page
+        for stock_inward in page_obj:
             base_mrp = (
                 stock_inward.rate / (1 + stock_inward.gst / 100)
                 if stock_inward.price_includes_gst
@@ -39,10 +41,6 @@ def r_inv_stock_inward(request, context):
                 base_mrp * stock_inward.discount / 100
             )
 
-        # Pagination
-        paginator = Paginator(stock_inwards, 100)
-        page_number = request.GET.get("page")
-        page_obj = paginator.get_page(page_number)
         context["stock_inward"] = page_obj
         context["product_catalogues"] = product_catalogues
         context["suppliers"] = suppliers
@@ -349,15 +347,12 @@ def d_inv_stock_inward(request, context):
         try:
             with transaction.atomic():
                 stock_inward_ids = request.POST.getlist("id[]")
-                deleted_data = []
-                for id in stock_inward_ids:
-                    stock_inward_obj = StockInwards.objects.filter(id=id).first()
-                    if stock_inward_obj:
-                        deleted_data.append(stock_inward_obj.id)
-                        stock_inward_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} stock inward deleted"
+                deleted_count = bulkdelete.bulk_delete(
+                    StockInwards, stock_inward_ids, StockInwards.objects.filter(garage_id=context["garage_id"])
+                )
+
+                if deleted_count:
+                    msg = f"{deleted_count} stock inward deleted"
                     sts = True
                 else:
                     msg = "Failed to delete stock inward"
@@ -9,7 +9,7 @@ from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 
 from GMSApp.models import ProductCatalogues, StockOutwards
-from GMSApp.modules import audit, managesession, templatespath
+from GMSApp.modules import audit, bulkdelete, managesession, templatespath
 
 
 @managesession.check_session_timeout
@@ -258,15 +258,12 @@ def d_inv_stock_outward(request, context):
         try:
             with transaction.atomic():
                 stock_outward_ids = request.POST.getlist("id[]")
-                deleted_data = []
-                for id in stock_outward_ids:
-                    stock_outward_obj = StockOutwards.objects.filter(id=id).first()
-                    if stock_outward_obj:
-                        deleted_data.append(stock_outward_obj.id)
-                        stock_outward_obj.delete()
+                deleted_count = bulkdelete.bulk_delete(
+                    StockOutwards, stock_outward_ids, StockOutwards.objects.filter(garage_id=context["garage_id"])
+                )
 
-                if deleted_data:
-                    msg = f"{len(deleted_data)} stock outward deleted"
+                if deleted_count:
+                    msg = f"{deleted_count} stock outward deleted"
                     sts = True
                 else:
                     msg = "Failed to delete stock outward"
@@ -6,7 +6,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import Suppliers
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from datetime import datetime, timedelta
 import logging
 
@@ -113,15 +113,10 @@ def d_inv_suppliers(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    supplier_obj = Suppliers.objects.filter(id=id).first()
-                    if supplier_obj:
-                        deleted_data.append(supplier_obj.id) 
-                        supplier_obj.delete()
+                deleted_count = bulkdelete.bulk_delete(Suppliers, product_ids, Suppliers.objects.filter(garage_id=context['garage_id']))
 
-                if deleted_data:
-                    msg = f"{len(deleted_data)} suppliers deleted"
+                if deleted_count:
+                    msg = f"{deleted_count} suppliers deleted"
                     sts = True
                 else:
                     msg = "Failed to delete suppliers"
@@ -0,0 +1,150 @@
+"""
+Database-backed job queue for bulk uploads.
+
+Views save the uploaded file and call enqueue(), which returns at once with
+the job id. `manage.py run_jobs` claims queued jobs one at a time with
+SELECT ... FOR UPDATE SKIP LOCKED, so several workers on one box never pick
+the same job, and runs the handler registered for the job type. Handlers
+report progress through BackgroundJob.report_progress and return the
+summary message shown when the job is done.
+"""
+import io
+import logging
+import os
+import socket
+from datetime import timedelta
+
+import pandas as pd
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from GMSApp.models import BackgroundJob
+
+# Seconds without a heartbeat after which a running job is considered lost
+JOB_STALE_AFTER = getattr(settings, 'JOB_STALE_AFTER', 600)
+
+# Row-by-row handlers report progress every this many rows
+PROGRESS_EVERY = 100
+
+JOB_HANDLERS = {
+    BackgroundJob.INVOICE_UPLOAD: 'GMSApp.modules.transactions.invoiceimport.run_invoice_upload',
+    BackgroundJob.INVOICE_SERVICES_UPLOAD: 'GMSApp.modules.transactions.invoiceimport.run_invoice_services_upload',
+    BackgroundJob.INVOICE_PARTS_UPLOAD: 'GMSApp.modules.transactions.invoiceimport.run_invoice_parts_upload',
+    BackgroundJob.CURRENT_STOCK_UPLOAD: 'GMSApp.modules.inventory.currentstock.bulkuploadcurrentstock.run_current_stock_upload',
+    BackgroundJob.STOCK_INWARD_UPLOAD: 'GMSApp.modules.inventory.stockinward.bulkuploadstockinward.run_stock_inward_upload',
+    BackgroundJob.STOCK_OUTWARD_UPLOAD: 'GMSApp.modules.inventory.stockoutward.bulkuploadstockoutward.run_stock_outward_upload',
+}
+
+VALID_EXTENSIONS = {'csv', 'xls', 'xlsx'}
+
+
+def save_upload(uploaded_file, upload_dir, saved_filename):
+    """ Writes an uploaded file below static/<upload_dir> and returns its path. """
+    upload_dir = os.path.join('static', upload_dir)
+    os.makedirs(upload_dir, exist_ok=True)
+    file_path = os.path.join(upload_dir, saved_filename)
+    with open(file_path, 'wb+') as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
+    return file_path
+
+
+def check_extension(uploaded_file, label=''):
+    """ Raises ValidationError unless the file is CSV or Excel. """
+    file_extension = uploaded_file.name.lower().rsplit('.', 1)[-1]
+    if file_extension not in VALID_EXTENSIONS:
+        raise ValidationError(f'Please upload a valid Excel or CSV file{label}.')
+    return file_extension
+
+
+def read_upload(file_path, empty_message='The uploaded file is empty.'):
+    """ Loads a saved CSV or Excel upload into a DataFrame with normalized column names. """
+    if file_path.lower().endswith('.csv'):
+        with open(file_path, 'rb') as f:
+            df = pd.read_csv(io.StringIO(f.read().decode('utf-8')))
+    else:
+        df = pd.read_excel(file_path)
+
+    if df.empty:
+        raise ValidationError(empty_message)
+    df.columns = df.columns.str.strip().str.lower()
+    return df
+
+
+def enqueue(job_type, garage_id, file_name, file_path, created_by='', track_invoice_uploads=None):
+    """ Queues an upload for the worker and returns the job. """
+    return BackgroundJob.objects.create(
+        garage_id=garage_id,
+        track_invoice_uploads=track_invoice_uploads,
+        job_type=job_type,
+        file_name=file_name,
+        file_path=file_path,
+        created_by=created_by or '',
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def fail_stale_jobs():
+    """
+    Marks running jobs whose worker stopped sending heartbeats as failed.
+    They are not retried: stock uploads are not idempotent.
+    """
+    now = timezone.now()
+    return BackgroundJob.objects.filter(
+        status=BackgroundJob.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=JOB_STALE_AFTER),
+    ).update(
+        status=BackgroundJob.FAILED,
+        message='The worker stopped before the job finished.',
+        eta_seconds=None,
+        finished_at=now,
+        updated_at=now,
+    )
+
+
+def claim_next(worker):
+    """ Marks the oldest queued job as running for this worker and returns it, or None. """
+    with transaction.atomic():
+        job = (
+            BackgroundJob.objects.select_for_update(skip_locked=True)
+            .filter(status=BackgroundJob.QUEUED)
+            .order_by('id')
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        job.status = BackgroundJob.RUNNING
+        job.worker = worker
+        job.started_at = now
+        job.heartbeat_at = now
+        job.save(update_fields=['status', 'worker', 'started_at', 'heartbeat_at', 'updated_at'])
+    return job
+
+
+def run(job):
+    """ Runs the handler of a claimed job and records the outcome. """
+    try:
+        handler = import_string(JOB_HANDLERS[job.job_type])
+        message = handler(job)
+        status = BackgroundJob.DONE
+    except ValidationError as e:
+        message = ', '.join(e.messages)
+        status = BackgroundJob.FAILED
+    except Exception as e:
+        logging.getLogger(__name__).exception(f"Background job {job.id} ({job.job_type}) failed")
+        message = f'Unexpected error while processing the file: {e}'
+        status = BackgroundJob.FAILED
+
+    job.status = status
+    job.message = message or ''
+    job.eta_seconds = None
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'message', 'eta_seconds', 'finished_at', 'updated_at'])
+    return job
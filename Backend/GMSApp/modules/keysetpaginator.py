@@ -0,0 +1,197 @@
+"""
+Keyset ("seek") pagination.
+
+Pages are addressed by an opaque cursor holding the sort key of the row at
+the page boundary, so every page is a single indexed range scan of
+per_page + 1 rows no matter how deep it is. The ordering must be unique
+(end it with the primary key) and its fields must not be nullable, nor
+change once written: a row whose key moves skips or repeats across pages.
+
+There is no COUNT(*): a list that shows a total passes one it already has,
+e.g. from count_by(), which counts every status of a list in one query.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Count, Q
+from django.http import QueryDict
+
+NEXT = 'n'
+PREVIOUS = 'p'
+LAST = 'last'
+CURSOR_PARAM = 'cursor'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def total(self):
+        """ The total passed to the paginator, or None when the list is not counted. """
+        return self.paginator.count
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[-1], NEXT)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[0], PREVIOUS)
+        return None
+
+    # Links keeping the other query parameters (filters, searches)
+
+    @property
+    def first_url(self):
+        return self.paginator.url(None)
+
+    @property
+    def previous_url(self):
+        return self.paginator.url(self.previous_cursor)
+
+    @property
+    def next_url(self):
+        return self.paginator.url(self.next_cursor)
+
+    @property
+    def last_url(self):
+        return self.paginator.url(LAST)
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by its ordering columns instead of OFFSET.
+
+        paginator = KeysetPaginator(queryset, 100, ordering=('-created_at', '-id'), params=request.GET)
+        page = paginator.get_page(request.GET.get('cursor'))
+
+    The special cursor 'last' returns the final page. params are the query
+    parameters kept in the page links; count is an optional known total.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id'), params=None, count=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.model = queryset.model
+        self.params = params.copy() if params is not None else QueryDict(mutable=True)
+        for name in (CURSOR_PARAM, 'page'):
+            self.params.pop(name, None)
+        self.count = count
+
+    def url(self, cursor):
+        """ Query string of the page at cursor (None for the first page). """
+        params = self.params.copy()
+        if cursor:
+            params[CURSOR_PARAM] = cursor
+        return f'?{params.urlencode()}'
+
+    # Cursor encoding
+
+    def encode_cursor(self, obj, direction):
+        values = [self._dump_value(getattr(obj, name)) for name, _ in self.ordering]
+        payload = json.dumps([direction, values], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if direction not in (NEXT, PREVIOUS) or len(values) != len(self.ordering):
+                raise ValueError(cursor)
+            return direction, [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except Exception as e:
+            raise InvalidCursor(f'Invalid cursor: {cursor}') from e
+
+    @staticmethod
+    def _dump_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    # Querying
+
+    def _order_by(self, reverse):
+        return [
+            f"{'-' if descending != reverse else ''}{name}"
+            for name, descending in self.ordering
+        ]
+
+    def _seek_filter(self, values, reverse):
+        """ Rows strictly after values in the (possibly reversed) ordering. """
+        condition = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            clause = Q(**{f'{name}__{lookup}': values[index]})
+            for (prior_name, _), prior_value in zip(self.ordering[:index], values):
+                clause &= Q(**{prior_name: prior_value})
+            condition |= clause
+        return condition
+
+    def get_page(self, cursor=None):
+        direction, values = NEXT, None
+        if cursor == LAST:
+            direction = PREVIOUS
+        elif cursor:
+            try:
+                direction, values = self.decode_cursor(cursor)
+            except InvalidCursor:
+                direction, values = NEXT, None
+
+        reverse = direction == PREVIOUS
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, reverse))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            # A 'last' page has nothing after it; a previous page came from one
+            return KeysetPage(rows, self, has_next=values is not None, has_previous=has_more)
+        return KeysetPage(rows, self, has_next=has_more, has_previous=values is not None)
+
+
+def count_by(queryset, field, values):
+    """
+    Counts the rows of queryset in one conditional-aggregation query.
+    Returns {'total': n, value: n, ...} for each of the given values of field.
+    """
+    counts = queryset.order_by().aggregate(
+        total=Count('pk'),
+        **{f'count_{index}': Count('pk', filter=Q(**{field: value})) for index, value in enumerate(values)},
+    )
+    return {'total': counts['total'], **{value: counts[f'count_{index}'] for index, value in enumerate(values)}}
@@ -3,7 +3,6 @@ from django.core.exceptions import ValidationError
 from GMSApp.modules import templatespath, encryption_util, managesession, audit
 from django.contrib import messages
 from GMSApp.models import Users,RelGarageUser
-from GMSApp.modules.acl import acls
 from django.utils import timezone
 from datetime import timedelta
 import logging, random
@@ -72,7 +71,7 @@ def login(request):
                     keys_to_set['business_logo'] = rel_garage_user.garage.logo 
                 
                 # calling functions 
-                keys_to_set['useruiacl'] = acls.fetchRolesAcl(user.roles.id)  # Store structured ACL
+                keys_to_set['userroleid'] = user.roles.id  # Compiled ACL is looked up per request (acls.fetchRolesAcl)
                 
                 # Get garage_ids if conditions are met, otherwise use empty list
                 garage_ids = (list(user.rel_garage_user.values_list('garage_id', flat=True).distinct())
@@ -1,15 +1,23 @@
 from functools import wraps
+from importlib import import_module
+from django.conf import settings
 from django.shortcuts import redirect
 from django.http import HttpResponseRedirect
 from django.contrib import messages
-from django.contrib.sessions.backends.db import SessionStore
 from datetime import timedelta, datetime
 from dateutil.parser import parse
 from django.utils import timezone
+from GMSApp.modules.acl import acls
+
+# Session backend (see SESSION_ENGINE in settings)
+SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
 
 # Define the maximum inactivity duration (1 hour)
 MAX_INACTIVITY_DURATION = timedelta(hours=1)
 
+# Persist last_activity at most once per interval (seconds)
+ACTIVITY_WRITE_INTERVAL = getattr(settings, 'SESSION_ACTIVITY_WRITE_INTERVAL', 60)
+
 def set_session_keys(keys, response):
     """ Sets session keys and stores last activity timestamp. """
     session = SessionStore()
@@ -22,9 +30,11 @@ def set_session_keys(keys, response):
     return response
 
 def get_session_key(request):
-    """ Retrieves session using the session key from cookies. """
-    session_key = request.COOKIES.get('session_key')
-    return SessionStore(session_key=session_key) if session_key else None
+    """ Retrieves session using the session key from cookies, once per request. """
+    if not hasattr(request, '_gms_session'):
+        session_key = request.COOKIES.get('session_key')
+        request._gms_session = SessionStore(session_key=session_key) if session_key else None
+    return request._gms_session
 
 def clear_all_session(request, response):
     """ Clears all session data and removes session cookie. """
@@ -45,9 +55,13 @@ def check_inactivity_timeout(request):
             request.session.flush()
             return True  # Session expired
 
-        # Update last activity time
+        # Update last activity time, the write is coalesced when the
+        # backend supports it
         session['last_activity'] = str(timezone.now())
-        session.save()
+        if hasattr(session, 'save_activity'):
+            session.save_activity(ACTIVITY_WRITE_INTERVAL)
+        else:
+            session.save()
 
     return False  # Session is still valid
 
@@ -71,7 +85,7 @@ def get_user_session(request):
             'usertype': session.get('usertype'),
             'userstatus': session.get('userstatus'),
             'userexpiry': datetime.strptime(session.get('userexpiry', '')[:19], "%Y-%m-%d %H:%M:%S") if session.get('userexpiry') else None,
-            'useruiacl': session.get('useruiacl', {}),
+            'useruiacl': acls.fetchRolesAcl(session['userroleid']) if session.get('userroleid') else session.get('useruiacl', {}),
             'garage_id': session.get('garage_id'),
             'allowed_garage_ids': session.get('allowed_garage_ids', []),
             'allowed_city_ids': session.get('allowed_city_ids', []),
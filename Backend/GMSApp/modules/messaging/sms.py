@@ -0,0 +1,101 @@
+"""
+Client of the PVY Infotech SMS gateway.
+
+One requests.Session per process keeps connections to the gateway alive
+between messages; every request has connect and read timeouts. Messages
+are queued with GMSApp.modules.outbox and sent by `manage.py run_outbox`,
+never from a request.
+"""
+import os
+import threading
+from urllib.parse import quote, urlencode
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+SMS_GATEWAY_URL = getattr(settings, 'SMS_GATEWAY_URL', 'http://msg.pvyinfotech.com/rest/services/sendSMS/sendGroupSms')
+SMS_AUTH_KEY = getattr(settings, 'SMS_AUTH_KEY', '')
+SMS_SENDER_ID = getattr(settings, 'SMS_SENDER_ID', 'PVYINF')
+SMS_CONNECT_TIMEOUT = getattr(settings, 'SMS_CONNECT_TIMEOUT', 3)
+SMS_READ_TIMEOUT = getattr(settings, 'SMS_READ_TIMEOUT', 10)
+SMS_POOL_SIZE = getattr(settings, 'SMS_POOL_SIZE', 10)
+
+# responseCode of an accepted message
+ACCEPTED = '3001'
+
+OTP_MESSAGE = 'Dear user of BIKEDOOT, Your Login OTP is {otp}. Pls do not share it with anyone. Regards PVY INFOTECH'
+
+
+class SmsError(Exception):
+    """ A message the gateway did not accept. retryable is False when sending it again cannot help. """
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class GatewayClient:
+    def __init__(self, url=SMS_GATEWAY_URL, auth_key=SMS_AUTH_KEY, sender_id=SMS_SENDER_ID,
+                 timeout=(SMS_CONNECT_TIMEOUT, SMS_READ_TIMEOUT), pool_size=SMS_POOL_SIZE):
+        self.url = url
+        self.auth_key = auth_key
+        self.sender_id = sender_id
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Retries are the outbox's job, the adapter fails fast
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json', 'Cache-Control': 'no-cache'})
+
+    def send(self, mobile, message):
+        """ Sends one message, raising SmsError unless the gateway accepts it. """
+        query = urlencode({
+            'AUTH_KEY': self.auth_key,
+            'message': message,
+            'senderId': self.sender_id,
+            'routeId': 1,
+            'mobileNos': mobile,
+            'smsContentType': 'english',
+        }, quote_via=quote)
+        try:
+            response = self.session.get(f'{self.url}?{query}', timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise SmsError(f'Gateway unreachable: {e}')
+
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            raise SmsError(f'Gateway rejected the request: HTTP {response.status_code}', retryable=False)
+        if response.status_code >= 400:
+            raise SmsError(f'Gateway error: HTTP {response.status_code}')
+        try:
+            result = response.json()
+        except ValueError:
+            raise SmsError('Gateway returned an invalid response')
+        if not isinstance(result, dict) or result.get('responseCode') != ACCEPTED:
+            raise SmsError(f'Gateway did not accept the message: {result}')
+        return result
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """ The process's GatewayClient, created on first use and again after a fork. """
+    global _client, _client_pid
+    if _client_pid != os.getpid():
+        with _client_lock:
+            if _client_pid != os.getpid():
+                _client = GatewayClient()
+                _client_pid = os.getpid()
+    return _client
+
+
+def deliver(message):
+    """ Outbox sender of OutboundMessage.SMS """
+    get_client().send(message.recipient, message.payload['text'])
@@ -0,0 +1,95 @@
+"""
+Local stand-in for the SMS gateway, for development and benchmarks.
+
+Answers every GET with the gateway's accepted response after a fixed
+latency, or with HTTP 503 for a fraction of the requests. It speaks
+HTTP/1.1, so pooled clients keep their connections, and counts requests
+and connections. Point SMS_GATEWAY_URL at StubGateway.url to use it.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from GMSApp.modules.messaging.sms import ACCEPTED
+
+GATEWAY_PATH = '/rest/services/sendSMS/sendGroupSms'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; with Nagle on, kept-alive connections stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stub.count('connections')
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub.count('requests')
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        if stub.fail_rate and random.random() < stub.fail_rate:
+            stub.count('failed')
+            self._reply(503, {'responseCode': '5000', 'message': 'Stub failure'})
+            return
+
+        query = parse_qs(urlsplit(self.path).query)
+        stub.record(query.get('mobileNos', [''])[0], query.get('message', [''])[0])
+        self._reply(200, {'responseCode': ACCEPTED, 'message': 'Stub accepted'})
+
+    def _reply(self, status_code, body):
+        content = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubGateway:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, fail_rate=0.0, keep_messages=1000):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.keep_messages = keep_messages
+        self.counters = {'connections': 0, 'requests': 0, 'failed': 0}
+        self.messages = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}{GATEWAY_PATH}'
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def record(self, mobile, message):
+        with self._lock:
+            self.messages.append((mobile, message))
+            del self.messages[:-self.keep_messages]
+
+    def start(self):
+        """ Serves from a background thread and returns self. """
+        self._thread = threading.Thread(target=self.server.serve_forever, name='sms-stub-gateway', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
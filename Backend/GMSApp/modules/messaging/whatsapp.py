@@ -1,22 +1,129 @@
+"""
+WhatsApp messages through Twilio.
+
+Views queue messages with GMSApp.modules.outbox in their own transaction;
+`manage.py run_outbox` sends them with the provider named by
+WHATSAPP_PROVIDER, created once per process. FakeProvider stands in for
+Twilio in development, tests and benchmarks.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+
 from django.conf import settings
+from django.utils.module_loading import import_string
+from twilio.base.exceptions import TwilioException, TwilioRestException
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
 
-client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+from GMSApp.models import OutboundMessage
+from GMSApp.modules import outbox
 
-def send_create_jobcard_message(vehicle_name, jobcard_number, vehicle_number):
-    print('skip till number verified')
-    # message = client.messages.create(
-    #     from_=settings.TWILIO_WHATSAPP_FROM,
-    #     content_sid='HX3e616b6228cdcf0805568e62183c46c3',
-    #     content_variables='{"1": "%s","2": "%s", "3": "%s"}' % (vehicle_name, jobcard_number, vehicle_number),
-    #     to='whatsapp:+919470918684'
-    # )
-    # print(message.sid)
+WHATSAPP_PROVIDER = getattr(settings, 'WHATSAPP_PROVIDER', 'GMSApp.modules.messaging.whatsapp.TwilioProvider')
+WHATSAPP_TIMEOUT = getattr(settings, 'WHATSAPP_TIMEOUT', 10)
+# Job card messages go to a fixed, verified test number until customer numbers are verified
+WHATSAPP_JOBCARD_MESSAGES = getattr(settings, 'WHATSAPP_JOBCARD_MESSAGES', False)
+WHATSAPP_JOBCARD_TO = getattr(settings, 'WHATSAPP_JOBCARD_TO', 'whatsapp:+919470918684')
 
-def reply_to_whatsapp_message():
-    message = client.messages.create(
-        from_=settings.TWILIO_WHATSAPP_FROM,
-        body='Hello, this is a reply from Twilio WhatsApp API!',
-        to='whatsapp:+919470918684'
+CREATE_JOBCARD_CONTENT_SID = 'HX3e616b6228cdcf0805568e62183c46c3'
+
+
+class WhatsAppError(Exception):
+    """ A message the provider did not accept. retryable is False when sending it again cannot help. """
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class TwilioProvider:
+    """ One Twilio client, and so one pooled HTTP session, for every message of the process. """
+
+    def __init__(self):
+        self.client = Client(
+            settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN,
+            http_client=TwilioHttpClient(pool_connections=True, timeout=WHATSAPP_TIMEOUT),
+        )
+
+    def send(self, to, content_sid=None, content_variables=None, body=None):
+        kwargs = {'from_': settings.TWILIO_WHATSAPP_FROM, 'to': to}
+        if content_sid:
+            kwargs['content_sid'] = content_sid
+            kwargs['content_variables'] = json.dumps(content_variables or {})
+        else:
+            kwargs['body'] = body
+        try:
+            return self.client.messages.create(**kwargs).sid
+        except TwilioRestException as e:
+            # Bad numbers, templates or credentials fail the same way every time
+            raise WhatsAppError(f'Twilio error {e.code}: {e.msg}', retryable=e.status == 429 or e.status >= 500)
+        except TwilioException as e:
+            raise WhatsAppError(f'Twilio unreachable: {e}')
+
+
+class FakeProvider:
+    """ Records messages in memory instead of sending them, after an optional latency and failure rate. """
+    latency = 0.0
+    fail_rate = 0.0
+
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, to, content_sid=None, content_variables=None, body=None):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            raise WhatsAppError('Fake provider failure')
+        with self._lock:
+            self.sent.append({'to': to, 'content_sid': content_sid, 'content_variables': content_variables, 'body': body})
+            return f'FAKE{len(self.sent):08d}'
+
+
+_provider = None
+_provider_pid = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """ The process's provider, created on first use and again after a fork. """
+    global _provider, _provider_pid
+    if _provider_pid != os.getpid():
+        with _provider_lock:
+            if _provider_pid != os.getpid():
+                _provider = import_string(WHATSAPP_PROVIDER)()
+                _provider_pid = os.getpid()
+    return _provider
+
+
+def deliver(message):
+    """ Outbox sender of OutboundMessage.WHATSAPP """
+    payload = message.payload
+    get_provider().send(
+        message.recipient,
+        content_sid=payload.get('content_sid'),
+        content_variables=payload.get('content_variables'),
+        body=payload.get('body'),
     )
-    print(message.sid)
\ No newline at end of file
+
+
+def queue_create_jobcard_message(vehicle_name, jobcard_number, vehicle_number):
+    """
+    Queues the job card created message in the caller's transaction, so it
+    is sent only if the job card is saved. Returns the message, or None
+    while WHATSAPP_JOBCARD_MESSAGES is off.
+    """
+    if not WHATSAPP_JOBCARD_MESSAGES:
+        logging.getLogger(__name__).debug('Job card WhatsApp messages are off, skipping %s', jobcard_number)
+        return None
+    return outbox.enqueue(OutboundMessage.WHATSAPP, WHATSAPP_JOBCARD_TO, {
+        'content_sid': CREATE_JOBCARD_CONTENT_SID,
+        'content_variables': {'1': vehicle_name, '2': jobcard_number, '3': vehicle_number},
+    })
+
+
+def reply_to_whatsapp_message():
+    get_provider().send(WHATSAPP_JOBCARD_TO, body='Hello, this is a reply from Twilio WhatsApp API!')
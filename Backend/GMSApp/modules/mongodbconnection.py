@@ -1,20 +1,194 @@
-#privious code
+"""
+One MongoClient per process, shared by every request.
+
+A MongoClient owns a connection pool and monitor threads, so it is built
+lazily on first use (connect=False, nothing is opened in a gunicorn master)
+and built again in a forked worker: PyMongo clients are not fork-safe. It
+is closed at interpreter exit. PyMongo reconnects on its own; the settings
+below bound how long a request waits for a server or a pooled connection,
+and reads and writes are retried once after a network error or failover.
+"""
+import atexit
+import os
+import threading
+import time
+
+from pymongo import monitoring
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 from urllib.parse import quote_plus
 from django.shortcuts import render, redirect
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+MONGO_CLIENT_CLASS = getattr(settings, 'MONGO_CLIENT_CLASS', 'pymongo.mongo_client.MongoClient')
+MONGO_MAX_POOL_SIZE = getattr(settings, 'MONGO_MAX_POOL_SIZE', 50)
+MONGO_MIN_POOL_SIZE = getattr(settings, 'MONGO_MIN_POOL_SIZE', 0)
+MONGO_MAX_IDLE_TIME_MS = getattr(settings, 'MONGO_MAX_IDLE_TIME_MS', 300000)
+MONGO_CONNECT_TIMEOUT_MS = getattr(settings, 'MONGO_CONNECT_TIMEOUT_MS', 5000)
+MONGO_SOCKET_TIMEOUT_MS = getattr(settings, 'MONGO_SOCKET_TIMEOUT_MS', 20000)
+MONGO_SERVER_SELECTION_TIMEOUT_MS = getattr(settings, 'MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)
+MONGO_WAIT_QUEUE_TIMEOUT_MS = getattr(settings, 'MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000)
+MONGO_HEARTBEAT_FREQUENCY_MS = getattr(settings, 'MONGO_HEARTBEAT_FREQUENCY_MS', 10000)
+MONGO_RETRY = getattr(settings, 'MONGO_RETRY', True)
+
+# A checkout slower than this waited for a free connection
+MONGO_WAIT_THRESHOLD_MS = 1
+
+
+class MongoPoolStats(monitoring.ConnectionPoolListener):
+    """ Counters of the client's connection pools, for sizing MONGO_MAX_POOL_SIZE. """
+
+    FIELDS = (
+        'checkouts', 'waits', 'wait_ms_total', 'wait_ms_max', 'checkout_failures', 'checkout_timeouts',
+        'connections_created', 'connections_closed', 'pool_clears',
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = dict.fromkeys(self.FIELDS, 0)
+            self.checked_out = 0
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters, checked_out=self.checked_out)
+
+    def connection_checked_out(self, event):
+        wait_ms = (event.duration or 0) * 1000
+        with self._lock:
+            self.counters['checkouts'] += 1
+            self.checked_out += 1
+            if wait_ms >= MONGO_WAIT_THRESHOLD_MS:
+                self.counters['waits'] += 1
+                self.counters['wait_ms_total'] += wait_ms
+                self.counters['wait_ms_max'] = max(self.counters['wait_ms_max'], wait_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.counters['checkout_failures'] += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.counters['checkout_timeouts'] += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.counters['connections_created'] += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.counters['connections_closed'] += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.counters['pool_clears'] += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+pool_stats = MongoPoolStats()
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def _build_client():
+    if not getattr(settings, 'MONGO_URI', None):
+        raise ImproperlyConfigured('MONGO_URI is not set')
+    return import_string(MONGO_CLIENT_CLASS)(
+        settings.MONGO_URI,
+        server_api=ServerApi('1'),
+        connect=False,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        heartbeatFrequencyMS=MONGO_HEARTBEAT_FREQUENCY_MS,
+        retryReads=MONGO_RETRY,
+        retryWrites=MONGO_RETRY,
+        event_listeners=[pool_stats],
+    )
+
+
+def get_mongo_client():
+    """ The process's MongoClient, built on first use and again after a fork. """
+    global _client, _client_pid
+    if _client_pid != os.getpid():
+        with _client_lock:
+            if _client_pid != os.getpid():
+                _client = _build_client()
+                _client_pid = os.getpid()
+    return _client
+
+
+def _forget_client():
+    # In a forked child: the parent's client, its sockets and threads belong to the parent
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    pool_stats._lock = threading.Lock()
+    pool_stats.reset()
+
+
+def close_mongo_client():
+    """ Closes this process's client; the next get_mongo_client() builds a new one. """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_client)
+atexit.register(close_mongo_client)
 
 
 def get_mongo_db():
     """Returns a MongoDB database connection."""
     try:
-        client = MongoClient(settings.MONGO_URI, server_api=ServerApi('1'))
-        db = client[settings.MONGO_DB_NAME]  # Database name
-        return db
+        return get_mongo_client()[settings.MONGO_DB_NAME]  # Database name
     except Exception as e:
         return None
 
 
-
-
+def mongo_health():
+    """ Pings the server through the shared client: {'ok', 'latency_ms', 'error', 'pool'}. """
+    started = time.perf_counter()
+    try:
+        get_mongo_client().admin.command('ping')
+        ok, error = True, ''
+    except Exception as e:
+        ok, error = False, str(e)
+    return {
+        'ok': ok,
+        'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+        'error': error,
+        'pool': pool_stats.snapshot(),
+    }
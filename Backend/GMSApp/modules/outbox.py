@@ -0,0 +1,199 @@
+"""
+Database-backed outbox for SMS, WhatsApp and other outbound messages.
+
+Requests call enqueue() in their own transaction and return without waiting
+for the provider. `manage.py run_outbox` claims due messages with
+SELECT ... FOR UPDATE SKIP LOCKED and hands each to the sender registered
+for its channel, from a bounded thread pool. A sender raises on failure;
+the message is then retried with exponential backoff, or marked failed
+(the dead letter state, see requeue_failed) when the error has
+retryable=False or OUTBOX_MAX_ATTEMPTS is reached. Each worker process
+paces every channel to its provider's rate and limits deliveries to one
+recipient.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from GMSApp.models import OutboundMessage
+
+OUTBOX_BATCH_SIZE = getattr(settings, 'OUTBOX_BATCH_SIZE', 20)
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+OUTBOX_RETRY_BASE_DELAY = getattr(settings, 'OUTBOX_RETRY_BASE_DELAY', 2)
+OUTBOX_RETRY_MAX_DELAY = getattr(settings, 'OUTBOX_RETRY_MAX_DELAY', 60)
+# Seconds after which a message claimed by a worker that stopped is sent again
+OUTBOX_STALE_AFTER = getattr(settings, 'OUTBOX_STALE_AFTER', 120)
+# Channel -> (messages, seconds) allowed to one recipient
+OUTBOX_RECIPIENT_RATE_LIMITS = getattr(settings, 'OUTBOX_RECIPIENT_RATE_LIMITS', {OutboundMessage.SMS: (3, 600)})
+# Channel -> messages per second sent to the provider
+OUTBOX_CHANNEL_RATES = getattr(settings, 'OUTBOX_CHANNEL_RATES', {OutboundMessage.SMS: 20, OutboundMessage.WHATSAPP: 10})
+
+OUTBOX_SENDERS = {
+    OutboundMessage.SMS: 'GMSApp.modules.messaging.sms.deliver',
+    OutboundMessage.WHATSAPP: 'GMSApp.modules.messaging.whatsapp.deliver',
+}
+
+
+def enqueue(channel, recipient, payload, replace_pending=False):
+    """
+    Queues a message and returns it. With replace_pending, messages of the
+    channel still pending for the recipient are cancelled, e.g. older OTPs.
+    """
+    with transaction.atomic():
+        if replace_pending:
+            OutboundMessage.objects.filter(
+                recipient=recipient, status=OutboundMessage.PENDING, channel=channel,
+            ).update(status=OutboundMessage.CANCELLED, last_error='Replaced by a newer message', updated_at=timezone.now())
+        return OutboundMessage.objects.create(channel=channel, recipient=recipient, payload=payload)
+
+
+def release_stale():
+    """ Puts messages claimed by a worker that stopped back in the queue. """
+    now = timezone.now()
+    return OutboundMessage.objects.filter(
+        status=OutboundMessage.SENDING,
+        claimed_at__lt=now - timedelta(seconds=OUTBOX_STALE_AFTER),
+    ).update(status=OutboundMessage.PENDING, next_attempt_at=now, updated_at=now)
+
+
+def claim_due(limit=OUTBOX_BATCH_SIZE):
+    """ Marks up to limit due messages as sending and returns them, oldest due first. """
+    with transaction.atomic():
+        now = timezone.now()
+        messages = list(
+            OutboundMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundMessage.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:limit]
+        )
+        if messages:
+            OutboundMessage.objects.filter(id__in=[m.id for m in messages]).update(
+                status=OutboundMessage.SENDING, claimed_at=now, updated_at=now,
+            )
+        for message in messages:
+            message.status = OutboundMessage.SENDING
+            message.claimed_at = now
+    return messages
+
+
+def requeue_failed(channel=None, ids=None):
+    """ Queues failed (dead letter) messages again with a fresh attempt budget. Returns how many. """
+    messages = OutboundMessage.objects.filter(status=OutboundMessage.FAILED)
+    if channel:
+        messages = messages.filter(channel=channel)
+    if ids:
+        messages = messages.filter(id__in=ids)
+    now = timezone.now()
+    return messages.update(status=OutboundMessage.PENDING, attempts=0, next_attempt_at=now, updated_at=now)
+
+
+def retry_delay(attempts):
+    """ Seconds before attempt attempts + 1: doubling from the base delay, capped, with jitter. """
+    delay = min(OUTBOX_RETRY_MAX_DELAY, OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class RateLimiter:
+    """ Sliding window of at most limit events per key in period seconds. Thread-safe. """
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """ Records an event and returns 0, or returns the seconds until one is allowed. """
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.setdefault(key, deque())
+            while events and events[0] <= now - self.period:
+                events.popleft()
+            if len(events) >= self.limit:
+                return events[0] + self.period - now
+            events.append(now)
+            return 0
+
+
+class TokenBucket:
+    """ Paces callers to rate per second, allowing bursts of burst. Thread-safe; acquire() blocks. """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Sender:
+    """
+    Delivers claimed messages through the registered senders, one per
+    channel. deliver() may be called from several threads at once.
+    """
+
+    def __init__(self, rate_limits=OUTBOX_RECIPIENT_RATE_LIMITS, channel_rates=OUTBOX_CHANNEL_RATES):
+        self.limiters = {channel: RateLimiter(*limit) for channel, limit in rate_limits.items()}
+        self.buckets = {channel: TokenBucket(rate) for channel, rate in channel_rates.items()}
+        self._senders = {}
+
+    def sender_for(self, channel):
+        if channel not in self._senders:
+            self._senders[channel] = import_string(OUTBOX_SENDERS[channel])
+        return self._senders[channel]
+
+    def deliver(self, message):
+        """ Sends one claimed message and records the outcome. Returns the new status. """
+        now = timezone.now()
+        limiter = self.limiters.get(message.channel)
+        wait = limiter.acquire(message.recipient) if limiter else 0
+        if wait:
+            # Throttled, not failed: try again once the window allows it
+            message.status = OutboundMessage.PENDING
+            message.next_attempt_at = now + timedelta(seconds=wait)
+            message.save(update_fields=['status', 'next_attempt_at', 'updated_at'])
+            return message.status
+
+        bucket = self.buckets.get(message.channel)
+        if bucket:
+            bucket.acquire()
+
+        message.attempts += 1
+        try:
+            self.sender_for(message.channel)(message)
+        except Exception as e:
+            retryable = getattr(e, 'retryable', True)
+            if not hasattr(e, 'retryable'):
+                logging.getLogger(__name__).exception(f"Outbound message {message.id} ({message.channel}) failed")
+            message.last_error = str(e)
+            if retryable and message.attempts < OUTBOX_MAX_ATTEMPTS:
+                message.status = OutboundMessage.PENDING
+                message.next_attempt_at = now + timedelta(seconds=retry_delay(message.attempts))
+            else:
+                message.status = OutboundMessage.FAILED
+        else:
+            message.status = OutboundMessage.SENT
+            message.sent_at = timezone.now()
+            message.last_error = ''
+
+        message.save(update_fields=['status', 'attempts', 'next_attempt_at', 'sent_at', 'last_error', 'updated_at'])
+        return message.status
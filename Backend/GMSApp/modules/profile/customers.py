@@ -4,8 +4,8 @@ from django.contrib import messages
 from django.http import JsonResponse
 from django.db import transaction
 from django.db.models import Q
-from django.core.paginator import Paginator
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules.keysetpaginator import KeysetPaginator
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from GMSApp.models import Customer, Vehicle
@@ -35,15 +35,11 @@ def r_prf_customers(request, context):
             Customer.objects
             .filter(customer_filter)
             .annotate(vehicle_count=Count('vehicle'))
-            .order_by('-vehicle_count')
         )
 
-        # Pagination
-        paginator = Paginator(customer_objs, 100)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-
-        context['customer_objs'] = page_obj
+        # Pagination, newest first
+        paginator = KeysetPaginator(customer_objs, 100, params=request.GET)
+        context['customer_objs'] = paginator.get_page(request.GET.get('cursor'))
         
         # calling functions
         audit.create_audit_log(context['useremail'], f'USER: {context["useremail"]}, {request.method}: {request.path}', 'r_prf_customers', 200)
@@ -238,15 +234,10 @@ def d_prf_customers(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    customer_obj = get_object_or_404(Customer, id=id)
-                    if customer_obj:
-                        deleted_data.append(customer_obj.id) 
-                        customer_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} customers deleted"
+                deleted_count = bulkdelete.bulk_delete(Customer, product_ids, Customer.objects.filter(garage_id=context['garage_id']))
+
+                if deleted_count:
+                    msg = f"{deleted_count} customers deleted"
                     sts = True
                 else:
                     msg = "Failed to delete customers"
@@ -6,8 +6,8 @@ from django.http import HttpResponse
 from django.db import transaction
 from django.db.models import Q, Max, Count
 from django.conf import settings
-from django.core.paginator import Paginator
-from GMSApp.modules import templatespath, managesession, audit, customfunctions
+from GMSApp.modules.keysetpaginator import KeysetPaginator
+from GMSApp.modules import templatespath, managesession, audit, customfunctions, bulkdelete
 from GMSApp.models import Customer, Vehicle
 from datetime import datetime, timezone, timedelta
 from django.db.models.functions import TruncMonth, ExtractYear, ExtractMonth
@@ -246,7 +246,7 @@ def r_vehicles(request, context):
         # Get all vehicles for the current garage
         vehicles = Vehicle.objects.filter(
             garage_id=context['garage_id']
-        ).select_related('customer').order_by('-updated_at')
+        ).select_related('customer')
         
         # Search functionality
         search_query = request.GET.get('search', '')
@@ -260,9 +260,8 @@ def r_vehicles(request, context):
             )
         
         # Pagination
-        paginator = Paginator(vehicles, 10)  # Show 10 vehicles per page
-        page_number = request.GET.get('page', 1)
-        vehicles_page = paginator.get_page(page_number)
+        paginator = KeysetPaginator(vehicles, 10, params=request.GET)  # Show 10 vehicles per page
+        vehicles_page = paginator.get_page(request.GET.get('cursor'))
         
         # Context data
         context_data = {
@@ -606,15 +605,15 @@ def d_vehicles(request, context):
                 if not ids:
                     return JsonResponse({'status': False, 'message': 'No vehicles selected for deletion'})
                 
-                # Delete selected vehicles
-                Vehicle.objects.filter(id__in=ids).delete()
+                # Delete selected vehicles, unless any is still in use
+                bulkdelete.bulk_delete(Vehicle, ids, Vehicle.objects.filter(garage_id=context['garage_id']))
                 
                 msg = f"Selected vehicles deleted successfully"
                 audit.create_audit_log(context['useremail'], f'USER: {context["useremail"]}, {request.method}: {request.path}', msg, 200)
                 return JsonResponse({'status': True, 'message': msg})
                 
-        except Exception as e:
-            error_msg = str(e)
+        except (ValidationError, Exception) as e:
+            error_msg = ', '.join(e.messages) if isinstance(e, ValidationError) else str(e)
             audit.create_audit_log(context['useremail'], f'USER: {context["useremail"]}, {request.method}: {request.path}', error_msg, 400)
             logging.getLogger(__name__).error(f"Exception: {request.path}: {error_msg}")
             return JsonResponse({'status': False, 'message': error_msg})
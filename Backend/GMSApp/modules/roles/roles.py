@@ -1,6 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.core.exceptions import ValidationError
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from django.contrib import messages
 from django.http import JsonResponse
 from GMSApp.models import Roles, RolesPermissions, AccessPermissions
@@ -131,15 +131,10 @@ def d_roles(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    roles_obj = get_object_or_404(Roles, id=id)
-                    if roles_obj:
-                        deleted_data.append(roles_obj.id) 
-                        roles_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} roles deleted"
+                deleted_count = bulkdelete.bulk_delete(Roles, product_ids)
+
+                if deleted_count:
+                    msg = f"{deleted_count} roles deleted"
                     sts = True
                 else:
                     msg = "Failed to roles accounts"
@@ -8,7 +8,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import GarageStaff
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from django.conf import settings
 from datetime import datetime, timedelta
 import logging, json, os
@@ -216,15 +216,10 @@ def d_staff(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    staff_obj = GarageStaff.objects.filter(id=id).first()
-                    if staff_obj:
-                        deleted_data.append(staff_obj.id) 
-                        staff_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} staff deleted"
+                deleted_count = bulkdelete.bulk_delete(GarageStaff, product_ids, GarageStaff.objects.filter(garage_id=context['garage_id']))
+
+                if deleted_count:
+                    msg = f"{deleted_count} staff deleted"
                     sts = True
                 else:
                     msg = "Failed to delete staff"
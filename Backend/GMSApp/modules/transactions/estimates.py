@@ -1,11 +1,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import Customer, Vehicle, Estimate, ProductCatalogues, TXNService, relEstimateProductCatalogues, relEstimateService, Jobcard
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
+from GMSApp.modules.transactions import lineitems
+from GMSApp.modules.keysetpaginator import KeysetPaginator, count_by
 from django.views.decorators.csrf import csrf_exempt
 from datetime import datetime
 import logging
@@ -18,10 +19,11 @@ def r_txn_estimates(request, context):
     if request.method == 'GET':       
         estimate_objs = Estimate.objects.filter(garage_id=context['garage_id'])
 
-        # Get counts before pagination (for all)        
-        context['total_estimate'] = estimate_objs.count()
-        context['created_estimate'] = estimate_objs.filter(status='created').count()
-        context['dispatched_estimate'] = estimate_objs.filter(status='dispatched').count()
+        # Get counts before pagination (for all), in one query
+        counts = count_by(estimate_objs, 'status', ['created', 'dispatched'])
+        context['total_estimate'] = counts['total']
+        context['created_estimate'] = counts['created']
+        context['dispatched_estimate'] = counts['dispatched']
 
         # Check for filter parameter in URL
         status_filter = request.GET.get('filter')
@@ -29,10 +31,8 @@ def r_txn_estimates(request, context):
             estimate_objs = estimate_objs.filter(status=status_filter) 
 
         # Pagination
-        paginator = Paginator(estimate_objs, 100)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        context['estimate_objs'] = page_obj  
+        paginator = KeysetPaginator(estimate_objs, 100, params=request.GET, count=counts.get(status_filter, counts['total']))
+        context['estimate_objs'] = paginator.get_page(request.GET.get('cursor'))
 
         # calling functions
         audit.create_audit_log(context['useremail'], f'USER: {context["useremail"]}, {request.method}: {request.path}', 'r_txn_estimates', 200)
@@ -83,6 +83,9 @@ def c_txn_estimates(request, context):
                 customer = get_object_or_404(Customer, id=customer_id)
                 vehicle = get_object_or_404(Vehicle, id=vehicle_id)
 
+                # Resolve all line items with one fetch per table
+                parts, services, _ = lineitems.read_posted_lines(request.POST, context['garage_id'], 'external estimate')
+
                 # Get the total amount from the form
                 amount = request.POST.get('amount', 0)
                 
@@ -98,94 +101,8 @@ def c_txn_estimates(request, context):
                     amount=float(amount)
                 )
 
-                # Insert Fromdb Parts
-                fromdb_part_ids = request.POST.getlist('fromdb_partname')
-                fromdb_part_values = request.POST.getlist('fromdb_partvalue')
-                fromdb_part_taxes = request.POST.getlist('fromdb_parttax')
-                fromdb_part_discounts = request.POST.getlist('fromdb_partdiscount')
-
-                for i in range(len(fromdb_part_ids)):
-                    part_id = fromdb_part_ids[i]
-                    if part_id:  # Only insert if part is selected
-                        part = ProductCatalogues.objects.filter(id=part_id).first()
-                        relEstimateProductCatalogues.objects.create(
-                            estimate=estimate,
-                            part=part,
-                            part_source='inventory',
-                            part_name=part.name if part else '',
-                            part_value=fromdb_part_values[i] or 0,
-                            part_tax=fromdb_part_taxes[i] or 0,
-                            part_discount=fromdb_part_discounts[i] or 0
-                        )
-
-                # Insert Fromuser Parts
-                fromuser_part_names = request.POST.getlist('fromuser_partname')
-                fromuser_part_values = request.POST.getlist('fromuser_partvalue')
-                fromuser_part_taxes = request.POST.getlist('fromuser_parttax')
-                fromuser_part_discounts = request.POST.getlist('fromuser_partdiscount')
-
-                for i in range(len(fromuser_part_names)):
-                    if fromuser_part_names[i]:
-                        relEstimateProductCatalogues.objects.create(
-                            estimate=estimate,
-                            part=None,
-                            part_source='external',
-                            part_name=fromuser_part_names[i],
-                            part_value=fromuser_part_values[i] or 0,
-                            part_tax=fromuser_part_taxes[i] or 0,
-                            part_discount=fromuser_part_discounts[i] or 0
-                        )
-
-                # Insert Fromdb Services
-                fromdb_service_ids = request.POST.getlist('fromdb_servicename')
-                fromdb_service_values = request.POST.getlist('fromdb_servicevalue')
-                fromdb_service_taxes = request.POST.getlist('fromdb_servicetax')
-                fromdb_service_discounts = request.POST.getlist('fromdb_servicediscount')
-
-                for i in range(len(fromdb_service_ids)):
-                    service_id = fromdb_service_ids[i]
-                    if service_id:  # Only insert if service is selected
-                        service = TXNService.objects.filter(id=service_id).first()
-                        relEstimateService.objects.create(
-                            estimate=estimate,
-                            service=service,
-                            service_source='service',
-                            service_name=service.name if service else '',
-                            service_value=fromdb_service_values[i] or 0,
-                            service_tax=fromdb_service_taxes[i] or 0,
-                            service_discount=fromdb_service_discounts[i] or 0
-                        )
-
-                # Insert Fromuser Services
-                fromuser_service_names = request.POST.getlist('fromuser_servicename')
-                fromuser_service_values = request.POST.getlist('fromuser_servicevalue')
-                fromuser_service_taxes = request.POST.getlist('fromuser_servicetax')
-                fromuser_service_discounts = request.POST.getlist('fromuser_servicediscount')
-
-                for i in range(len(fromuser_service_names)):
-                    if fromuser_service_names[i]:
-                        check_txn_service = TXNService.objects.filter(name=fromuser_service_names[i], garage_id=context['garage_id']).first()
-                        if check_txn_service:
-                            service = check_txn_service                            
-                        else:
-                            service = TXNService.objects.create(
-                                garage_id=context['garage_id'],
-                                name=fromuser_service_names[i],
-                                price=fromuser_service_values[i] or 0,
-                                gst=fromuser_service_taxes[i] or 0,
-                                discount=fromuser_service_discounts[i] or 0,
-                                notes='external estimate'
-                            ) 
-
-                        relEstimateService.objects.create(
-                            estimate=estimate,
-                            service=service,
-                            service_source='service',
-                            service_name=service.name if service else '',
-                            service_value=fromuser_service_values[i] or 0,
-                            service_tax=fromuser_service_taxes[i] or 0,
-                            service_discount=fromuser_service_discounts[i] or 0
-                        )      
+                # Insert parts and services
+                lineitems.save_document_lines(relEstimateProductCatalogues, relEstimateService, 'estimate', estimate, parts, services)
 
                 # If jobcard_id exists in query parameters, update the jobcard with estimate ID
                 if qs_jobcard_id:
@@ -251,123 +168,22 @@ def u_txn_estimates(request, context, id):
                 customer = get_object_or_404(Customer, id=customer_id)
                 vehicle = get_object_or_404(Vehicle, id=vehicle_id)
 
-                if estimate:
-                    estimate.estimatedate = estimatedate
-                    estimate.pono = pono
-                    estimate.podate = podate
-                    estimate.customer = customer
-                    estimate.name = name
-                    estimate.vehicle = vehicle
-                    estimate.amount = float(request.POST.get('amount', 0))
-                    estimate.comments = comments
-                    # Status is only changed from the listing page, not during update
-                    estimate.save()
-
-                    relEstimateProductCatalogues.objects.filter(estimate=estimate).delete()
-                    relEstimateService.objects.filter(estimate=estimate).delete()
-                else:
-                    estimate = Estimate.objects.create(
-                        garage_id=context['garage_id'],
-                        estimatedate=estimatedate,
-                        pono=pono,
-                        podate=podate,
-                        customer=customer,
-                        name=name,
-                        vehicle=vehicle
-                    )
-
-                # --- Insert parts ---
-                fromdb_part_ids = request.POST.getlist('fromdb_partname')
-                fromdb_part_values = request.POST.getlist('fromdb_partvalue')
-                fromdb_part_taxes = request.POST.getlist('fromdb_parttax')
-                fromdb_part_discounts = request.POST.getlist('fromdb_partdiscount')
-                fromdb_part_quantities = request.POST.getlist('fromdb_partquantity')
-
-                for i in range(len(fromdb_part_ids)):
-                    part_id = fromdb_part_ids[i]
-                    if part_id:
-                        part = ProductCatalogues.objects.filter(id=part_id).first()
-                        quantity = int(fromdb_part_quantities[i]) if i < len(fromdb_part_quantities) and fromdb_part_quantities[i] else 1
-                        relEstimateProductCatalogues.objects.create(
-                            estimate=estimate,
-                            part=part,
-                            part_source='inventory',
-                            part_name=part.name if part else '',
-                            part_value=fromdb_part_values[i] or 0,
-                            part_tax=fromdb_part_taxes[i] or 0,
-                            part_discount=fromdb_part_discounts[i] or 0,
-                            quantity=quantity
-                        )
-
-                fromuser_part_names = request.POST.getlist('fromuser_partname')
-                fromuser_part_values = request.POST.getlist('fromuser_partvalue')
-                fromuser_part_taxes = request.POST.getlist('fromuser_parttax')
-                fromuser_part_discounts = request.POST.getlist('fromuser_partdiscount')
-
-                for i in range(len(fromuser_part_names)):
-                    if fromuser_part_names[i]:
-                        relEstimateProductCatalogues.objects.create(
-                            estimate=estimate,
-                            part=None,
-                            part_source='external',
-                            part_name=fromuser_part_names[i],
-                            part_value=fromuser_part_values[i] or 0,
-                            part_tax=fromuser_part_taxes[i] or 0,
-                            part_discount=fromuser_part_discounts[i] or 0
-                        )
-
-                # --- Insert services ---
-                fromdb_service_ids = request.POST.getlist('fromdb_servicename')
-                fromdb_service_values = request.POST.getlist('fromdb_servicevalue')
-                fromdb_service_taxes = request.POST.getlist('fromdb_servicetax')
-                fromdb_service_discounts = request.POST.getlist('fromdb_servicediscount')
-                fromdb_service_quantities = request.POST.getlist('fromdb_servicequantity')
-
-                for i in range(len(fromdb_service_ids)):
-                    service_id = fromdb_service_ids[i]
-                    if service_id:
-                        service = TXNService.objects.filter(id=service_id).first()
-                        quantity = int(fromdb_service_quantities[i]) if i < len(fromdb_service_quantities) and fromdb_service_quantities[i] else 1
-                        relEstimateService.objects.create(
-                            estimate=estimate,
-                            service=service,
-                            service_source='service',
-                            service_name=service.name if service else '',
-                            service_value=fromdb_service_values[i] or 0,
-                            service_tax=fromdb_service_taxes[i] or 0,
-                            service_discount=fromdb_service_discounts[i] or 0,
-                            quantity=quantity
-                        )
-
-                fromuser_service_names = request.POST.getlist('fromuser_servicename')
-                fromuser_service_values = request.POST.getlist('fromuser_servicevalue')
-                fromuser_service_taxes = request.POST.getlist('fromuser_servicetax')
-                fromuser_service_discounts = request.POST.getlist('fromuser_servicediscount')
-
-                for i in range(len(fromuser_service_names)):
-                    if fromuser_service_names[i]:
-                        check_txn_service = TXNService.objects.filter(name=fromuser_service_names[i], garage_id=context['garage_id']).first()
-                        if check_txn_service:
-                            service = check_txn_service                            
-                        else:
-                            service = TXNService.objects.create(
-                                garage_id=context['garage_id'],
-                                name=fromuser_service_names[i],
-                                price=fromuser_service_values[i] or 0,
-                                gst=fromuser_service_taxes[i] or 0,
-                                discount=fromuser_service_discounts[i] or 0,
-                                notes='external estimate'
-                            ) 
-
-                        relEstimateService.objects.create(
-                            estimate=estimate,
-                            service=service,
-                            service_source='service',
-                            service_name=service.name if service else '',
-                            service_value=fromuser_service_values[i] or 0,
-                            service_tax=fromuser_service_taxes[i] or 0,
-                            service_discount=fromuser_service_discounts[i] or 0
-                        )
+                # Resolve all line items with one fetch per table
+                parts, services, _ = lineitems.read_posted_lines(request.POST, context['garage_id'], 'external estimate')
+
+                estimate.estimatedate = estimatedate
+                estimate.pono = pono
+                estimate.podate = podate
+                estimate.customer = customer
+                estimate.name = name
+                estimate.vehicle = vehicle
+                estimate.amount = float(request.POST.get('amount', 0))
+                estimate.comments = comments
+                # Status is only changed from the listing page, not during update
+                estimate.save()
+
+                # Write only the parts and services that changed
+                lineitems.save_document_lines(relEstimateProductCatalogues, relEstimateService, 'estimate', estimate, parts, services, update=True)
 
                 messages.success(request, f"Estimate {estimate.estimateid} {'updated' if estimate else 'created'} successfully")
                 # calling functions
@@ -389,15 +205,10 @@ def d_txn_estimates(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    estimate_obj = get_object_or_404(Estimate, id=id)
-                    if estimate_obj:
-                        deleted_data.append(estimate_obj.id) 
-                        estimate_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} estimate deleted"
+                deleted_count = bulkdelete.bulk_delete(Estimate, product_ids, Estimate.objects.filter(garage_id=context['garage_id']))
+
+                if deleted_count:
+                    msg = f"{deleted_count} estimate deleted"
                     sts = True
                 else:
                     msg = "Failed to delete estimate"
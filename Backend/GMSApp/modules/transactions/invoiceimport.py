@@ -0,0 +1,551 @@
+"""
+Set-based invoice bulk import.
+
+The whole frame is normalized and validated with vectorized pandas
+operations, then written chunk by chunk: customers, vehicles and invoices
+are resolved with one query per key set and persisted with bulk_create /
+bulk_update, and the per-row outcome is recorded in InvoiceBulkUploadTXN in
+bulk. A chunk costs a fixed number of queries regardless of its size.
+"""
+import logging
+from collections import defaultdict
+
+import pandas as pd
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from GMSApp.models import (
+    Customer, DocumentSequence, Invoice, InvoiceBulkUploadTXN, TrackInvoiceUploads, TXNService, Vehicle,
+    relInvoiceProductCatalogues, relInvoiceService,
+)
+from GMSApp.modules import audit, jobqueue
+
+IMPORT_CHUNK_SIZE = 1000
+
+REQUIRED_COLUMNS = [
+    'invoice_id', 'invoice_date', 'customer_phone', 'customer_name', 'vehicle_model'
+]
+OPTIONAL_COLUMNS = [
+    'customer_gst', 'customer_address', 'customer_email', 'customer_pincode',
+    'vehicle_make', 'vehicle_license_plate_no', 'vehicle_external_bikeid',
+    'vehicle_registration_no', 'vehicle_fuel_type', 'vehicle_transmission_type',
+    'vehicle_engine_no', 'vehicle_chassis_no', 'vehicle_vin_no', 'vehicle_color',
+    'vehicle_reg_state', 'invoice_pono', 'vehicle_year_of_manufacture'
+]
+DATE_COLUMNS = ['invoice_date', 'invoice_podate', 'vehicle_reg_exp']
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%m/%d/%Y", "%d.%m.%Y")
+
+CUSTOMER_FIELDS = {
+    'name': 'customer_name', 'gst': 'customer_gst', 'address': 'customer_address',
+    'email': 'customer_email', 'pincode': 'customer_pincode',
+}
+VEHICLE_FIELDS = {
+    'make': 'vehicle_make', 'license_plate_no': 'vehicle_license_plate_no',
+    'external_bikeid': 'vehicle_external_bikeid', 'registration_no': 'vehicle_registration_no',
+    'year_of_manufacture': 'year_of_manufacture', 'fuel_type': 'vehicle_fuel_type',
+    'transmission_type': 'vehicle_transmission_type', 'engine_no': 'vehicle_engine_no',
+    'chassis_no': 'vehicle_chassis_no', 'vin_no': 'vehicle_vin_no', 'color': 'vehicle_color',
+    'reg_state': 'vehicle_reg_state', 'reg_exp': 'vehicle_reg_exp',
+}
+INVOICE_UPDATE_FIELDS = ['invoicedate', 'pono', 'podate', 'customer', 'name', 'vehicle', 'status', 'amount', 'updated_at']
+
+
+def _text(series):
+    """ Strings with blanks for missing values; whole numbers read as floats lose their '.0'. """
+    text = series.astype(object).where(series.notna(), '').astype(str).str.strip()
+    text = text.str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+    return text.replace({'nan': '', 'NaN': '', 'None': '', 'NaT': ''})
+
+
+def parse_dates(series):
+    """
+    Parses a column of mixed date values. Date and timestamp cells are taken
+    as they are, text is tried against each of DATE_FORMATS and then ISO
+    8601, one vectorized pass per format. Unparseable cells become None.
+    """
+    is_text = series.map(lambda value: isinstance(value, str))
+    parsed = pd.to_datetime(series.where(~is_text), errors='coerce')
+
+    text = series.where(is_text).astype(object).where(is_text, '').astype(str).str.strip()
+    for fmt in DATE_FORMATS + ('ISO8601',):
+        pending = is_text & parsed.isna()
+        if not pending.any():
+            break
+        parsed = parsed.fillna(pd.to_datetime(text.where(pending), format=fmt, errors='coerce'))
+
+    dates = parsed.dt.date.astype(object)
+    return dates.where(parsed.notna(), None)
+
+
+def prepare_frame(df):
+    """
+    Validates the columns of an uploaded invoice frame and returns it
+    normalized: lower-case column names, stripped text, optional columns
+    present, date columns parsed. Raises ValidationError for file-level
+    problems.
+    """
+    df = df.copy()
+    df.columns = df.columns.str.strip().str.lower()
+
+    # Check required columns
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValidationError(f'Missing required columns: {", ".join(missing_columns)}')
+
+    for col in REQUIRED_COLUMNS + OPTIONAL_COLUMNS:
+        if col not in df.columns:
+            df[col] = ''
+        if col not in DATE_COLUMNS:
+            df[col] = _text(df[col])
+
+    empty_required = [col for col in REQUIRED_COLUMNS if df[col].astype(str).str.strip().eq('').any()]
+    if empty_required:
+        raise ValidationError(f'Empty values found in required columns: {", ".join(empty_required)}')
+
+    for col in DATE_COLUMNS:
+        df[col] = parse_dates(df[col]) if col in df.columns else None
+
+    # A blank year of manufacture is stored as NULL
+    year = df['vehicle_year_of_manufacture'].astype(object)
+    df['year_of_manufacture'] = year.where(year != '', None)
+    return df
+
+
+def import_invoices(df, garage_id, track_invoice_uploads, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Imports a frame returned by prepare_frame. Returns (success_count,
+    failed) where failed is a list of {'invoice_id', 'error'} dicts.
+    Progress is written to track_invoice_uploads after every chunk and
+    passed to progress(processed, success_count, failed_count) if given.
+    """
+    failed = []
+
+    # Row-level validation, for the whole frame at once
+    errors = pd.Series('', index=df.index, dtype=object)
+    errors[df['invoice_date'].isna()] = 'Invalid or missing invoice_date.'
+    errors[(errors == '') & df['invoice_id'].duplicated()] = 'Duplicate invoice_id in file.'
+
+    # Invoice ids are unique across garages
+    foreign_ids = set()
+    invoice_ids = df['invoice_id'].unique().tolist()
+    for start in range(0, len(invoice_ids), chunk_size):
+        foreign_ids.update(
+            Invoice.objects.filter(invoiceid__in=invoice_ids[start:start + chunk_size])
+            .exclude(garage_id=garage_id).values_list('invoiceid', flat=True)
+        )
+    errors[(errors == '') & df['invoice_id'].isin(foreign_ids)] = 'Invoice id already used by another garage.'
+
+    invalid = df[errors != '']
+    failed.extend({'invoice_id': invoice_id, 'error': error} for invoice_id, error in zip(invalid['invoice_id'], errors[invalid.index]))
+    _record_failures(invalid['invoice_id'].tolist(), errors[invalid.index].tolist(), track_invoice_uploads)
+
+    valid = df[errors == '']
+    success_count = 0
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid.iloc[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                _import_chunk(chunk, garage_id, track_invoice_uploads)
+            success_count += len(chunk)
+        except DatabaseError:
+            # One bad row (e.g. a value too long for its column under strict mode) fails
+            # the whole bulk write: retry the chunk row by row so only that row fails
+            logging.getLogger(__name__).warning("Invoice import chunk failed, retrying row by row", exc_info=True)
+            imported, chunk_failed = _import_rows(chunk, garage_id, track_invoice_uploads)
+            success_count += imported
+            failed.extend(chunk_failed)
+        except Exception as e:
+            logging.getLogger(__name__).exception("Invoice import chunk failed")
+            failed.extend({'invoice_id': invoice_id, 'error': str(e)} for invoice_id in chunk['invoice_id'])
+            _record_failures(chunk['invoice_id'].tolist(), [str(e)] * len(chunk), track_invoice_uploads)
+
+        TrackInvoiceUploads.objects.filter(pk=track_invoice_uploads.pk).update(
+            success_count=success_count, failed_count=len(failed), updated_at=timezone.now()
+        )
+        if progress:
+            progress(len(invalid) + start + len(chunk), success_count, len(failed))
+
+    _advance_sequences(garage_id, valid['invoice_id'].tolist())
+    return success_count, failed
+
+
+def _import_rows(chunk, garage_id, track_invoice_uploads):
+    """ Imports chunk one row per savepoint. Returns (imported, failed) like import_invoices. """
+    imported, failed = 0, []
+    for position in range(len(chunk)):
+        row = chunk.iloc[position:position + 1]
+        try:
+            with transaction.atomic():
+                _import_chunk(row, garage_id, track_invoice_uploads)
+            imported += 1
+        except Exception as e:
+            failed.append({'invoice_id': row['invoice_id'].iloc[0], 'error': str(e)})
+    _record_failures([f['invoice_id'] for f in failed], [f['error'] for f in failed], track_invoice_uploads)
+    return imported, failed
+
+
+def _records(chunk, fields):
+    """ Field dicts per row, built column-wise. """
+    columns = {field: chunk[column].tolist() for field, column in fields.items()}
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def _import_chunk(chunk, garage_id, track_invoice_uploads):
+    now = timezone.now()
+
+    # Customers by (garage, phone); the last row of a phone wins, like repeated update_or_create
+    customer_values = dict(zip(chunk['customer_phone'], _records(chunk, CUSTOMER_FIELDS)))
+    customers = _upsert(
+        Customer, {'garage_id': garage_id}, 'phone', customer_values,
+        lambda phones: Customer.objects.filter(garage_id=garage_id, phone__in=phones),
+    )
+
+    # Vehicles by (garage, customer, model)
+    vehicle_values = {}
+    for phone, model, values in zip(chunk['customer_phone'], chunk['vehicle_model'], _records(chunk, VEHICLE_FIELDS)):
+        vehicle_values[(customers[phone].id, model)] = dict(values, image_path='')
+    vehicles = _upsert(
+        Vehicle, {'garage_id': garage_id}, ('customer_id', 'model'), vehicle_values,
+        lambda keys: Vehicle.objects.filter(
+            garage_id=garage_id,
+            customer_id__in={customer_id for customer_id, _ in keys},
+            model__in={model for _, model in keys},
+        ),
+    )
+
+    # Invoices by invoiceid
+    existing_invoices = Invoice.objects.in_bulk(chunk['invoice_id'].tolist(), field_name='invoiceid')
+    new_invoices, changed_invoices = [], []
+    rows = zip(chunk['invoice_id'], chunk['invoice_date'], chunk['invoice_pono'], chunk['invoice_podate'],
+               chunk['customer_phone'], chunk['customer_name'], chunk['vehicle_model'])
+    for invoice_id, invoice_date, pono, podate, phone, name, model in rows:
+        customer = customers[phone]
+        values = {
+            'invoicedate': invoice_date,
+            'pono': pono,
+            'podate': podate,
+            'customer': customer,
+            'name': name,
+            'vehicle': vehicles[(customer.id, model)],
+            'status': 'created',
+            'amount': 0.0,
+        }
+        invoice = existing_invoices.get(invoice_id)
+        if invoice is None:
+            new_invoices.append(Invoice(garage_id=garage_id, invoiceid=invoice_id, **values))
+        else:
+            for field, value in values.items():
+                setattr(invoice, field, value)
+            invoice.updated_at = now
+            changed_invoices.append(invoice)
+    Invoice.objects.bulk_create(new_invoices)
+    Invoice.objects.bulk_update(changed_invoices, INVOICE_UPDATE_FIELDS)
+
+    # Upload tracking rows; invoice_id is unique, so earlier uploads are moved to this one
+    existing_txn = InvoiceBulkUploadTXN.objects.in_bulk(chunk['invoice_id'].tolist(), field_name='invoice_id')
+    new_txn, changed_txn = [], []
+    for invoice_id, phone, model in zip(chunk['invoice_id'], chunk['customer_phone'], chunk['vehicle_model']):
+        customer = customers[phone]
+        txn = existing_txn.get(invoice_id) or InvoiceBulkUploadTXN(invoice_id=invoice_id)
+        txn.track_invoice_uploads = track_invoice_uploads
+        txn.customer = customer
+        txn.vehicle = vehicles[(customer.id, model)]
+        txn.status = 'Invoice Created'
+        txn.final_status = 'pending'
+        txn.updated_at = now
+        (changed_txn if txn.pk else new_txn).append(txn)
+    InvoiceBulkUploadTXN.objects.bulk_create(new_txn)
+    InvoiceBulkUploadTXN.objects.bulk_update(
+        changed_txn, ['track_invoice_uploads', 'customer', 'vehicle', 'status', 'final_status', 'updated_at']
+    )
+
+
+def _upsert(model, scope, key_fields, values_by_key, fetch):
+    """
+    Creates or updates one row per key of values_by_key and returns
+    key -> instance. fetch(keys) must return a queryset covering the keys;
+    the first row by id wins when several match.
+    """
+    def key_of(obj):
+        if isinstance(key_fields, tuple):
+            return tuple(getattr(obj, field) for field in key_fields)
+        return getattr(obj, key_fields)
+
+    def load(keys):
+        found = {}
+        for obj in fetch(keys).order_by('id'):
+            found.setdefault(key_of(obj), obj)
+        return {key: obj for key, obj in found.items() if key in keys}
+
+    keys = set(values_by_key)
+    existing = load(keys)
+
+    now = timezone.now()
+    changed, update_fields = [], {'updated_at'}
+    for key, obj in existing.items():
+        dirty = {field: value for field, value in values_by_key[key].items() if getattr(obj, field) != value}
+        if dirty:
+            for field, value in dirty.items():
+                setattr(obj, field, value)
+            # bulk_update does not apply auto_now
+            obj.updated_at = now
+            update_fields.update(dirty)
+            changed.append(obj)
+    if changed:
+        model.objects.bulk_update(changed, sorted(update_fields))
+
+    missing = keys - set(existing)
+    if missing:
+        new_rows = []
+        for key in missing:
+            key_values = dict(zip(key_fields, key)) if isinstance(key_fields, tuple) else {key_fields: key}
+            new_rows.append(model(**scope, **key_values, **values_by_key[key]))
+        model.objects.bulk_create(new_rows)
+        # bulk_create does not return primary keys on MySQL
+        existing.update(load(missing))
+    return existing
+
+
+def _record_failures(invoice_ids, errors, track_invoice_uploads):
+    """ Adds failed rows to the upload; ids already tracked by an earlier upload keep their record. """
+    if not invoice_ids:
+        return
+    tracked = set()
+    for start in range(0, len(invoice_ids), IMPORT_CHUNK_SIZE):
+        tracked.update(
+            InvoiceBulkUploadTXN.objects.filter(invoice_id__in=invoice_ids[start:start + IMPORT_CHUNK_SIZE])
+            .values_list('invoice_id', flat=True)
+        )
+    rows, seen = [], set()
+    for invoice_id, error in zip(invoice_ids, errors):
+        if invoice_id in tracked or invoice_id in seen:
+            continue
+        seen.add(invoice_id)
+        rows.append(InvoiceBulkUploadTXN(
+            invoice_id=invoice_id,
+            track_invoice_uploads=track_invoice_uploads,
+            status=error,
+            final_status='failed',
+        ))
+    InvoiceBulkUploadTXN.objects.bulk_create(rows, batch_size=IMPORT_CHUNK_SIZE)
+
+
+def _advance_sequences(garage_id, invoice_ids):
+    """ Keeps the invoice number sequence ahead of imported garage_id/number/period ids. """
+    highest = defaultdict(int)
+    for invoice_id in invoice_ids:
+        parts = invoice_id.split('/')
+        if len(parts) == 3 and parts[0] == str(garage_id):
+            number = DocumentSequence.parse_number(DocumentSequence.INVOICE, invoice_id)
+            if number is not None:
+                highest[parts[2]] = max(highest[parts[2]], number)
+    for period, number in highest.items():
+        DocumentSequence.advance_past(garage_id, DocumentSequence.INVOICE, period, number)
+
+
+def run_invoice_upload(job):
+    """ Background job handler for the invoice file of bulk_upload_invoices. """
+    track_invoice_uploads = job.track_invoice_uploads
+    try:
+        df = prepare_frame(jobqueue.read_upload(job.file_path))
+    except ValidationError as e:
+        track_invoice_uploads.failed_count = 1
+        track_invoice_uploads.save()
+        audit.create_audit_log(job.created_by, f'Bulk upload failed: {", ".join(e.messages)[:200]}', 'bulk_upload_invoices', 400)
+        raise
+
+    track_invoice_uploads.total_count = len(df)
+    track_invoice_uploads.save()
+    job.report_progress(0, 0, 0, total_count=len(df))
+
+    success_count, failed_invoices = import_invoices(df, job.garage_id, track_invoice_uploads, progress=job.report_progress)
+
+    track_invoice_uploads.success_count = success_count
+    track_invoice_uploads.failed_count = len(df) - success_count
+    track_invoice_uploads.save()
+
+    msg = f'Successfully imported {success_count} of {len(df)} invoices.\n'
+    if failed_invoices:
+        msg += '\nFailed Invoices:\n'
+        for f in failed_invoices[:50]:
+            msg += f"- Invoice {f['invoice_id']}: {f['error']}\n"
+        if len(failed_invoices) > 50:
+            msg += f"- ... and {len(failed_invoices) - 50} more, see the upload details\n"
+
+    audit.create_audit_log(
+        job.created_by,
+        f'Bulk uploaded {success_count} of {len(df)} invoices. Failed: {len(failed_invoices)}.',
+        'bulk_upload_invoices',
+        200 if success_count else 400
+    )
+    if not success_count:
+        raise ValidationError('Failed to import any invoices.\n' + msg)
+    return msg
+
+
+def _safe_float(val, default=0.0):
+    """Convert value to float, handling NaN and invalid values."""
+    if pd.isna(val) or val == 'nan' or val == '' or val is None:
+        return default
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return default
+
+
+def _line_total(value, quantity, discount, tax):
+    line_value = value * quantity  # Value = Unit Price × Quantity
+    line_discount = (discount / 100) * line_value  # Discount = Value × (Discount % / 100)
+    taxable_amount = line_value - line_discount  # Taxable Amount = Value - Discount
+    line_tax = (tax / 100) * taxable_amount  # Tax = Taxable Amount × (Tax % / 100)
+    return line_value - line_discount + line_tax  # Total = Value - Discount + Tax
+
+
+def _add_service(invoice, row):
+    quantity = _safe_float(row['quantity'], 1)  # Default quantity is 1
+    service_value = _safe_float(row['service_value'], 0.0)
+    service_tax = _safe_float(row.get('service_tax'), 0.0)
+    service_discount = _safe_float(row.get('service_discount'), 0.0)
+
+    # Check service exists or not if exists then get else create
+    service, created = TXNService.objects.get_or_create(
+        garage=invoice.garage,
+        name=row['service_name'],
+        defaults={
+            'price': service_value,
+            'gst': service_tax,
+            'discount': service_discount,
+            'notes': f'Created from Invoice ID {invoice.invoiceid}',
+        }
+    )
+
+    # Skip add service into invoice already binded
+    if relInvoiceService.objects.filter(invoice=invoice, service=service).exists():
+        return False
+    relInvoiceService.objects.create(
+        invoice=invoice,
+        service=service,
+        service_source='service',
+        service_name=service.name if service else '',
+        quantity=int(quantity) if quantity >= 1 else 1,  # Ensure quantity is at least 1
+        service_value=service_value,
+        service_tax=service_tax,
+        service_discount=service_discount
+    )
+    invoice.amount = invoice.amount + _line_total(service_value, quantity, service_discount, service_tax)
+    invoice.save()
+    return True
+
+
+def _add_part(invoice, row):
+    quantity = _safe_float(row['quantity'], 1)  # Default quantity is 1
+    part_value = _safe_float(row['part_value'], 0.0)
+    part_tax = _safe_float(row.get('part_tax'), 0.0)
+    part_discount = _safe_float(row.get('part_discount'), 0.0)
+
+    # Skip add parts into invoice already binded
+    if relInvoiceProductCatalogues.objects.filter(invoice=invoice, part_name=row['part_name']).exists():
+        return False
+    relInvoiceProductCatalogues.objects.create(
+        invoice=invoice,
+        part=None,
+        part_source='external',
+        part_name=row['part_name'],
+        quantity=int(quantity) if quantity >= 1 else 1,  # Ensure quantity is at least 1
+        part_value=part_value,
+        part_tax=part_tax,
+        part_discount=part_discount
+    )
+    invoice.amount = invoice.amount + _line_total(part_value, quantity, part_discount, part_tax)
+    invoice.save()
+    return True
+
+
+def _run_line_upload(job, label, required_columns, add_line):
+    """
+    Adds the services or parts of a file to the invoices of an earlier
+    upload, one transaction per row. Rows already on the invoice are skipped.
+    """
+    track_invoice_upload = job.track_invoice_uploads
+    df = jobqueue.read_upload(job.file_path, f'The uploaded {label} file is empty.')
+
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValidationError(f'Missing required columns in {label} file: {", ".join(missing_columns)}')
+
+    # Check for empty values in required columns
+    empty_required = [
+        col for col in required_columns
+        if df[col].isna().any() or df[col].astype(str).str.strip().eq('').any()
+    ]
+    if empty_required:
+        raise ValidationError(f'Empty values found in required columns: {", ".join(empty_required)}. Please ensure all required columns have values.')
+
+    job.report_progress(0, 0, 0, total_count=len(df))
+    success_count = 0
+    failed_entries = []
+    for processed, (idx, row) in enumerate(df.iterrows(), start=1):
+        bulk_invoice = None
+        try:
+            with transaction.atomic():
+                invoice_id = row.get('invoice_id')
+                bulk_invoice = track_invoice_upload.invoice_bulk_upload_txn.filter(invoice_id=invoice_id).first()
+
+                if not bulk_invoice:
+                    raise ValueError(f'Invoice ID {invoice_id} not found in this upload batch')
+
+                if bulk_invoice.final_status == 'Invoice Created':
+                    raise ValueError(f'Invoice ID {invoice_id} has already been finalized')
+
+                invoice = Invoice.objects.get(invoiceid=invoice_id)
+                if add_line(invoice, row):
+                    bulk_invoice.status = f'{label.capitalize()} Updated'
+                    bulk_invoice.save()
+                    success_count += 1
+        except Exception as e:
+            if bulk_invoice:
+                # Update status outside the rolled back row transaction
+                bulk_invoice.status = f'{label.capitalize()} Update Failed: {str(e)} (Row: {idx + 2})'
+                bulk_invoice.save()
+            failed_entries.append({
+                'row': idx + 2,
+                'invoice_id': row.get('invoice_id') or 'N/A',
+                'error': str(e)
+            })
+
+        if processed % jobqueue.PROGRESS_EVERY == 0 or processed == len(df):
+            job.report_progress(processed, success_count, len(failed_entries))
+
+    # Prepare success/failure message
+    if not failed_entries:
+        msg = f'All {label} imported successfully.'
+        audit_msg = msg
+    else:
+        success_msg = f'Successfully imported {success_count} {label}.' if success_count > 0 else f'No {label} were imported.'
+        msg = f'{success_msg}\n\nFailed to import {len(failed_entries)} {label}:'
+        audit_msg = f'{success_msg} Failed to import {len(failed_entries)} {label}:'
+        for entry in failed_entries[:10]:  # Show first 10 failures
+            msg += f"\n- Row {entry['row']} (Invoice: {entry['invoice_id']}): {entry['error']}"
+            audit_msg += f" Row {entry['row']} (Invoice: {entry['invoice_id']}): {entry['error']};"
+        if len(failed_entries) > 10:
+            msg += f"\n... and {len(failed_entries) - 10} more failures"
+            audit_msg += f" and {len(failed_entries) - 10} more failures"
+
+    audit.create_audit_log(
+        job.created_by,
+        f'BULK_UPLOAD_{label.upper()}: {audit_msg}',
+        'u_txn_invoices',
+        200 if success_count > 0 else 400
+    )
+    return msg
+
+
+def run_invoice_services_upload(job):
+    """ Background job handler for the services file of track_invoice_uploads. """
+    return _run_line_upload(job, 'services', ['invoice_id', 'service_name', 'quantity', 'service_value'], _add_service)
+
+
+def run_invoice_parts_upload(job):
+    """ Background job handler for the parts file of track_invoice_uploads. """
+    return _run_line_upload(job, 'parts', ['invoice_id', 'part_name', 'quantity', 'part_value'], _add_part)
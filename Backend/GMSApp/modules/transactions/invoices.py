@@ -1,13 +1,16 @@
 
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.http import JsonResponse, HttpResponse
 from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.db.models import F
 from django.contrib import messages
 from django.db import transaction
-from GMSApp.models import Customer, Vehicle, Invoice, ProductCatalogues, TXNService, relInvoiceProductCatalogues, relInvoiceService, InvoiceBulkUploadTXN, TrackInvoiceUploads, InvoiceBulkUploadTXN, StockOutwards, Jobcard
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.models import BackgroundJob, Customer, Vehicle, Invoice, ProductCatalogues, TXNService, relInvoiceProductCatalogues, relInvoiceService, InvoiceBulkUploadTXN, TrackInvoiceUploads, InvoiceBulkUploadTXN, StockOutwards, Jobcard
+from GMSApp.modules import templatespath, managesession, audit, jobqueue, bulkdelete
+from GMSApp.modules.transactions import lineitems
+from GMSApp.modules.keysetpaginator import KeysetPaginator, count_by
 from django.views.decorators.csrf import csrf_exempt
 from datetime import datetime, date
 import logging, csv, io, os
@@ -20,10 +23,11 @@ def r_txn_invoices(request, context):
     if request.method == 'GET':       
         invoice_objs = Invoice.objects.filter(garage_id=context['garage_id'])
 
-        # Get counts before pagination (for all)        
-        context['total_invoice'] = invoice_objs.count()
-        context['created_invoice'] = invoice_objs.filter(status='created').count()
-        context['dispatched_invoice'] = invoice_objs.filter(status='dispatched').count()
+        # Get counts before pagination (for all), in one query
+        counts = count_by(invoice_objs, 'status', ['created', 'dispatched'])
+        context['total_invoice'] = counts['total']
+        context['created_invoice'] = counts['created']
+        context['dispatched_invoice'] = counts['dispatched']
 
         # Check for filter parameter in URL
         status_filter = request.GET.get('filter')
@@ -31,10 +35,8 @@ def r_txn_invoices(request, context):
             invoice_objs = invoice_objs.filter(status=status_filter) 
 
         # Pagination
-        paginator = Paginator(invoice_objs, 100)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        context['invoice_objs'] =  page_obj  
+        paginator = KeysetPaginator(invoice_objs, 100, params=request.GET, count=counts.get(status_filter, counts['total']))
+        context['invoice_objs'] = paginator.get_page(request.GET.get('cursor'))
 
         # calling functions
         audit.create_audit_log(context['useremail'], f'USER: {context["useremail"]}, {request.method}: {request.path}', 'r_txn_invoices', 200)
@@ -84,6 +86,12 @@ def c_txn_invoices(request, context):
                 customer = get_object_or_404(Customer, id=customer_id)
                 vehicle = get_object_or_404(Vehicle, id=vehicle_id)
 
+                # Resolve and validate all line items before writing
+                parts, services, parts_by_id = lineitems.read_posted_lines(
+                    request.POST, context['garage_id'], 'external invoice', lock_parts=True
+                )
+                lineitems.validate_stock(parts, parts_by_id)
+
                 # Get the total amount from the form
                 amount = request.POST.get('amount', 0)
                 
@@ -99,141 +107,9 @@ def c_txn_invoices(request, context):
                     amount=float(amount)
                 )
 
-                # Insert Fromdb Parts
-                fromdb_part_ids = request.POST.getlist('fromdb_partname')
-                fromdb_part_values = request.POST.getlist('fromdb_partvalue')
-                fromdb_part_taxes = request.POST.getlist('fromdb_parttax')
-                fromdb_part_discounts = request.POST.getlist('fromdb_partdiscount')
-                fromdb_part_quantities = request.POST.getlist('fromdb_partquantity')
-
-                for i in range(len(fromdb_part_ids)):
-                    part_id = fromdb_part_ids[i]
-                    if part_id:  # Only insert if part is selected
-                        part = ProductCatalogues.objects.filter(id=part_id).first()
-                        quantity = int(fromdb_part_quantities[i]) if i < len(fromdb_part_quantities) and fromdb_part_quantities[i] else 1
-                        if quantity <= 0:
-                            raise ValueError(f"Invalid quantity for {part.name} - must be greater than 0")
-                        
-                        if part.current_stock < quantity:
-                            raise ValueError(f"Insufficient stock for {part.name}. Available: {part.current_stock}, Required: {quantity}")
-
-                        # Update stock in ProductCatalogues  
-                        part.outward_stock += quantity
-                        part.save()
-                        
-                        # Create stock outward entry
-                        try:
-                            stock_outward = StockOutwards.objects.create(
-                                garage_id=context['garage_id'],
-                                product=part,
-                                quantity=quantity,
-                                rate=float(fromdb_part_values[i] or 0),
-                                discount=float(fromdb_part_discounts[i] or 0),
-                                gst=float(fromdb_part_taxes[i] or 0),
-                                total_price=float(fromdb_part_values[i] or 0) * quantity,
-                                issued_to=customer.name,
-                                issued_date=invoicedate,
-                                usage_purpose='Invoice',
-                                reference_document=invoice.id,
-                                location='Invoice',
-                                rack='Invoice',
-                                remarks='Invoice',
-                            )
-                            
-                            # Create relInvoiceProductCatalogues entry
-                            relInvoiceProductCatalogues.objects.create(
-                                invoice=invoice,
-                                part=part,
-                                part_source='inventory',
-                                part_name=part.name if part else '',
-                                part_value=float(fromdb_part_values[i] or 0),
-                                part_tax=float(fromdb_part_taxes[i] or 0),
-                                part_discount=float(fromdb_part_discounts[i] or 0),
-                                quantity=quantity
-                            )
-                            
-                            # Log the operation
-                            logging.getLogger(__name__).info(
-                                f"Created StockOutwards for part {part.name} - Quantity: {quantity}, Invoice: {invoice.id}"
-                            )
-                            
-                        except ValueError as ve:
-                            raise ValueError(f"Error processing part {part.name}: {str(ve)}")
-                        except Exception as e:
-                            logging.getLogger(__name__).error(
-                                f"Error creating StockOutwards for part {part.name}: {str(e)}"
-                            )
-                            raise Exception(f"Failed to process part {part.name}")
-                        
-
-                # Insert Fromuser Parts
-                fromuser_part_names = request.POST.getlist('fromuser_partname')
-                fromuser_part_values = request.POST.getlist('fromuser_partvalue')
-                fromuser_part_taxes = request.POST.getlist('fromuser_parttax')
-                fromuser_part_discounts = request.POST.getlist('fromuser_partdiscount')
-
-                for i in range(len(fromuser_part_names)):
-                    if fromuser_part_names[i]:
-                        relInvoiceProductCatalogues.objects.create(
-                            invoice=invoice,
-                            part=None,
-                            part_source='external',
-                            part_name=fromuser_part_names[i],
-                            part_value=fromuser_part_values[i] or 0,
-                            part_tax=fromuser_part_taxes[i] or 0,
-                            part_discount=fromuser_part_discounts[i] or 0
-                        )
-
-                # Insert Fromdb Services
-                fromdb_service_ids = request.POST.getlist('fromdb_servicename')
-                fromdb_service_values = request.POST.getlist('fromdb_servicevalue')
-                fromdb_service_taxes = request.POST.getlist('fromdb_servicetax')
-                fromdb_service_discounts = request.POST.getlist('fromdb_servicediscount')
-
-                for i in range(len(fromdb_service_ids)):
-                    service_id = fromdb_service_ids[i]
-                    if service_id:  # Only insert if service is selected
-                        service = TXNService.objects.filter(id=service_id).first()
-                        relInvoiceService.objects.create(
-                            invoice=invoice,
-                            service=service,
-                            service_source='service',
-                            service_name=service.name if service else '',
-                            service_value=fromdb_service_values[i] or 0,
-                            service_tax=fromdb_service_taxes[i] or 0,
-                            service_discount=fromdb_service_discounts[i] or 0
-                        )
-
-                # Insert Fromuser Services
-                fromuser_service_names = request.POST.getlist('fromuser_servicename')
-                fromuser_service_values = request.POST.getlist('fromuser_servicevalue')
-                fromuser_service_taxes = request.POST.getlist('fromuser_servicetax')
-                fromuser_service_discounts = request.POST.getlist('fromuser_servicediscount')
-
-                for i in range(len(fromuser_service_names)):
-                    if fromuser_service_names[i]:
-                        check_txn_service = TXNService.objects.filter(name=fromuser_service_names[i], garage_id=context['garage_id']).first()
-                        if check_txn_service:
-                            service = check_txn_service
-                        else:
-                            service = TXNService.objects.create(
-                                garage_id=context['garage_id'],
-                                name=fromuser_service_names[i],
-                                price=fromuser_service_values[i] or 0,
-                                gst=fromuser_service_taxes[i] or 0,
-                                discount=fromuser_service_discounts[i] or 0,
-                                notes='external invoice'
-                            )
-                            
-                        relInvoiceService.objects.create(
-                            invoice=invoice,
-                            service=service,
-                            service_source='service',
-                            service_name=service.name if service else '',
-                            service_value=fromuser_service_values[i] or 0,
-                            service_tax=fromuser_service_taxes[i] or 0,
-                            service_discount=fromuser_service_discounts[i] or 0
-                        )      
+                # Book stock and insert parts and services
+                lineitems.save_invoice_stock(invoice, parts, parts_by_id, context['garage_id'], customer.name, invoicedate)
+                lineitems.save_document_lines(relInvoiceProductCatalogues, relInvoiceService, 'invoice', invoice, parts, services)
 
                 # If jobcard_id exists in query parameters, update the jobcard with invoice ID
                 if qs_jobcard_id:
@@ -270,215 +146,45 @@ def bulk_upload_invoices(request, context):
         return render(request, templatespath.template_bulk_upload_invoices, context)
 
     if request.method == 'POST':
-        track_invoice_uploads = None
         try:
             if 'invoice_file' not in request.FILES:
                 raise ValidationError('No invoice file was uploaded.')
 
             invoice_file = request.FILES['invoice_file']
-            file_extension = invoice_file.name.lower().rsplit('.', 1)[-1]
-            VALID_EXTENSIONS = {'csv', 'xls', 'xlsx'}
+            jobqueue.check_extension(invoice_file)
 
-            if file_extension not in VALID_EXTENSIONS:
-                raise ValidationError('Please upload a valid Excel or CSV file.')
-
-            df = pd.read_csv(io.StringIO(invoice_file.read().decode('utf-8'))) \
-                if file_extension == 'csv' else pd.read_excel(invoice_file)
-
-            if df.empty:
-                raise ValidationError('The uploaded file is empty.')
-
-            df.columns = df.columns.str.strip().str.lower()
-
-            REQUIRED_COLUMNS = [
-                'invoice_id', 'invoice_date', 'customer_phone', 'customer_name', 'vehicle_model'
-            ]
-            OPTIONAL_COLUMNS = [
-                'customer_gst', 'customer_address', 'customer_email', 'customer_pincode',
-                'vehicle_make', 'vehicle_license_plate_no', 'vehicle_external_bikeid',
-                'vehicle_registration_no', 'vehicle_fuel_type', 'vehicle_transmission_type',
-                'vehicle_engine_no', 'vehicle_chassis_no', 'vehicle_vin_no', 'vehicle_color',
-                'vehicle_reg_state', 'invoice_pono'
-            ]
-
-            # Check required columns
-            missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-            if missing_columns:
-                raise ValidationError(f'Missing required columns: {", ".join(missing_columns)}')
-
-            empty_required = [
-                col for col in REQUIRED_COLUMNS
-                if df[col].isna().any() or df[col].astype(str).str.strip().eq('').any()
-            ]
-            if empty_required:
-                raise ValidationError(f'Empty values found in required columns: {", ".join(empty_required)}')
-
-            for col in OPTIONAL_COLUMNS:
-                if col in df.columns:
-                    df[col] = df[col].fillna('').astype(str).replace({'nan': '', 'NaN': '', 'None': ''})
-
-            upload_dir = os.path.join('static', 'invoicebulkuploadedfiles')
-            os.makedirs(upload_dir, exist_ok=True)
             original_name, ext = os.path.splitext(invoice_file.name)
             safe_original = "_".join(original_name.split())
             current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
             saved_filename = f"garage_id_{context['garage_id']}_{safe_original}_{current_time}{ext}"
-            file_path = os.path.join(upload_dir, saved_filename)
-
-            with open(file_path, 'wb+') as destination:
-                for chunk in invoice_file.chunks():
-                    destination.write(chunk)
+            file_path = jobqueue.save_upload(invoice_file, 'invoicebulkuploadedfiles', saved_filename)
 
+            # The file is read and imported by the run_jobs worker
             track_invoice_uploads = TrackInvoiceUploads.objects.create(
                 garage_id=context['garage_id'],
                 file_name=invoice_file.name,
                 file_path=file_path,
                 success_count=0,
                 failed_count=0,
-                total_count=len(df)
+                total_count=0
             )
-
-            success_count = 0
-            failed_invoices = []
-
-            def safe_date(val):
-                if pd.isnull(val) or val in ("", "nan", "NaT", None):
-                    return None
-                if isinstance(val, date):
-                    return val
-                if hasattr(val, 'to_pydatetime'):
-                    try:
-                        return val.to_pydatetime().date()
-                    except:
-                        return None
-                if isinstance(val, str):
-                    for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%m/%d/%Y", "%d.%m.%Y"):
-                        try:
-                            return datetime.strptime(val, fmt).date()
-                        except:
-                            continue
-                    try:
-                        return datetime.fromisoformat(val).date()
-                    except:
-                        pass
-                return None
-
-            for _, row in df.iterrows():
-                with transaction.atomic():
-                    invoice_id = row.get('invoice_id', 'N/A')
-                    try:
-                        invoice_date = safe_date(row.get('invoice_date'))
-                        if not invoice_date:
-                            raise ValueError("Invalid or missing invoice_date.")
-
-                        invoice_podate = safe_date(row.get('invoice_podate'))
-                        # vehicle_year_of_manufacture = safe_date(row.get('vehicle_year_of_manufacture'))
-                        vehicle_reg_exp = safe_date(row.get('vehicle_reg_exp'))
-
-                        customer, _ = Customer.objects.update_or_create(
-                            garage_id=context['garage_id'],
-                            partner_id=context.get('partner_id'),
-                            phone=row['customer_phone'],
-                            defaults={
-                                'name': row['customer_name'],
-                                'gst': row.get('customer_gst', ''),
-                                'address': row.get('customer_address', ''),
-                                'email': row.get('customer_email', ''),
-                                'pincode': row.get('customer_pincode', '')
-                            }
-                        )
-
-                        vehicle, _ = Vehicle.objects.update_or_create(
-                            garage_id=context['garage_id'],
-                            customer_id=customer.id,
-                            model=row['vehicle_model'],
-                            defaults={
-                                'make': row.get('vehicle_make', ''),
-                                'license_plate_no': row.get('vehicle_license_plate_no', ''),
-                                'external_bikeid': row.get('vehicle_external_bikeid', ''),
-                                'registration_no': row.get('vehicle_registration_no', ''),
-                                'year_of_manufacture': row.get('vehicle_year_of_manufacture'),#vehicle_year_of_manufacture
-                                'fuel_type': row.get('vehicle_fuel_type', ''),
-                                'transmission_type': row.get('vehicle_transmission_type', ''),
-                                'engine_no': row.get('vehicle_engine_no', ''),
-                                'chassis_no': row.get('vehicle_chassis_no', ''),
-                                'vin_no': row.get('vehicle_vin_no', ''),
-                                'color': row.get('vehicle_color', ''),
-                                'reg_state': row.get('vehicle_reg_state', ''),
-                                'reg_exp': vehicle_reg_exp,
-                                'image_path': ''
-                            }
-                        )
-
-                        invoice, _ = Invoice.objects.update_or_create(
-                            garage_id=context['garage_id'],
-                            invoiceid=invoice_id,
-                            defaults={
-                                'invoicedate': invoice_date,
-                                'pono': row.get('invoice_pono', ''),
-                                'podate': invoice_podate,
-                                'customer': customer,
-                                'name': row['customer_name'],
-                                'vehicle': vehicle,
-                                'status': 'created',
-                                'amount': 0.0
-                            }
-                        )
-
-                        InvoiceBulkUploadTXN.objects.create(
-                            invoice_id=invoice.invoiceid,
-                            track_invoice_uploads=track_invoice_uploads,
-                            customer=customer,
-                            vehicle=vehicle,
-                            status='Invoice Created'
-                        )
-
-                        success_count += 1
-
-                    except Exception as e:
-                        failed_invoices.append({
-                            'invoice_id': invoice_id,
-                            'error': str(e)
-                        })
-                        continue
-
-            failed_count = len(df) - success_count
-            track_invoice_uploads.success_count = success_count
-            track_invoice_uploads.failed_count = failed_count
-            track_invoice_uploads.save()
-
-            msg = f'Successfully imported {success_count} of {len(df)} invoices.\n'
-            if failed_invoices:
-                msg += '\nFailed Invoices:\n'
-                for f in failed_invoices:
-                    msg += f"- Invoice {f['invoice_id']}: {f['error']}\n"
-
-            if success_count > 0:
-                messages.success(request, msg)
-            else:
-                messages.error(request, 'Failed to import any invoices.\n' + msg)
-
-            audit.create_audit_log(
-                context['useremail'],
-                f'Bulk uploaded {success_count} of {len(df)} invoices. Failed: {len(failed_invoices)}.',
-                'bulk_upload_invoices',
-                200 if success_count else 400
+            job = jobqueue.enqueue(
+                BackgroundJob.INVOICE_UPLOAD, context['garage_id'], invoice_file.name, file_path,
+                context['useremail'], track_invoice_uploads=track_invoice_uploads,
             )
 
+            messages.success(request, f'{invoice_file.name} is queued for import as job #{job.id}.')
+            audit.create_audit_log(context['useremail'], f'Queued invoice bulk upload job #{job.id}', 'bulk_upload_invoices', 200)
+            return redirect(f"{reverse('bulk-upload-invoices')}?job={job.id}")
+
         except ValidationError as e:
             msg = ', '.join(e.messages) if hasattr(e, 'messages') else str(e)
             messages.error(request, msg)
-            if track_invoice_uploads:
-                track_invoice_uploads.failed_count = 1
-                track_invoice_uploads.save()
             audit.create_audit_log(context['useremail'], f'Bulk upload failed: {msg[:200]}', 'bulk_upload_invoices', 400)
 
         except Exception as e:
             messages.error(request, 'Unexpected error during file upload.')
             logging.exception("Unexpected error in bulk_upload_invoices")
-            if track_invoice_uploads:
-                track_invoice_uploads.failed_count = 1
-                track_invoice_uploads.save()
             audit.create_audit_log(context['useremail'], 'Bulk upload failed: Unexpected error', 'bulk_upload_invoices', 500)
 
         return redirect('bulk-upload-invoices')
@@ -502,367 +208,36 @@ def track_invoice_uploads(request, context, id):
             return redirect('bulk-upload-invoices')
 
     if request.method == 'POST':
-        try:  
+        try:
             # Get the base filename without extension
             track_invoice_upload_file_name = os.path.splitext(os.path.basename(track_invoice_upload.file_path))[0]
             current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
-            if 'services_file' in request.FILES:
-                services_file = request.FILES['services_file']
-                file_extension = services_file.name.lower().rsplit('.', 1)[-1]
-                
-                VALID_EXTENSIONS = {'csv', 'xls', 'xlsx'}
-                if file_extension not in VALID_EXTENSIONS:
-                    messages.error(request, 'Please upload a valid Excel or CSV file for services.')
-                    return redirect(request.path)
-                
-                try:
-                    df = pd.read_csv(io.StringIO(services_file.read().decode('utf-8'))) \
-                        if file_extension == 'csv' else pd.read_excel(services_file)
-                    
-                    if df.empty:
-                        raise ValidationError('The uploaded services file is empty.')
-                    
-                    df.columns = df.columns.str.strip().str.lower()
-                    
-                    REQUIRED_COLUMNS = ['invoice_id', 'service_name', 'quantity', 'service_value']
-                    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-                    
-                    if missing_columns:
-                        raise ValidationError(f'Missing required columns in services file: {", ".join(missing_columns)}')
-
-                    # Check for empty values in required columns
-                    empty_required = []
-                    for col in REQUIRED_COLUMNS:
-                        if df[col].isna().any() or df[col].astype(str).str.strip().eq('').any():
-                            empty_required.append(col)
-                    
-                    if empty_required:
-                        raise ValidationError(f'Empty values found in required columns: {", ".join(empty_required)}. Please ensure all required columns have values.')    
-                    
-                    """ Uploading file into invoicebulkuploadedfiles folder """
-                    # Define the upload directory
-                    upload_dir = os.path.join('static', 'invoicebulkuploadedfiles') 
-
-                    # Create directory if it doesn't exist
-                    os.makedirs(upload_dir, exist_ok=True)    
-
-                    # Generate filename
-                    saved_filename = f"{track_invoice_upload_file_name}_SERVICES_{current_time}{file_extension}"
-                    file_path = os.path.join(upload_dir, saved_filename)
 
-                    # Save the file with the new filename
-                    with open(file_path, 'wb+') as destination:
-                        for chunk in services_file.chunks():
-                            destination.write(chunk)
-
-                    success_count = 0
-                    failed_entries = []
-                    processed_invoices = set()
-                    
-                    # Process each row individually with its own transaction
-                    for idx, row in df.iterrows():
-                        try:
-                            # Use a transaction for each row to avoid issues with the entire batch
-                            with transaction.atomic():
-                                invoice_id = row.get('invoice_id')
-                                bulk_invoice = track_invoice_upload.invoice_bulk_upload_txn.filter(invoice_id=invoice_id).first()
-                                
-                                if not bulk_invoice:
-                                    raise ValueError(f'Invoice ID {invoice_id} not found in this upload batch')
-
-                                if bulk_invoice.final_status == 'Invoice Created':
-                                    raise ValueError(f'Invoice ID {invoice_id} has already been finalized')    
-                                
-                                # Handle NaN values for numeric fields
-                                def safe_float(val, default=0.0):
-                                    """Convert value to float, handling NaN and invalid values."""
-                                    if pd.isna(val) or val == 'nan' or val == '' or val is None:
-                                        return default
-                                    try:
-                                        return float(val)
-                                    except (ValueError, TypeError):
-                                        return default
-                                
-                                # Get values with NaN handling
-                                print("Service Value: ", row)
-                                quantity = safe_float(row['quantity'], 1)  # Default quantity is 1
-                                service_value = safe_float(row['service_value'], 0.0)
-                                service_tax = safe_float(row.get('service_tax'), 0.0)
-                                service_discount = safe_float(row.get('service_discount'), 0.0)
-
-                                # Get Invoice
-                                invoice = Invoice.objects.get(invoiceid=invoice_id)
-
-                                # Check service exists or not if exists then get else create
-                                service, created = TXNService.objects.get_or_create(
-                                    garage=invoice.garage,
-                                    name=row['service_name'],
-                                    defaults={
-                                        'price': service_value,
-                                        'gst': service_tax,
-                                        'discount': service_discount,
-                                        'notes': f'Created from Invoice ID {invoice_id}',
-                                    }
-                                )
-
-                                # Skip add service into invoice already binded
-                                if not relInvoiceService.objects.filter(invoice=invoice, service=service).exists():
-                                    # relInvoiceService.objects.create(
-                                    #     invoice=invoice,
-                                    #     service=service,
-                                    #     service_source='service',
-                                    #     service_name=service.name if service else '',
-                                    #     quantity=int(quantity) if quantity >= 1 else 1,  # Ensure quantity is at least 1
-                                    #     service_value=service.price if service else service_value,
-                                    #     service_tax=service.gst if service else service_tax,
-                                    #     service_discount=service.discount if service else service_discount
-                                    # ) 
-                                    
-                                    relInvoiceService.objects.create(
-                                        invoice=invoice,
-                                        service=service,
-                                        service_source='service',
-                                        service_name=service.name if service else '',
-                                        quantity=int(quantity) if quantity >= 1 else 1,  # Ensure quantity is at least 1
-                                        service_value=service_value,
-                                        service_tax=service_tax,
-                                        service_discount=service_discount
-                                    )
-
-                                    # Get each service and update invoice amount   
-                                    # Calculate line item values
-                                    line_value = service_value * quantity  # Value = Unit Price × Quantity
-                                    line_discount = (service_discount / 100) * line_value  # Discount = Value × (Discount % / 100)
-                                    taxable_amount = line_value - line_discount  # Taxable Amount = Value - Discount
-                                    line_tax = (service_tax / 100) * taxable_amount  # Tax = Taxable Amount × (Tax % / 100)
-                                    line_total = line_value - line_discount + line_tax  # Total = Value - Discount + Tax
-
-                                    # Update invoice amount
-                                    invoice.amount = invoice.amount + line_total
-                                    invoice.save()
-                                
-                                    # Update status for this invoice
-                                    bulk_invoice.status = 'Services Updated'
-                                    bulk_invoice.save()
-
-                                    # Track processed invoices
-                                    processed_invoices.add(bulk_invoice.id)
-                                    success_count += 1
-                        except Exception as e:
-                            error_msg = f'Service Update Failed: {str(e)} (Row: {idx + 2})'
-                            try:
-                                # Update status in a separate transaction
-                                if 'bulk_invoice' in locals() and bulk_invoice:
-                                    bulk_invoice.status = error_msg
-                                    bulk_invoice.save()
-                            except Exception:
-                                # If we can't even update the status, just continue
-                                pass
-                                
-                            failed_entries.append({
-                                'row': idx + 2,
-                                'invoice_id': row.get('invoice_id') or 'N/A',
-                                'error': str(e)
-                            })
-                            continue
-                    
-                    # Prepare success/failure message
-                    if not failed_entries:
-                        msg = 'All services imported successfully.'
-                        audit_msg = 'All services imported successfully.'
-                    else:
-                        success_msg = f'Successfully imported {success_count} services.' if success_count > 0 else 'No services were imported.'
-                        msg = f'{success_msg}\n\nFailed to import {len(failed_entries)} services:'
-                        audit_msg = f'{success_msg} Failed to import {len(failed_entries)} services:'
-                        for entry in failed_entries[:10]:  # Show first 10 failures
-                            msg += f"\n- Row {entry['row']} (Invoice: {entry['invoice_id']}): {entry['error']}"
-                            audit_msg += f" Row {entry['row']} (Invoice: {entry['invoice_id']}): {entry['error']};"
-                        if len(failed_entries) > 10:
-                            msg += f"\n... and {len(failed_entries) - 10} more failures"
-                            audit_msg += f" and {len(failed_entries) - 10} more failures"
-                    
-                    messages.success(request, msg)
-                    # Log to audit
-                    audit.create_audit_log(
-                        context['useremail'], 
-                        f'BULK_UPLOAD_SERVICES: {audit_msg}', 
-                        'u_txn_invoices', 
-                        200 if success_count > 0 else 400
-                    )
-                    
-                except Exception as e:
-                    messages.error(request, f'Error processing services file: {str(e)}')
-            
+            if 'services_file' in request.FILES:
+                uploaded_file, label, job_type = request.FILES['services_file'], 'services', BackgroundJob.INVOICE_SERVICES_UPLOAD
             elif 'parts_file' in request.FILES:
-                parts_file = request.FILES['parts_file']
-                file_extension = parts_file.name.lower().rsplit('.', 1)[-1]
-                
-                VALID_EXTENSIONS = {'csv', 'xls', 'xlsx'}
-                if file_extension not in VALID_EXTENSIONS:
-                    messages.error(request, 'Please upload a valid Excel or CSV file for parts.')
-                    return redirect(request.path)
-                
-                try:
-                    df = pd.read_csv(io.StringIO(parts_file.read().decode('utf-8'))) \
-                        if file_extension == 'csv' else pd.read_excel(parts_file)
-                    
-                    if df.empty:
-                        raise ValidationError('The uploaded parts file is empty.')
-                    
-                    df.columns = df.columns.str.strip().str.lower()
-                    
-                    REQUIRED_COLUMNS = ['invoice_id', 'part_name', 'quantity', 'part_value']
-                    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-                    
-                    if missing_columns:
-                        raise ValidationError(f'Missing required columns in parts file: {", ".join(missing_columns)}')
-                    
-                    # Check for empty values in required columns
-                    empty_required = []
-                    for col in REQUIRED_COLUMNS:
-                        if df[col].isna().any() or df[col].astype(str).str.strip().eq('').any():
-                            empty_required.append(col)
-                    
-                    if empty_required:
-                        raise ValidationError(f'Empty values found in required columns: {", ".join(empty_required)}. Please ensure all required columns have values.')    
-
-                    """ Uploading file into invoicebulkuploadedfiles folder """
-                    # Define the upload directory
-                    upload_dir = os.path.join('static', 'invoicebulkuploadedfiles') 
-
-                    # Create directory if it doesn't exist
-                    os.makedirs(upload_dir, exist_ok=True)    
-
-                    # Generate filename
-                    saved_filename = f"{track_invoice_upload_file_name}_PARTS_{current_time}{file_extension}"
-                    file_path = os.path.join(upload_dir, saved_filename)
-
-                    # Save the file with the new filename
-                    with open(file_path, 'wb+') as destination:
-                        for chunk in parts_file.chunks():
-                            destination.write(chunk)
-                    
-                    success_count = 0
-                    failed_entries = []
-                    processed_invoices = set()
-                    
-                    # Process each row individually with its own transaction
-                    for idx, row in df.iterrows():
-                        try:
-                            # Use a transaction for each row to avoid issues with the entire batch
-                            with transaction.atomic():
-                                invoice_id = row.get('invoice_id')
-                                bulk_invoice = track_invoice_upload.invoice_bulk_upload_txn.filter(invoice_id=invoice_id).first()
-                                
-                                if not bulk_invoice:
-                                    raise ValueError(f'Invoice ID {invoice_id} not found in this upload batch')
-                                
-                                if bulk_invoice.final_status == 'Invoice Created':
-                                    raise ValueError(f'Invoice ID {invoice_id} has already been finalized')    
-                                
-                                # Handle NaN values for numeric fields
-                                def safe_float(val, default=0.0):
-                                    """Convert value to float, handling NaN and invalid values."""
-                                    if pd.isna(val) or val == 'nan' or val == '' or val is None:
-                                        return default
-                                    try:
-                                        return float(val)
-                                    except (ValueError, TypeError):
-                                        return default
-                                
-                                # Get values with NaN handling
-                                quantity = safe_float(row['quantity'], 1)  # Default quantity is 1
-                                part_value = safe_float(row['part_value'], 0.0)
-                                part_tax = safe_float(row.get('part_tax'), 0.0)
-                                part_discount = safe_float(row.get('part_discount'), 0.0)
-                                
-                                # Get Invoice
-                                invoice = Invoice.objects.get(invoiceid=invoice_id)
-                                
-                                # Skip add parts into invoice already binded
-                                if not relInvoiceProductCatalogues.objects.filter(invoice=invoice, part_name=row['part_name']).exists():
-                                    relInvoiceProductCatalogues.objects.create(
-                                        invoice=invoice,
-                                        part=None,
-                                        part_source='external',
-                                        part_name=row['part_name'],
-                                        quantity=int(quantity) if quantity >= 1 else 1,  # Ensure quantity is at least 1
-                                        part_value=part_value,
-                                        part_tax=part_tax,
-                                        part_discount=part_discount
-                                    ) 
+                uploaded_file, label, job_type = request.FILES['parts_file'], 'parts', BackgroundJob.INVOICE_PARTS_UPLOAD
+            else:
+                messages.error(request, 'No file was uploaded.')
+                return redirect(request.path)
 
-                                    # Get each service and update invoice amount   
-                                    # Calculate line item values
-                                    line_value = part_value * quantity  # Value = Unit Price × Quantity
-                                    line_discount = (part_discount / 100) * line_value  # Discount = Value × (Discount % / 100)
-                                    taxable_amount = line_value - line_discount  # Taxable Amount = Value - Discount
-                                    line_tax = (part_tax / 100) * taxable_amount  # Tax = Taxable Amount × (Tax % / 100)
-                                    line_total = line_value - line_discount + line_tax  # Total = Value - Discount + Tax
+            file_extension = jobqueue.check_extension(uploaded_file, f' for {label}')
 
-                                    # Update invoice amount
-                                    invoice.amount = invoice.amount + line_total
-                                    invoice.save()                              
-                                    
-                                    # Update status for this invoice
-                                    bulk_invoice.status = 'Parts Updated'
-                                    bulk_invoice.save()
+            # The file is processed by the run_jobs worker
+            saved_filename = f"{track_invoice_upload_file_name}_{label.upper()}_{current_time}.{file_extension}"
+            file_path = jobqueue.save_upload(uploaded_file, 'invoicebulkuploadedfiles', saved_filename)
+            job = jobqueue.enqueue(
+                job_type, context['garage_id'], uploaded_file.name, file_path,
+                context['useremail'], track_invoice_uploads=track_invoice_upload,
+            )
+            messages.success(request, f'{uploaded_file.name} is queued for import as job #{job.id}.')
+            return redirect(f"{request.path}?job={job.id}")
 
-                                    # Track processed invoices
-                                    processed_invoices.add(bulk_invoice.id)
-                                    success_count += 1
-                        except Exception as e:
-                            error_msg = f'Parts Update Failed: {str(e)} (Row: {idx + 2})'
-                            try:
-                                # Update status in a separate transaction
-                                if 'bulk_invoice' in locals() and bulk_invoice:
-                                    bulk_invoice.status = error_msg
-                                    bulk_invoice.save()
-                            except Exception:
-                                # If we can't even update the status, just continue
-                                pass
-                            
-                            failed_entries.append({
-                                'row': idx + 2,
-                                'invoice_id': row.get('invoice_id') or 'N/A',
-                                'error': str(e)
-                            })
-                            continue
-                    
-                    # Prepare success/failure message
-                    if not failed_entries:
-                        msg = 'All parts imported successfully.'
-                        audit_msg = 'All parts imported successfully.'
-                    else:
-                        success_msg = f'Successfully imported {success_count} parts.' if success_count > 0 else 'No parts were imported.'
-                        msg = f'{success_msg}\n\nFailed to import {len(failed_entries)} parts:'
-                        audit_msg = f'{success_msg} Failed to import {len(failed_entries)} parts:'
-                        for entry in failed_entries[:10]:  # Show first 10 failures
-                            msg += f"\n- Row {entry['row']} (Invoice: {entry['invoice_id']}): {entry['error']}"
-                            audit_msg += f" Row {entry['row']} (Invoice: {entry['invoice_id']}): {entry['error']};"
-                        if len(failed_entries) > 10:
-                            msg += f"\n... and {len(failed_entries) - 10} more failures"
-                            audit_msg += f" and {len(failed_entries) - 10} more failures"
-                    
-                    messages.success(request, msg)
-                    # Log to audit
-                    audit.create_audit_log(
-                        context['useremail'], 
-                        f'BULK_UPLOAD_PARTS: {audit_msg}', 
-                        'u_txn_invoices', 
-                        200 if success_count > 0 else 400
-                    )
-                    
-                except Exception as e:
-                    messages.error(request, f'Error processing parts file: {str(e)}')
-            
-            else:
-                messages.error(request, 'No file was uploaded.')
-                
+        except ValidationError as e:
+            messages.error(request, ', '.join(e.messages))
         except Exception as e:
             messages.error(request, f'An error occurred: {str(e)}')
-        
+
         return redirect(request.path)
 
 
@@ -941,6 +316,11 @@ def u_txn_invoices(request, context, id):
                 customer = get_object_or_404(Customer, id=customer_id)
                 vehicle = get_object_or_404(Vehicle, id=vehicle_id)
 
+                # Resolve and validate all line items before writing
+                parts, services, parts_by_id = lineitems.read_posted_lines(
+                    request.POST, context['garage_id'], 'external invoice', lock_parts=True
+                )
+
                 # Update invoice
                 invoice.invoicedate = invoicedate
                 invoice.pono = pono
@@ -950,154 +330,11 @@ def u_txn_invoices(request, context, id):
                 invoice.vehicle = vehicle
                 invoice.amount = float(request.POST.get('amount', 0))
                 invoice.comments = comments
-                invoice.save()
-
-                # Delete existing StockOutwards and ProductCatalogues entries
-                stock_outwards = StockOutwards.objects.filter(
-                    garage_id=context['garage_id'],
-                    usage_purpose='Invoice',
-                    reference_document=invoice.id
-                )
-
-                # Reset outward_stock for all parts in this invoice
-                for stock_out in stock_outwards:
-                    try:
-                        part = stock_out.product  # Access the product directly through the foreign key
-                        # Update stock in ProductCatalogues   
-                        part.outward_stock -= stock_out.quantity
-                        part.save()
-                    except ProductCatalogues.DoesNotExist:
-                        continue  # Skip if part doesn't exist
-
-                # Delete existing StockOutwards entries
-                stock_outwards.delete()
 
-                # Delete existing invoice parts and services
-                relInvoiceProductCatalogues.objects.filter(invoice=invoice).delete()
-                relInvoiceService.objects.filter(invoice=invoice).delete()
-
-                # --- Insert parts ---
-                fromdb_part_ids = request.POST.getlist('fromdb_partname')
-                fromdb_part_values = request.POST.getlist('fromdb_partvalue')
-                fromdb_part_taxes = request.POST.getlist('fromdb_parttax')
-                fromdb_part_discounts = request.POST.getlist('fromdb_partdiscount')
-                fromdb_part_quantities = request.POST.getlist('fromdb_partquantity')
-
-                for i in range(len(fromdb_part_ids)):
-                    part_id = fromdb_part_ids[i]
-                    if part_id:
-                        part = ProductCatalogues.objects.filter(id=part_id).first()
-                        if part:
-                            quantity = int(fromdb_part_quantities[i]) if i < len(fromdb_part_quantities) and fromdb_part_quantities[i] else 1
-                            if quantity <= 0:
-                                raise ValueError(f"Invalid quantity for {part.name} - must be greater than 0")
-                        
-                            if part.current_stock < quantity:
-                                raise ValueError(f"Insufficient stock for {part.name}. Available: {part.current_stock}, Required: {quantity}")
-
-                            # Update stock in ProductCatalogues                        
-                            part.outward_stock += quantity
-                            part.save()
-                            
-                            # Create StockOutwards entry
-                            StockOutwards.objects.create(
-                                garage_id=context['garage_id'],
-                                product=part,
-                                quantity=quantity,
-                                rate=float(fromdb_part_values[i] or 0),
-                                discount=float(fromdb_part_discounts[i] or 0),
-                                gst=float(fromdb_part_taxes[i] or 0),
-                                total_price=float(fromdb_part_values[i] or 0) * quantity,
-                                issued_to=customer.name,
-                                issued_date=invoicedate,
-                                usage_purpose='Invoice',
-                                reference_document=invoice.id,
-                                location='Invoice',
-                                rack='Invoice',
-                                remarks='Invoice',
-                            )
-                            
-                            # Create relInvoiceProductCatalogues entry
-                            relInvoiceProductCatalogues.objects.create(
-                                invoice=invoice,
-                                part=part,
-                                part_source='inventory',
-                                part_name=part.name if part else '',
-                                part_value=float(fromdb_part_values[i] or 0),
-                                part_tax=float(fromdb_part_taxes[i] or 0),
-                                part_discount=float(fromdb_part_discounts[i] or 0),
-                                quantity=quantity
-                            )
-
-                fromuser_part_names = request.POST.getlist('fromuser_partname')
-                fromuser_part_values = request.POST.getlist('fromuser_partvalue')
-                fromuser_part_taxes = request.POST.getlist('fromuser_parttax')
-                fromuser_part_discounts = request.POST.getlist('fromuser_partdiscount')
-
-                for i in range(len(fromuser_part_names)):
-                    if fromuser_part_names[i]:
-                        relInvoiceProductCatalogues.objects.create(
-                            invoice=invoice,
-                            part=None,
-                            part_source='external',
-                            part_name=fromuser_part_names[i],
-                            part_value=fromuser_part_values[i] or 0,
-                            part_tax=fromuser_part_taxes[i] or 0,
-                            part_discount=fromuser_part_discounts[i] or 0
-                        )
-
-                # --- Insert services ---
-                fromdb_service_ids = request.POST.getlist('fromdb_servicename')
-                fromdb_service_values = request.POST.getlist('fromdb_servicevalue')
-                fromdb_service_taxes = request.POST.getlist('fromdb_servicetax')
-                fromdb_service_discounts = request.POST.getlist('fromdb_servicediscount')
-                fromdb_service_quantities = request.POST.getlist('fromdb_servicequantity')
-
-                for i in range(len(fromdb_service_ids)):
-                    service_id = fromdb_service_ids[i]
-                    if service_id:
-                        service = TXNService.objects.filter(id=service_id).first()
-                        quantity = int(fromdb_service_quantities[i]) if i < len(fromdb_service_quantities) and fromdb_service_quantities[i] else 1
-                        relInvoiceService.objects.create(
-                            invoice=invoice,
-                            service=service,
-                            service_source='service',
-                            service_name=service.name if service else '',
-                            service_value=fromdb_service_values[i] or 0,
-                            service_tax=fromdb_service_taxes[i] or 0,
-                            service_discount=fromdb_service_discounts[i] or 0,
-                            quantity=quantity
-                        )
-
-                fromuser_service_names = request.POST.getlist('fromuser_servicename')
-                fromuser_service_values = request.POST.getlist('fromuser_servicevalue')
-                fromuser_service_taxes = request.POST.getlist('fromuser_servicetax')
-                fromuser_service_discounts = request.POST.getlist('fromuser_servicediscount')
-
-                for i in range(len(fromuser_service_names)):
-                    if fromuser_service_names[i]:
-                        check_txn_service = TXNService.objects.filter(name=fromuser_service_names[i], garage_id=context['garage_id']).first()
-                        if check_txn_service:
-                            service = check_txn_service
-                        else:
-                            service = TXNService.objects.create(
-                                garage_id=context['garage_id'],
-                                name=fromuser_service_names[i],
-                                price=fromuser_service_values[i] or 0,
-                                gst=fromuser_service_taxes[i] or 0,
-                                discount=fromuser_service_discounts[i] or 0,
-                                notes='external invoice'
-                            )
-
-                        relInvoiceService.objects.create(
-                            invoice=invoice,
-                            service=service,
-                            service_source='service',
-                            service_name=service.name if service else '',
-                            service_value=fromuser_service_values[i] or 0,
-                            service_tax=fromuser_service_taxes[i] or 0,
-                            service_discount=fromuser_service_discounts[i] or 0
-                        )
+                # Re-book stock and write only the parts and services that changed
+                lineitems.save_invoice_stock(invoice, parts, parts_by_id, context['garage_id'], customer.name, invoicedate, update=True)
+                invoice.save()
+                lineitems.save_document_lines(relInvoiceProductCatalogues, relInvoiceService, 'invoice', invoice, parts, services, update=True)
 
                 messages.success(request, f"Invoice {invoice.invoiceid} {'updated' if invoice else 'created'} successfully")
                 # calling functions
@@ -1119,15 +356,10 @@ def d_txn_invoices(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    invoice_obj = get_object_or_404(Invoice, id=id)
-                    if invoice_obj:
-                        deleted_data.append(invoice_obj.id) 
-                        invoice_obj.delete()
+                deleted_count = bulkdelete.bulk_delete(Invoice, product_ids, Invoice.objects.filter(garage_id=context['garage_id']))
 
-                if deleted_data:
-                    msg = f"{len(deleted_data)} invoice deleted"
+                if deleted_count:
+                    msg = f"{deleted_count} invoice deleted"
                     sts = True
                 else:
                     msg = "Failed to delete invoice"
@@ -1,51 +1,57 @@
-import csv
-from django.http import HttpResponse
+from collections import defaultdict
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from GMSApp.modules import managesession
-from GMSApp.models import Jobcard
+from GMSApp.modules import managesession, streamexport
+from GMSApp.models import Jobcard, JobcardMechanic
+
+
+JOBCARDS_HEADER = [
+    'Jobcard Number', 'Date', 'Status', 'Customer Name', 'Customer Phone',
+    'Vehicle Registration', 'Vehicle Model', 'Supervisor', 'Mechanic',
+    'Amount', 'Paid', 'Pending'
+]
+JOBCARDS_FIELDS = (
+    'jobcard_number', 'current_date', 'status', 'customer__name', 'customer__phone',
+    'vehicle__registration_no', 'vehicle__model', 'supervisor__firstname', 'supervisor__lastname',
+    'parts_total', 'services_total', 'paid_total', 'pending_total',
+)
+
+
+def _jobcard_rows(garage_id):
+    queryset = Jobcard.objects.filter(garage_id=garage_id)
+    for chunk in streamexport.iterate_rows(queryset, JOBCARDS_FIELDS):
+        # Mechanics of the whole chunk in one query
+        mechanics = defaultdict(list)
+        for jobcard_id, firstname, lastname in JobcardMechanic.objects.filter(
+            jobcard_id__in=[row[0] for row in chunk]
+        ).values_list('jobcard_id', 'mechanic__firstname', 'mechanic__lastname'):
+            mechanics[jobcard_id].append(f"{firstname or ''} {lastname or ''}".strip())
+
+        for (jobcard_id, jobcard_number, current_date, status, customer_name, customer_phone,
+             registration_no, vehicle_model, supervisor_firstname, supervisor_lastname,
+             parts_total, services_total, paid_total, pending_total) in chunk:
+            supervisor_name = '-'
+            if supervisor_firstname is not None:
+                supervisor_name = f"{supervisor_firstname or ''} {supervisor_lastname or ''}".strip()
+
+            yield [
+                jobcard_number or '',
+                current_date or '',
+                status or '',
+                customer_name or '',
+                customer_phone or '',
+                registration_no or '',
+                vehicle_model or '',
+                supervisor_name,
+                ', '.join(mechanics[jobcard_id]) or '-',
+                # Amount, paid and pending from the ledger columns
+                float(parts_total + services_total),
+                float(paid_total),
+                float(pending_total),
+            ]
 
 
 @managesession.check_session_timeout
 @require_http_methods(["GET"])
 def export_jobcards_csv(request, context):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="jobcards.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Jobcard Number', 'Date', 'Status', 'Customer Name', 'Customer Phone',
-        'Vehicle Registration', 'Vehicle Model', 'Supervisor', 'Mechanic',
-        'Amount', 'Paid', 'Pending'
-    ])
-    
-    jobcards = Jobcard.objects.filter(garage_id=context['garage_id']).select_related(
-        'customer', 'vehicle', 'supervisor'
-    ).prefetch_related('jobcard_mechanic__mechanic')
-    
-    for jobcard in jobcards:
-        mechanics = ', '.join([
-            f"{m.mechanic.firstname or ''} {m.mechanic.lastname or ''}".strip()
-            for m in jobcard.jobcard_mechanic.all() if m.mechanic
-        ]) or '-'
-        
-        supervisor_name = '-'
-        if jobcard.supervisor:
-            supervisor_name = f"{jobcard.supervisor.firstname or ''} {jobcard.supervisor.lastname or ''}".strip()
-        
-        writer.writerow([
-            jobcard.jobcard_number or '',
-            jobcard.current_date or '',
-            jobcard.status or '',
-            jobcard.customer.name if jobcard.customer else '',
-            jobcard.customer.phone if jobcard.customer else '',
-            jobcard.vehicle.registration_no if jobcard.vehicle else '',
-            jobcard.vehicle.model if jobcard.vehicle else '',
-            supervisor_name,
-            mechanics,
-            getattr(jobcard, 'amount', 0),
-            getattr(jobcard, 'paid', 0),
-            getattr(jobcard, 'pending', 0)
-        ])
-    
-    return response
\ No newline at end of file
+    return streamexport.export_response(request, 'jobcards', JOBCARDS_HEADER, _jobcard_rows(context['garage_id']))
@@ -1,4 +1,33 @@
-from GMSApp.models import Jobcard
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+from GMSApp.models import (
+    DocumentSequence,
+    Jobcard,
+    JobcardMechanic,
+    JobcardParts,
+    JobcardPayment,
+    JobcardServices,
+    JobcardVehicleAccessory,
+    JobcardVehicleDamage,
+    JobcardVehicleIssue,
+)
+
+# Upper bound on ids per IN (...) clause when computing ledgers
+LEDGER_BATCH_SIZE = 1000
+
+AMOUNT_OUTPUT = DecimalField(max_digits=20, decimal_places=6)
+
+# Posted field -> (link model, foreign key to the linked row) of the job card's
+# many-to-many style relations
+JOBCARD_RELATIONS = {
+    'mechanic': (JobcardMechanic, 'mechanic'),
+    'vehicle_issue': (JobcardVehicleIssue, 'vehicleissue'),
+    'vehicle_damage': (JobcardVehicleDamage, 'vehicledamage'),
+    'vehicle_accessory': (JobcardVehicleAccessory, 'vehicleaccessory'),
+}
 
 
 def get_or_create_jobcard(jobcard_number, context):
@@ -6,11 +35,144 @@ def get_or_create_jobcard(jobcard_number, context):
     if check_jobcard:
         jobcard_id = check_jobcard.id
     else:
-        # Create a new jobcard
+        # Create a new (draft) jobcard, completed by c_txn_job_sheets on save
         jobcard = Jobcard.objects.create(
             garage_id=context['garage_id'],
             jobcard_number=jobcard_number,
             created_by_id=context['userid']
         )
         jobcard_id = jobcard.id    
-    return jobcard_id
\ No newline at end of file
+        # Reserve its number so the sequence never allocates it again
+        number = DocumentSequence.parse_number(DocumentSequence.JOBCARD, jobcard_number)
+        if number is not None:
+            DocumentSequence.advance_past(context['garage_id'], DocumentSequence.JOBCARD, '', number)
+    return jobcard_id
+
+
+def sync_related_ids(model, owner_field, owner_id, related_field, ids):
+    """
+    Makes the owner's rows of a link model point at exactly the given related
+    ids: rows already linked are kept, links no longer posted are removed
+    with one DELETE and new ones are added with one bulk INSERT. Nothing is
+    written when the set is unchanged. Returns (added, removed) counts.
+    """
+    wanted = dict.fromkeys(int(related_id) for related_id in ids)
+    current = model.objects.filter(**{owner_field: owner_id}).values_list('id', f'{related_field}_id')
+
+    stale = []
+    for row_id, related_id in current:
+        if related_id in wanted and wanted[related_id] is None:
+            wanted[related_id] = row_id
+        else:
+            # Not posted any more, or a duplicate link
+            stale.append(row_id)
+    missing = [related_id for related_id, row_id in wanted.items() if row_id is None]
+
+    if stale:
+        model.objects.filter(id__in=stale).delete()
+    if missing:
+        model.objects.bulk_create([
+            model(**{f'{owner_field}_id': owner_id, f'{related_field}_id': related_id}) for related_id in missing
+        ])
+    return len(missing), len(stale)
+
+
+def sync_jobcard_relations(jobcard_id, data):
+    """ Syncs the mechanics, issues, damages and accessories of a job card with the posted lists. """
+    for field, (model, related_field) in JOBCARD_RELATIONS.items():
+        sync_related_ids(model, 'jobcard', jobcard_id, related_field, data.getlist(field))
+
+
+def _line_totals(model, value_field, tax_field, discount_field, jobcard_ids):
+    """
+    Returns {jobcard_id: (taxable_total, tax_total)} for the line items of the
+    given job cards, using the same formula as the job card invoice.
+    """
+    gross = F(value_field) * F('quantity')
+    taxable = ExpressionWrapper(gross - gross * F(discount_field) / 100, output_field=AMOUNT_OUTPUT)
+    tax = ExpressionWrapper(taxable * F(tax_field) / 100, output_field=AMOUNT_OUTPUT)
+    rows = (
+        model.objects.filter(jobcard_id__in=jobcard_ids)
+        .order_by()
+        .values('jobcard_id')
+        .annotate(taxable=Sum(taxable), tax=Sum(tax))
+    )
+    return {row['jobcard_id']: (row['taxable'] or 0, row['tax'] or 0) for row in rows}
+
+
+def compute_ledgers(jobcard_ids):
+    """
+    Recomputes the ledger values of the given job cards from their parts,
+    services and payments. Returns {jobcard_id: {field: Decimal}}.
+    """
+    jobcard_ids = list(dict.fromkeys(jobcard_ids))
+    ledgers = {}
+    for start in range(0, len(jobcard_ids), LEDGER_BATCH_SIZE):
+        batch = jobcard_ids[start:start + LEDGER_BATCH_SIZE]
+        parts = _line_totals(JobcardParts, 'part_value', 'part_tax', 'part_discount', batch)
+        services = _line_totals(JobcardServices, 'service_value', 'service_tax', 'service_discount', batch)
+        payments = dict(
+            JobcardPayment.objects.filter(jobcard_id__in=batch)
+            .order_by()
+            .values('jobcard_id')
+            .annotate(total=Sum('amount'))
+            .values_list('jobcard_id', 'total')
+        )
+        for jobcard_id in batch:
+            parts_taxable, parts_tax = parts.get(jobcard_id, (0, 0))
+            services_taxable, services_tax = services.get(jobcard_id, (0, 0))
+            parts_total = _money(parts_taxable + parts_tax)
+            services_total = _money(services_taxable + services_tax)
+            paid_total = _money(payments.get(jobcard_id) or 0)
+            ledgers[jobcard_id] = {
+                'parts_total': parts_total,
+                'services_total': services_total,
+                'tax_total': _money(parts_tax + services_tax),
+                'paid_total': paid_total,
+                'pending_total': parts_total + services_total - paid_total,
+            }
+    return ledgers
+
+
+def lock_jobcard(**filters):
+    """
+    Locks the job card matching filters (e.g. jobcard_parts__id=...) for the
+    rest of the surrounding transaction and returns its id, or None.
+
+    Call it first in the transaction, before any plain read: under MySQL's
+    REPEATABLE READ the first plain read fixes the snapshot, and ledger sums
+    read from a snapshot older than the lock can miss a concurrent edit.
+    """
+    return Jobcard.objects.select_for_update().filter(**filters).values_list('id', flat=True).first()
+
+
+def refresh_jobcard_ledger(jobcard_id):
+    """
+    Recomputes and stores the ledger columns of one job card. The job card
+    row is locked for the duration of the surrounding transaction so
+    concurrent part/service/payment edits serialize on it; callers that read
+    before calling this take the lock first with lock_jobcard().
+    """
+    if not jobcard_id:
+        return
+    with transaction.atomic():
+        if not Jobcard.objects.select_for_update().filter(id=jobcard_id).exists():
+            return
+        ledger = compute_ledgers([jobcard_id])[jobcard_id]
+        Jobcard.objects.filter(id=jobcard_id).update(**ledger)
+
+
+def attach_payment_summaries(jobcards):
+    """
+    Sets amount, paid and pending (floats) on each job card object from its
+    ledger columns. Returns the job cards.
+    """
+    for jobcard in jobcards:
+        jobcard.amount = float(jobcard.parts_total + jobcard.services_total)
+        jobcard.paid = float(jobcard.paid_total)
+        jobcard.pending = float(jobcard.pending_total)
+    return jobcards
+
+
+def _money(value):
+    return Decimal(str(value)).quantize(Decimal('0.01'))
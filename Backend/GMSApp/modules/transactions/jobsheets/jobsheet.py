@@ -6,7 +6,6 @@ import uuid
 
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
 from django.db import connection, transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
@@ -16,18 +15,16 @@ from django.views.decorators.http import require_http_methods
 from GMSApp.models import (
     BookingStatus,
     BookingTimeline,
+    DocumentSequence,
     Jobcard,
-    JobcardMechanic,
-    JobcardVehicleAccessory,
-    JobcardVehicleDamage,
-    JobcardVehicleIssue,
     ProductCatalogues,
     StockOutwards,
     TXNService,
     Vehicle,
 )
-from GMSApp.modules import audit, managesession, templatespath
-from GMSApp.modules.messaging.whatsapp import send_create_jobcard_message
+from GMSApp.modules import audit, bulkdelete, managesession, templatespath
+from GMSApp.modules.keysetpaginator import KeysetPaginator, count_by
+from GMSApp.modules.messaging.whatsapp import queue_create_jobcard_message
 from GMSApp.modules.transactions.jobsheets import jobcard_utils
 
 
@@ -39,50 +36,32 @@ def r_txn_job_sheets(request, context):
             garage_id=context["garage_id"]
         )
 
-        # Get counts before pagination (for all)
-        context["total_jobcard"] = jobcard_objs.count()
-        context["open_jobcard"] = jobcard_objs.filter(status="open").count()
-        context["closed_jobcard"] = jobcard_objs.filter(status="closed").count()
+        # Get counts before pagination (for all), in one query
+        counts = count_by(jobcard_objs, "status", ["open", "closed"])
+        context["total_jobcard"] = counts["total"]
+        context["open_jobcard"] = counts["open"]
+        context["closed_jobcard"] = counts["closed"]
 
         # Check for filter parameter in URL
         status_filter = request.GET.get("filter")
+        total = counts["total"]
         if status_filter in ["open", "closed"]:
             jobcard_objs = jobcard_objs.filter(status=status_filter)
+            total = counts[status_filter]
+        elif status_filter == "pending":
+            # Outstanding balance, not counted. Newest first like the other filters:
+            # pending_total changes with every payment, so it cannot key the pages
+            jobcard_objs = jobcard_objs.filter(pending_total__gt=0)
+            total = None
 
         # Pagination
-        paginator = Paginator(jobcard_objs, 100)
-        page_number = request.GET.get("page")
-        jobcard_objs = paginator.get_page(page_number)
-
-        for jobcard in jobcard_objs:
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT * FROM garage.vw_jobcard_payment 
-                    WHERE garage_id = %s AND jobcard_id = %s 
-                """,
-                    [context["garage_id"], jobcard.id],
-                )
+        paginator = KeysetPaginator(jobcard_objs, 100, params=request.GET, count=total)
+        jobcard_objs = paginator.get_page(request.GET.get("cursor"))
 
-                columns = [col[0] for col in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-                # Add amount, paid, and pending to jobcard object
-                if results:  # If there are payment records
-                    payment_info = results[
-                        0
-                    ]  # Get the first (and should be only) payment record
-                    jobcard.amount = float(
-                        payment_info.get("service_total", 0)
-                        + payment_info.get("parts_total", 0)
-                    )
-                    jobcard.paid = float(payment_info.get("payment_total", 0))
-                    jobcard.pending = float(jobcard.amount - jobcard.paid)
-                else:
-                    # Default values if no payment record exists
-                    jobcard.amount = 0.0
-                    jobcard.paid = 0.0
-                    jobcard.pending = 0.0
+        # Add amount, paid, and pending to each jobcard on the page
+        jobcard_objs.object_list = jobcard_utils.attach_payment_summaries(
+            list(jobcard_objs.object_list)
+        )
 
         context["jobcard_objs"] = jobcard_objs
 
@@ -101,24 +80,10 @@ def c_txn_job_sheets(request, context, vehicletype):
     if request.method == "GET":
         context["vehicletype"] = vehicletype
 
-        # Pre-fill jobcard number dynamically
-        last_jobcard = (
-            Jobcard.objects.filter(garage_id=context["garage_id"])
-            .order_by("-jobcard_number")
-            .first()
-        )
-        if last_jobcard and last_jobcard.jobcard_number:
-            try:
-                # If jobcard_number like "JOB-101"
-                prefix, number = last_jobcard.jobcard_number.split("-")
-                next_number = int(number) + 1
-                context["new_jobcard_number"] = f"{prefix}-{next_number}"
-            except Exception:
-                # fallback: just append +1 to id
-                context["new_jobcard_number"] = f"JOB-{last_jobcard.id + 1}"
-        else:
-            # First ever jobcard
-            context["new_jobcard_number"] = "JOB-101"
+        # Pre-fill jobcard number dynamically, it is reserved by the first part,
+        # service or voice added, or else allocated on save
+        next_number = DocumentSequence.peek(context["garage_id"], DocumentSequence.JOBCARD)
+        context["new_jobcard_number"] = f"JOB-{next_number}"
 
         # Get only products with available stock
         context["product_catalogues_objs"] = ProductCatalogues.objects.filter(
@@ -150,24 +115,18 @@ def c_txn_job_sheets(request, context, vehicletype):
                 kmreading = request.POST.get("km_reading")
                 fuellevel = request.POST.get("fuel_level")
                 supervisorid = request.POST.get("supervisor")
-                mechanic_id = request.POST.getlist("mechanic")
                 vehicleissuedescription = request.POST.get("vehicle_issue_description")
-                vehicle_issue_id = request.POST.getlist("vehicle_issue")
                 vehicledamagedescription = request.POST.get(
                     "vehicle_damage_description"
                 )
-                vehicle_damage_id = request.POST.getlist("vehicle_damage")
                 vehicleaccessorydescription = request.POST.get(
                     "vehicle_accessory_description"
                 )
-                vehicle_accessory_id = request.POST.getlist("vehicle_accessory")
 
                 if not jobtypeid:
                     raise ValueError("Job Type is required")
                 if not customerid:
                     raise ValueError("Customer is required")
-                if not jobcardnumber:
-                    raise ValueError("Job Card Number is required")
                 if not currentdate:
                     raise ValueError("Current Date is required")
 
@@ -205,54 +164,59 @@ def c_txn_job_sheets(request, context, vehicletype):
                 )
                 vehicle_number = vehicle.license_plate_no if vehicle else "N/A"
 
-                # Send WhatsApp message before creating jobcard
-                send_create_jobcard_message(vehicle_name, jobcardnumber, vehicle_number)
-
-                jobcard, created = Jobcard.objects.update_or_create(
-                    jobcard_number=jobcardnumber,
-                    garage_id=context["garage_id"],
-                    defaults={
-                        "booking_id": None,
-                        "jobtype_id": jobtypeid,
-                        "customer_id": customerid,
-                        "vehicle_id": vehicleid,
-                        "current_date": currentdate,
-                        "km_reading": kmreading,
-                        "fuel_level": fuellevel,
-                        "supervisor_id": supervisorid,
-                        "vehicle_issue_description": vehicleissuedescription,
-                        "vehicle_damage_description": vehicledamagedescription,
-                        "vehicle_accessory_description": vehicleaccessorydescription,
-                        "damagephotos": saved_photo_paths,
-                        "created_by_id": context["userid"],
-                    },
-                )
+                fields = {
+                    "booking_id": None,
+                    "jobtype_id": jobtypeid,
+                    "customer_id": customerid,
+                    "vehicle_id": vehicleid,
+                    "current_date": currentdate,
+                    "km_reading": kmreading,
+                    "fuel_level": fuellevel,
+                    "supervisor_id": supervisorid,
+                    "vehicle_issue_description": vehicleissuedescription,
+                    "vehicle_damage_description": vehicledamagedescription,
+                    "vehicle_accessory_description": vehicleaccessorydescription,
+                    "damagephotos": saved_photo_paths,
+                    "created_by_id": context["userid"],
+                }
 
-                # Assign mechanics
-                for mechanic_id in mechanic_id:
-                    JobcardMechanic.objects.create(
-                        jobcard=jobcard, mechanic_id=mechanic_id
+                # Parts, services and voices added before saving went onto this user's
+                # draft job card under the pre-filled number, which is already reserved
+                jobcard = (
+                    Jobcard.objects.select_for_update()
+                    .filter(
+                        garage_id=context["garage_id"],
+                        jobcard_number=jobcardnumber,
+                        created_by_id=context["userid"],
+                        customer__isnull=True,
                     )
-
-                # Assign vehicle issues
-                for vehicle_issue_id in vehicle_issue_id:
-                    JobcardVehicleIssue.objects.create(
-                        jobcard=jobcard, vehicleissue_id=vehicle_issue_id
+                    .first()
+                    if jobcardnumber
+                    else None
+                )
+                if jobcard:
+                    for field, value in fields.items():
+                        setattr(jobcard, field, value)
+                    jobcard.save()
+                else:
+                    # Allocate the number here: the sequence row stays locked until
+                    # commit, so no concurrent create can take the same number
+                    jobcardnumber = f"JOB-{DocumentSequence.allocate(context['garage_id'], DocumentSequence.JOBCARD)}"
+                    if Jobcard.objects.filter(
+                        garage_id=context["garage_id"], jobcard_number=jobcardnumber
+                    ).exists():
+                        raise ValidationError(f"Job card number {jobcardnumber} is already in use")
+                    jobcard = Jobcard.objects.create(
+                        garage_id=context["garage_id"], jobcard_number=jobcardnumber, **fields
                     )
 
-                # Assign vehicle damage
-                for vehicle_damage_id in vehicle_damage_id:
-                    JobcardVehicleDamage.objects.create(
-                        jobcard=jobcard, vehicledamage_id=vehicle_damage_id
-                    )
+                # Queue the WhatsApp message, sent by the outbox once the jobcard is committed
+                queue_create_jobcard_message(vehicle_name, jobcardnumber, vehicle_number)
 
-                # Assign vehicle accessories
-                for vehicle_accessory_id in vehicle_accessory_id:
-                    JobcardVehicleAccessory.objects.create(
-                        jobcard=jobcard, vehicleaccessory_id=vehicle_accessory_id
-                    )
+                # Assign mechanics, vehicle issues, damages and accessories
+                jobcard_utils.sync_jobcard_relations(jobcard.id, request.POST)
 
-                messages.success(request, "Job card created successfully!")
+                messages.success(request, f"Job card {jobcardnumber} created successfully!")
                 return redirect("r-txn-job-sheets")
 
         except (ValidationError, Exception) as e:
@@ -507,17 +471,13 @@ def u_txn_job_sheets(request, context, id):
                 kmreading = request.POST.get("km_reading")
                 fuellevel = request.POST.get("fuel_level")
                 supervisorid = request.POST.get("supervisor")
-                mechanic_id = request.POST.getlist("mechanic")
                 vehicleissuedescription = request.POST.get("vehicle_issue_description")
-                vehicle_issue_id = request.POST.getlist("vehicle_issue")
                 vehicledamagedescription = request.POST.get(
                     "vehicle_damage_description"
                 )
-                vehicle_damage_id = request.POST.getlist("vehicle_damage")
                 vehicleaccessorydescription = request.POST.get(
                     "vehicle_accessory_description"
                 )
-                vehicle_accessory_id = request.POST.getlist("vehicle_accessory")
                 worknote = request.POST.get("work_note")
                 delivery_timeline = request.POST.get("delivery_timeline") or None
                 reminderduration = request.POST.get("reminder_duration") or 0
@@ -599,8 +559,8 @@ def u_txn_job_sheets(request, context, id):
                 )
                 vehicle_number = vehicle.license_plate_no if vehicle else "N/A"
 
-                # Send WhatsApp message before updating jobcard
-                send_create_jobcard_message(
+                # Queue the WhatsApp message, sent by the outbox once the jobcard is committed
+                queue_create_jobcard_message(
                     vehicle_name, jobcard_obj.jobcard_number, vehicle_number
                 )
 
@@ -620,37 +580,8 @@ def u_txn_job_sheets(request, context, id):
                 jobcard_obj.reminder_km = reminderkm
                 jobcard_obj.save()
 
-                # Assign mechanics
-                # Delete existing mechanics
-                JobcardMechanic.objects.filter(jobcard=jobcard_obj).delete()
-                for mechanic_id in mechanic_id:
-                    JobcardMechanic.objects.create(
-                        jobcard=jobcard_obj, mechanic_id=mechanic_id
-                    )
-
-                # Assign vehicle issues
-                # Delete existing vehicle issues
-                JobcardVehicleIssue.objects.filter(jobcard=jobcard_obj).delete()
-                for vehicle_issue_id in vehicle_issue_id:
-                    JobcardVehicleIssue.objects.create(
-                        jobcard=jobcard_obj, vehicleissue_id=vehicle_issue_id
-                    )
-
-                # Assign vehicle damage
-                # Delete existing vehicle damage
-                JobcardVehicleDamage.objects.filter(jobcard=jobcard_obj).delete()
-                for vehicle_damage_id in vehicle_damage_id:
-                    JobcardVehicleDamage.objects.create(
-                        jobcard=jobcard_obj, vehicledamage_id=vehicle_damage_id
-                    )
-
-                # Assign vehicle accessories
-                # Delete existing vehicle accessories
-                JobcardVehicleAccessory.objects.filter(jobcard=jobcard_obj).delete()
-                for vehicle_accessory_id in vehicle_accessory_id:
-                    JobcardVehicleAccessory.objects.create(
-                        jobcard=jobcard_obj, vehicleaccessory_id=vehicle_accessory_id
-                    )
+                # Sync mechanics, vehicle issues, damages and accessories with the posted lists
+                jobcard_utils.sync_jobcard_relations(jobcard_obj.id, request.POST)
 
                 messages.success(request, "Job card updated successfully!")
         except (ValidationError, Exception) as e:
@@ -674,15 +605,12 @@ def d_txn_job_sheets(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist("id[]")
-                deleted_data = []
-                for id in product_ids:
-                    jobcard_obj = get_object_or_404(Jobcard, id=id)
-                    if jobcard_obj:
-                        deleted_data.append(jobcard_obj.id)
-                        jobcard_obj.delete()
-
-                if deleted_data:
-                    msg = f"{len(deleted_data)} jobcard deleted"
+                deleted_count = bulkdelete.bulk_delete(
+                    Jobcard, product_ids, Jobcard.objects.filter(garage_id=context["garage_id"])
+                )
+
+                if deleted_count:
+                    msg = f"{deleted_count} jobcard deleted"
                     sts = True
                 else:
                     msg = "Failed to delete jobcard"
@@ -729,14 +657,11 @@ def update_jobcard_status(request, jobcard_id):
         jobcard = get_object_or_404(Jobcard, id=jobcard_id)
 
         with transaction.atomic():
+            jobcard_utils.lock_jobcard(id=jobcard.id)
             if new_status == "closed":
                 if jobcard.booking:
                     status_obj = BookingStatus.objects.get(name="work_completed")
-                    BookingTimeline.objects.create(
-                        booking_id=jobcard.booking.id,
-                        status=status_obj,
-                        remark=jobcard.jobcard_number,
-                    )
+                    BookingTimeline.record(jobcard.booking_id, status_obj, jobcard.jobcard_number)
 
                 # Handle StockOutwards for jobcard parts
                 for jobcard_part in jobcard.jobcard_parts.filter(
@@ -769,6 +694,7 @@ def update_jobcard_status(request, jobcard_id):
 
             jobcard.status = new_status
             jobcard.save()
+            jobcard_utils.refresh_jobcard_ledger(jobcard.id)
 
         return JsonResponse(
             {
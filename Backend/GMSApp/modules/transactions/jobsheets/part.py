@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
@@ -23,21 +24,24 @@ def save_jobcard_part(request, context):
         part_number = request.POST.get('part_number', '')
         code = request.POST.get('code', '')
 
-        # get jobcard id
-        jobcardid = jobcard_utils.get_or_create_jobcard(jobcard_number, context)
+        with transaction.atomic():
+            # Lock the job card before reading, then get (or create) its id
+            jobcard_utils.lock_jobcard(jobcard_number=jobcard_number, garage_id=context['garage_id'])
+            jobcardid = jobcard_utils.get_or_create_jobcard(jobcard_number, context)
 
-        part = JobcardParts.objects.create(
-            jobcard_id=jobcardid,
-            part_id=part_id,
-            part_source=part_source,
-            part_name=part_name,
-            part_number=part_number,
-            code=code,
-            quantity=quantity,
-            part_value=part_value,
-            part_tax=part_tax,
-            part_discount=part_discount
-        )
+            part = JobcardParts.objects.create(
+                jobcard_id=jobcardid,
+                part_id=part_id,
+                part_source=part_source,
+                part_name=part_name,
+                part_number=part_number,
+                code=code,
+                quantity=quantity,
+                part_value=part_value,
+                part_tax=part_tax,
+                part_discount=part_discount
+            )
+            jobcard_utils.refresh_jobcard_ledger(jobcardid)
 
         return JsonResponse({
             'status': 'success',
@@ -89,18 +93,21 @@ def update_jobcard_part(request, context):
         part_number = request.POST.get('part_number', '')
         code = request.POST.get('code', '')
 
-        # Update the part
-        part = JobcardParts.objects.get(id=item_id)
-        part.part_id = part_id if part_id else None
-        part.part_source = part_source
-        part.part_name = part_name
-        part.part_number = part_number
-        part.code = code
-        part.quantity = quantity
-        part.part_value = part_value
-        part.part_tax = part_tax
-        part.part_discount = part_discount
-        part.save()
+        with transaction.atomic():
+            # Lock the job card before reading, then update the part
+            jobcard_utils.lock_jobcard(jobcard_parts__id=item_id)
+            part = JobcardParts.objects.get(id=item_id)
+            part.part_id = part_id if part_id else None
+            part.part_source = part_source
+            part.part_name = part_name
+            part.part_number = part_number
+            part.code = code
+            part.quantity = quantity
+            part.part_value = part_value
+            part.part_tax = part_tax
+            part.part_discount = part_discount
+            part.save()
+            jobcard_utils.refresh_jobcard_ledger(part.jobcard_id)
 
         return JsonResponse({
             'status': 'success',
@@ -126,7 +133,12 @@ def delete_jobcard_part(request, context):
     try:
         jobcard_number = request.POST.get('jobcard_number')
         item_id = request.POST.get('item_id')
-        JobcardParts.objects.filter(id=item_id).delete()
+        with transaction.atomic():
+            jobcard_utils.lock_jobcard(jobcard_parts__id=item_id)
+            part = JobcardParts.objects.filter(id=item_id).first()
+            if part:
+                part.delete()
+                jobcard_utils.refresh_jobcard_ledger(part.jobcard_id)
         return JsonResponse({'status': 'success'})
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=400)            
\ No newline at end of file
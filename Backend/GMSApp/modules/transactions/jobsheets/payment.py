@@ -8,6 +8,7 @@ import logging
 from django.utils import timezone
 
 from GMSApp.models import Jobcard, JobcardPayment
+from GMSApp.modules.transactions.jobsheets import jobcard_utils
 
 logger = logging.getLogger(__name__)
 
@@ -155,7 +156,9 @@ def save_jobcard_payment(request):
             })
 
         # Create the payment
-        payment = JobcardPayment.objects.create(**payment_data)
+        with transaction.atomic():
+            payment = JobcardPayment.objects.create(**payment_data)
+            jobcard_utils.refresh_jobcard_ledger(jobcard.id)
 
         return JsonResponse({
             'status': 'success',
@@ -241,7 +244,9 @@ def update_jobcard_payment(request, payment_id):
         payment.updated_at = timezone.now()
         
         # Save the updated payment
-        payment.save()
+        with transaction.atomic():
+            payment.save()
+            jobcard_utils.refresh_jobcard_ledger(payment.jobcard_id)
         
         return JsonResponse({
             'status': 'success',
@@ -274,7 +279,9 @@ def delete_jobcard_payment(request, payment_id):
         
         # Delete the payment
         payment_id = payment.id
-        payment.delete()
+        with transaction.atomic():
+            payment.delete()
+            jobcard_utils.refresh_jobcard_ledger(payment.jobcard_id)
         
         return JsonResponse({
             'status': 'success',
@@ -1,4 +1,5 @@
 from GMSApp.modules import managesession
+from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.http import JsonResponse
@@ -21,20 +22,23 @@ def save_jobcard_service(request, context):
         service_discount = float(request.POST.get('service_discount', 0))
         code = request.POST.get('code', '')
 
-        # get jobcard id
-        jobcardid = jobcard_utils.get_or_create_jobcard(jobcard_number, context)
+        with transaction.atomic():
+            # Lock the job card before reading, then get (or create) its id
+            jobcard_utils.lock_jobcard(jobcard_number=jobcard_number, garage_id=context['garage_id'])
+            jobcardid = jobcard_utils.get_or_create_jobcard(jobcard_number, context)
 
-        service = JobcardServices.objects.create(
-            jobcard_id=jobcardid,
-            service_id=service_id,
-            service_source=service_source,
-            service_name=service_name,
-            code=code,
-            quantity=quantity,
-            service_value=service_value,
-            service_tax=service_tax,
-            service_discount=service_discount
-        )
+            service = JobcardServices.objects.create(
+                jobcard_id=jobcardid,
+                service_id=service_id,
+                service_source=service_source,
+                service_name=service_name,
+                code=code,
+                quantity=quantity,
+                service_value=service_value,
+                service_tax=service_tax,
+                service_discount=service_discount
+            )
+            jobcard_utils.refresh_jobcard_ledger(jobcardid)
 
         return JsonResponse({
             'status': 'success',
@@ -64,17 +68,20 @@ def update_jobcard_service(request, context):
         service_discount = float(request.POST.get('service_discount', 0))
         code = request.POST.get('code', '')
 
-        # Update the service
-        service = JobcardServices.objects.get(id=item_id)
-        service.service_id = service_id if service_id else None
-        service.service_source = service_source
-        service.service_name = service_name
-        service.code = code
-        service.quantity = quantity
-        service.service_value = service_value
-        service.service_tax = service_tax
-        service.service_discount = service_discount
-        service.save()
+        with transaction.atomic():
+            # Lock the job card before reading, then update the service
+            jobcard_utils.lock_jobcard(jobcard_services__id=item_id)
+            service = JobcardServices.objects.get(id=item_id)
+            service.service_id = service_id if service_id else None
+            service.service_source = service_source
+            service.service_name = service_name
+            service.code = code
+            service.quantity = quantity
+            service.service_value = service_value
+            service.service_tax = service_tax
+            service.service_discount = service_discount
+            service.save()
+            jobcard_utils.refresh_jobcard_ledger(service.jobcard_id)
 
         return JsonResponse({
             'status': 'success',
@@ -121,7 +128,12 @@ def delete_jobcard_service(request, context):
     try:
         jobcard_number = request.POST.get('jobcard_number')
         item_id = request.POST.get('item_id')
-        JobcardServices.objects.filter(id=item_id).delete()
+        with transaction.atomic():
+            jobcard_utils.lock_jobcard(jobcard_services__id=item_id)
+            service = JobcardServices.objects.filter(id=item_id).first()
+            if service:
+                service.delete()
+                jobcard_utils.refresh_jobcard_ledger(service.jobcard_id)
         return JsonResponse({'status': 'success'})
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=400)    
\ No newline at end of file
@@ -0,0 +1,288 @@
+"""
+Line-item persistence shared by invoices and estimates.
+
+Posted part and service rows are resolved with one in_bulk fetch per table,
+stock is validated in memory against row-locked parts, and every relation
+table is written with a single bulk_create. Updates diff the stored rows
+against the posted ones and only delete and insert what changed.
+"""
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from GMSApp.models import ProductCatalogues, StockOutwards, TXNService
+
+PART_FIELDS = ('part_source', 'part_id', 'part_name', 'part_value', 'part_tax', 'part_discount', 'quantity')
+SERVICE_FIELDS = ('service_source', 'service_id', 'service_name', 'service_value', 'service_tax', 'service_discount', 'quantity')
+STOCK_OUTWARD_FIELDS = ('product_id', 'quantity', 'rate', 'discount', 'gst')
+
+
+def _decimal(value):
+    try:
+        return Decimal(value or 0).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value}")
+
+
+def _quantity(values, i):
+    return int(values[i]) if i < len(values) and values[i] else 1
+
+
+def read_posted_lines(post, garage_id, notes, lock_parts=False):
+    """
+    Reads the fromdb_* / fromuser_* part and service arrays of an invoice or
+    estimate form. Returns (parts, services, parts_by_id): lists of field
+    dicts for the rel tables plus the referenced ProductCatalogues rows,
+    locked with select_for_update when lock_parts is set.
+
+    Services typed in by the user are matched by name within the garage and
+    created in one bulk_create when missing.
+    """
+    part_ids = post.getlist('fromdb_partname')
+    part_values = post.getlist('fromdb_partvalue')
+    part_taxes = post.getlist('fromdb_parttax')
+    part_discounts = post.getlist('fromdb_partdiscount')
+    part_quantities = post.getlist('fromdb_partquantity')
+
+    user_part_names = post.getlist('fromuser_partname')
+    user_part_values = post.getlist('fromuser_partvalue')
+    user_part_taxes = post.getlist('fromuser_parttax')
+    user_part_discounts = post.getlist('fromuser_partdiscount')
+
+    service_ids = post.getlist('fromdb_servicename')
+    service_values = post.getlist('fromdb_servicevalue')
+    service_taxes = post.getlist('fromdb_servicetax')
+    service_discounts = post.getlist('fromdb_servicediscount')
+    service_quantities = post.getlist('fromdb_servicequantity')
+
+    user_service_names = post.getlist('fromuser_servicename')
+    user_service_values = post.getlist('fromuser_servicevalue')
+    user_service_taxes = post.getlist('fromuser_servicetax')
+    user_service_discounts = post.getlist('fromuser_servicediscount')
+
+    # One fetch per table for everything referenced by the form
+    parts_queryset = ProductCatalogues.objects.all()
+    if lock_parts:
+        parts_queryset = parts_queryset.select_for_update()
+    parts_by_id = parts_queryset.in_bulk([int(part_id) for part_id in part_ids if part_id])
+    services_by_id = TXNService.objects.in_bulk([int(service_id) for service_id in service_ids if service_id])
+    services_by_name = _get_or_create_services(garage_id, user_service_names, user_service_values,
+                                               user_service_taxes, user_service_discounts, notes)
+
+    parts = []
+    for i, part_id in enumerate(part_ids):
+        if part_id:  # Only insert if part is selected
+            part = parts_by_id.get(int(part_id))
+            parts.append({
+                'part_source': 'inventory',
+                'part_id': part.id if part else None,
+                'part_name': part.name if part else '',
+                'part_value': _decimal(part_values[i]),
+                'part_tax': _decimal(part_taxes[i]),
+                'part_discount': _decimal(part_discounts[i]),
+                'quantity': _quantity(part_quantities, i),
+            })
+    for i, part_name in enumerate(user_part_names):
+        if part_name:
+            parts.append({
+                'part_source': 'external',
+                'part_id': None,
+                'part_name': part_name,
+                'part_value': _decimal(user_part_values[i]),
+                'part_tax': _decimal(user_part_taxes[i]),
+                'part_discount': _decimal(user_part_discounts[i]),
+                'quantity': 1,
+            })
+
+    services = []
+    for i, service_id in enumerate(service_ids):
+        if service_id:  # Only insert if service is selected
+            service = services_by_id.get(int(service_id))
+            services.append({
+                'service_source': 'service',
+                'service_id': service.id if service else None,
+                'service_name': service.name if service else '',
+                'service_value': _decimal(service_values[i]),
+                'service_tax': _decimal(service_taxes[i]),
+                'service_discount': _decimal(service_discounts[i]),
+                'quantity': _quantity(service_quantities, i),
+            })
+    for i, service_name in enumerate(user_service_names):
+        if service_name:
+            service = services_by_name[service_name]
+            services.append({
+                'service_source': 'service',
+                'service_id': service.id,
+                'service_name': service.name,
+                'service_value': _decimal(user_service_values[i]),
+                'service_tax': _decimal(user_service_taxes[i]),
+                'service_discount': _decimal(user_service_discounts[i]),
+                'quantity': 1,
+            })
+
+    return parts, services, parts_by_id
+
+
+def _get_or_create_services(garage_id, names, values, taxes, discounts, notes):
+    wanted = {}
+    for i, name in enumerate(names):
+        if name and name not in wanted:
+            wanted[name] = i
+    if not wanted:
+        return {}
+
+    services_by_name = {}
+    # Keep the first match per name, like the former .first() lookup
+    for service in TXNService.objects.filter(garage_id=garage_id, name__in=wanted).order_by('id'):
+        services_by_name.setdefault(service.name, service)
+
+    missing = [name for name in wanted if name not in services_by_name]
+    if missing:
+        TXNService.objects.bulk_create([
+            TXNService(
+                garage_id=garage_id,
+                name=name,
+                price=_decimal(values[wanted[name]]),
+                gst=_decimal(taxes[wanted[name]]),
+                discount=_decimal(discounts[wanted[name]]),
+                notes=notes,
+            )
+            for name in missing
+        ])
+        # bulk_create does not return primary keys on MySQL
+        for service in TXNService.objects.filter(garage_id=garage_id, name__in=missing).order_by('id'):
+            services_by_name.setdefault(service.name, service)
+    return services_by_name
+
+
+def sync_rows(model, existing_rows, new_rows, fields):
+    """
+    Makes the stored rows match new_rows (unsaved instances), comparing on
+    fields. Identical rows are kept, the rest is removed with one DELETE and
+    added with one bulk_create. Returns the rows that were kept.
+    """
+    def key(row):
+        return tuple(getattr(row, field) for field in fields)
+
+    unmatched = defaultdict(list)
+    for row in new_rows:
+        unmatched[key(row)].append(row)
+
+    kept, stale_ids = [], []
+    for row in existing_rows:
+        bucket = unmatched.get(key(row))
+        if bucket:
+            bucket.pop()
+            kept.append(row)
+        else:
+            stale_ids.append(row.pk)
+
+    added = [row for rows in unmatched.values() for row in rows]
+    if stale_ids:
+        model.objects.filter(pk__in=stale_ids).delete()
+    if added:
+        model.objects.bulk_create(added)
+    return kept
+
+
+def validate_stock(parts, parts_by_id, released=None):
+    """
+    Checks inventory part lines against current stock before anything is
+    written. released maps part id -> quantity given back by the lines being
+    replaced. Returns part id -> change of outward_stock.
+    """
+    released = released or {}
+    required = Counter()
+    for line in parts:
+        if line['part_source'] != 'inventory':
+            continue
+        part = parts_by_id.get(line['part_id'])
+        if part is None:
+            raise ValueError("Selected part does not exist")
+        if line['quantity'] <= 0:
+            raise ValueError(f"Invalid quantity for {part.name} - must be greater than 0")
+        required[part.id] += line['quantity']
+
+    for part_id, quantity in required.items():
+        part = parts_by_id[part_id]
+        available = part.current_stock + released.get(part_id, 0)
+        if available < quantity:
+            raise ValueError(f"Insufficient stock for {part.name}. Available: {available}, Required: {quantity}")
+
+    deltas = {part_id: required.get(part_id, 0) - released.get(part_id, 0) for part_id in set(required) | set(released)}
+    return {part_id: delta for part_id, delta in deltas.items() if delta}
+
+
+def apply_stock_deltas(deltas):
+    """ Adjusts outward_stock of every affected part in a single UPDATE. """
+    if not deltas:
+        return
+    ProductCatalogues.objects.filter(pk__in=deltas).update(
+        outward_stock=F('outward_stock') + Case(
+            *[When(pk=part_id, then=Value(delta)) for part_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def build_stock_outwards(parts, garage_id, reference_document, issued_to, issued_date):
+    """ Unsaved StockOutwards rows for the inventory part lines of an invoice. """
+    return [
+        StockOutwards(
+            garage_id=garage_id,
+            product_id=line['part_id'],
+            quantity=line['quantity'],
+            rate=line['part_value'],
+            discount=line['part_discount'],
+            gst=line['part_tax'],
+            total_price=line['part_value'] * line['quantity'],
+            issued_to=issued_to,
+            issued_date=issued_date,
+            usage_purpose='Invoice',
+            reference_document=reference_document,
+            location='Invoice',
+            rack='Invoice',
+            remarks='Invoice',
+        )
+        for line in parts if line['part_source'] == 'inventory'
+    ]
+
+
+def save_document_lines(part_model, service_model, parent_field, parent, parts, services, update=False):
+    """ Writes the part and service rows of an invoice or estimate, diffing against the stored ones on update. """
+    existing_parts = list(part_model.objects.filter(**{parent_field: parent})) if update else []
+    existing_services = list(service_model.objects.filter(**{parent_field: parent})) if update else []
+    sync_rows(part_model, existing_parts, [part_model(**{parent_field: parent}, **line) for line in parts], PART_FIELDS)
+    sync_rows(service_model, existing_services, [service_model(**{parent_field: parent}, **line) for line in services], SERVICE_FIELDS)
+
+
+def save_invoice_stock(invoice, parts, parts_by_id, garage_id, issued_to, issued_date, update=False):
+    """
+    Validates and books the stock of an invoice's inventory parts: one
+    UPDATE of outward_stock and one bulk write of StockOutwards. On update
+    the quantities of the previous lines are released first.
+    """
+    existing_outwards = list(StockOutwards.objects.filter(
+        garage_id=garage_id,
+        usage_purpose='Invoice',
+        reference_document=invoice.id
+    )) if update else []
+
+    released = Counter()
+    for stock_out in existing_outwards:
+        released[stock_out.product_id] += stock_out.quantity
+
+    deltas = validate_stock(parts, parts_by_id, released)
+    apply_stock_deltas(deltas)
+
+    new_outwards = build_stock_outwards(parts, garage_id, invoice.id, issued_to, issued_date)
+    kept = sync_rows(StockOutwards, existing_outwards, new_outwards, STOCK_OUTWARD_FIELDS)
+
+    # Unchanged lines still follow the invoice's customer and date
+    outdated = [row.pk for row in kept if (row.issued_to, str(row.issued_date)) != (issued_to, str(issued_date))]
+    if outdated:
+        StockOutwards.objects.filter(pk__in=outdated).update(issued_to=issued_to, issued_date=issued_date)
@@ -6,7 +6,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.db import transaction
 from GMSApp.models import TXNService
-from GMSApp.modules import templatespath, managesession, audit
+from GMSApp.modules import templatespath, managesession, audit, bulkdelete
 from datetime import datetime, timedelta
 import logging
 
@@ -108,15 +108,10 @@ def d_txn_services(request, context):
         try:
             with transaction.atomic():
                 service_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in service_ids:
-                    service_obj = TXNService.objects.filter(id=id).first()
-                    if service_obj:
-                        deleted_data.append(service_obj.id) 
-                        service_obj.delete()
+                deleted_count = bulkdelete.bulk_delete(TXNService, service_ids, TXNService.objects.filter(garage_id=context['garage_id']))
 
-                if deleted_data:
-                    msg = f"{len(deleted_data)} services deleted"
+                if deleted_count:
+                    msg = f"{deleted_count} services deleted"
                     sts = True
                 else:
                     msg = "Failed to delete services"
@@ -6,18 +6,17 @@ from datetime import datetime
 from GMSApp.models import AuditLog
 from django.http import JsonResponse
 import logging
-from django.core.paginator import Paginator
 from django.db import transaction
+from GMSApp.modules.keysetpaginator import KeysetPaginator
 
 
 @managesession.check_session_timeout
 def r_auditlog(request, context):  
     if request.method == 'GET':
         auditlog = AuditLog.objects.filter(username=context['useremail'])
-        # Pagination
-        paginator = Paginator(auditlog, 100)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Keyset pagination on the (username, duration) index
+        paginator = KeysetPaginator(auditlog, 100, ordering=('-duration', '-id'))
+        page_obj = paginator.get_page(request.GET.get('cursor'))
         context['auditlog'] =  page_obj
         # calling functions
         audit.create_audit_log(context['useremail'], f'USER: {context["useremail"]}, {request.method}: {request.path}', 'auditlog', 200)
@@ -30,15 +29,10 @@ def d_auditlog(request, context):
         try:
             with transaction.atomic():
                 product_ids = request.POST.getlist('id[]')
-                deleted_data = []
-                for id in product_ids:
-                    auditlog = AuditLog.objects.filter(pk=id).first()
-                    if auditlog:
-                        deleted_data.append(auditlog.id) 
-                        auditlog.delete()
+                deleted_count, _ = AuditLog.objects.filter(pk__in=product_ids).delete()
 
-                if deleted_data:
-                    msg = f"{len(deleted_data)} auditlog  deleted"
+                if deleted_count:
+                    msg = f"{deleted_count} auditlog  deleted"
                     sts = True
                 else:
                     msg = "Failed to delete auditlog"
@@ -1,6 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.core.exceptions import ValidationError
-from GMSApp.modules import templatespath, encryption_util, managesession, audit
+from GMSApp.modules import templatespath, encryption_util, managesession, audit, bulkdelete
 from django.contrib import messages
 from django.http import JsonResponse
 from GMSApp.models import Users, Roles, Garage, GarageGroup, RelGarageGarageGroup, RelGarageUser, City, RelCityUser
@@ -9,7 +9,7 @@ from django.utils import timezone
 import logging, json
 from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
-from django.core.paginator import Paginator
+from GMSApp.modules.keysetpaginator import KeysetPaginator
 from django.views.decorators.http import require_GET
 
 @require_GET
@@ -54,10 +54,8 @@ def r_users(request, context):
         user_objs = Users.objects.filter(**filter_users_data)
 
         # Pagination
-        paginator = Paginator(user_objs, 100)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        context['users'] = page_obj
+        paginator = KeysetPaginator(user_objs, 100, params=request.GET)
+        context['users'] = paginator.get_page(request.GET.get('cursor'))
 
         # calling functions
         audit.create_audit_log(context['useremail'], f'USER: {context["useremail"]}, {request.method}: {request.path}', 'users', 200)
@@ -365,22 +363,13 @@ def d_users(request, context):
                 product_ids = request.POST.getlist('id[]')
                 if not product_ids:
                     return JsonResponse({'status': False, 'message': 'No user IDs provided.'})
-                success_count = 0
-                failure_count = 0
-                errormsg = []
-                for user_id in product_ids:
-                    user_obj = get_object_or_404(Users, id=user_id)
-                    if user_obj:
-                        try:
-                            # Delete the user record
-                            user_obj.delete()
-                            success_count += 1
-                        except (ValidationError, Exception) as e:
-                            # Determine error message based on exception type
-                            error_msg = ', '.join(e.messages) if isinstance(e, ValidationError) else str(e)
-                            errormsg.append(error_msg)
-                            failure_count += 1
-                            logging.getLogger(__name__).error(f"Exception: {request.path}: {error_msg}")
+                # Only the users this account can list
+                user_objs = Users.objects.all()
+                if context['usertype'] != 'admin' and context.get('garagegroup_id'):
+                    user_objs = user_objs.filter(garagegroup_id=context['garagegroup_id'])
+                success_count, blocked = bulkdelete.delete_unblocked(Users, product_ids, user_objs)
+                failure_count = len(blocked)
+                errormsg = [bulkdelete.blocked_message(blocked)] if blocked else []
                 # Show Messages
                 if errormsg:
                     msg = f"Users deleted: {success_count} success, {failure_count} failed. {', '.join(errormsg)}"
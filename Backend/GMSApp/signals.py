@@ -0,0 +1,50 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from GMSApp.models import (
+    AccessModules, AccessPermissions, AccessSubmodules, Garage, GarageBanner, GarageService, RelGarageService,
+    RelGarageServiceCategory, RelGarageVehicleType, RolesPermissions, ServiceCategory, VehicleType,
+)
+from GMSApp.modules.acl import acls
+from GMSApp.modules.api.customerUI.garage import citysnapshot, garagedetail
+from GMSApp.modules.api.customerUI.sync import catalogsync
+from GMSApp.modules.api.utils import catalog
+
+
+# Compiled role ACLs are invalidated whenever a role permission or an access table changes
+for model in (RolesPermissions, AccessModules, AccessSubmodules, AccessPermissions):
+    post_save.connect(acls.bump_acl_version, sender=model, dispatch_uid=f'acl_version_save_{model.__name__}')
+    post_delete.connect(acls.bump_acl_version, sender=model, dispatch_uid=f'acl_version_delete_{model.__name__}')
+
+
+# City garage snapshots of the customer garage list
+pre_save.connect(citysnapshot.remember_garage_city, sender=Garage, dispatch_uid='city_snapshot_garage_pre_save')
+post_save.connect(citysnapshot.garage_changed, sender=Garage, dispatch_uid='city_snapshot_garage_save')
+post_delete.connect(citysnapshot.garage_changed, sender=Garage, dispatch_uid='city_snapshot_garage_delete')
+for model in (RelGarageVehicleType, RelGarageServiceCategory):
+    post_save.connect(citysnapshot.garage_relation_changed, sender=model, dispatch_uid=f'city_snapshot_save_{model.__name__}')
+    post_delete.connect(citysnapshot.garage_relation_changed, sender=model, dispatch_uid=f'city_snapshot_delete_{model.__name__}')
+post_save.connect(citysnapshot.vehicle_type_changed, sender=VehicleType, dispatch_uid='city_snapshot_vehicletype_save')
+post_delete.connect(citysnapshot.vehicle_type_changed, sender=VehicleType, dispatch_uid='city_snapshot_vehicletype_delete')
+
+
+# Cached garage detail documents of the FetchGarage API
+post_save.connect(garagedetail.garage_changed, sender=Garage, dispatch_uid='garage_detail_garage_save')
+post_delete.connect(garagedetail.garage_changed, sender=Garage, dispatch_uid='garage_detail_garage_delete')
+for model in (RelGarageService, GarageBanner, RelGarageServiceCategory):
+    post_save.connect(garagedetail.garage_relation_changed, sender=model, dispatch_uid=f'garage_detail_save_{model.__name__}')
+    post_delete.connect(garagedetail.garage_relation_changed, sender=model, dispatch_uid=f'garage_detail_delete_{model.__name__}')
+post_save.connect(garagedetail.garage_service_changed, sender=GarageService, dispatch_uid='garage_detail_service_save')
+post_delete.connect(garagedetail.garage_service_changed, sender=GarageService, dispatch_uid='garage_detail_service_delete')
+post_save.connect(garagedetail.service_category_changed, sender=ServiceCategory, dispatch_uid='garage_detail_servicecategory_save')
+post_delete.connect(garagedetail.service_category_changed, sender=ServiceCategory, dispatch_uid='garage_detail_servicecategory_delete')
+
+
+# Catalog versions of the customer app's brand, model, city and accessory endpoints
+for model in catalog.CATALOG_SOURCES:
+    post_save.connect(catalog.catalog_changed, sender=model, dispatch_uid=f'catalog_version_save_{model.__name__}')
+    post_delete.connect(catalog.catalog_changed, sender=model, dispatch_uid=f'catalog_version_delete_{model.__name__}')
+
+
+# Tombstones of deleted catalog rows for the delta sync API
+for model in catalogsync.SYNC_SOURCES:
+    post_delete.connect(catalogsync.record_tombstone, sender=model, dispatch_uid=f'sync_tombstone_{model.__name__}')
@@ -1,3 +1,205 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db.models import CASCADE
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from GMSApp.models import (
+    BookingStatus, BookingTimeline, Brand, CC, City, Customer, Garage, Jobcard, JobcardCustomerVoice,
+    JobcardPayment, Model, PendingFileDeletion, Roles, Subscriber, SubscriberAddress, SubscriberBooking,
+    SubscriberVehicle, Users, Vehicle,
+)
+from GMSApp.modules import bulkdelete
+from GMSApp.modules.keysetpaginator import LAST, KeysetPaginator, count_by
+from GMSApp.modules.api.customerUI.subscriber.booking import SubscriberBookingAPI
+
+
+def create_garage(city, name='Test garage'):
+    return Garage.objects.create(
+        city=city, name=name, contact_person='Test', phone='9000000000', email='test@example.com',
+        address='Test road', state='Maharashtra', postal_code='411001', location='Test', terms_and_conditions='',
+    )
+
+
+class SubscriberBookingQueryTests(TestCase):
+    """ Query counts of the subscriber booking API, whatever the number of bookings. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.city = City.objects.create(name='Test city', status='active')
+        model = Model.objects.create(
+            brand=Brand.objects.create(name='Test brand', status='active'),
+            cc=CC.objects.create(name='Test cc', from_value=100, to_value=150, status='active'),
+            name='Test model', status='active',
+        )
+        cls.garage = create_garage(cls.city)
+        cls.subscriber = Subscriber.objects.create(phone='+910000000000', name='Test')
+        cls.vehicle = SubscriberVehicle.objects.create(subscriber=cls.subscriber, model=model)
+        cls.address = SubscriberAddress.objects.create(
+            subscriber=cls.subscriber, city=cls.city, address='Test road', pincode='411001',
+        )
+        BookingStatus.objects.create(name='booking_confirmed', displayname='Booking confirmed')
+        statuses = [
+            BookingStatus.objects.create(name=f'test-status-{i}', displayname=f'Test status {i}') for i in range(4)
+        ]
+        cls.bookings = [
+            SubscriberBooking.objects.create(
+                subscriber=cls.subscriber, subscribervehicle=cls.vehicle, subscriberaddress=cls.address,
+                garage=cls.garage, booking_date=timezone.now().date() + timedelta(days=i), booking_slot='10:00-11:00',
+            )
+            for i in range(20)
+        ]
+        BookingTimeline.objects.bulk_create([
+            BookingTimeline(booking=booking, status=booking_status)
+            for booking in cls.bookings for booking_status in statuses
+        ])
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = SubscriberBookingAPI.as_view()
+
+    def test_list(self):
+        # The bookings, then their timelines with the statuses
+        with self.assertNumQueries(2):
+            response = self.view(self.factory.get('/', {'subscriber_id': self.subscriber.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), len(self.bookings))
+        self.assertEqual(len(response.data['data'][0]['timeline']), 4)
+
+    def test_detail(self):
+        with self.assertNumQueries(2):
+            response = self.view(self.factory.get('/', {'booking_id': self.bookings[0].id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']['timeline']), 4)
+
+    def test_create(self):
+        data = {
+            'subscriberid': self.subscriber.id, 'subscribervehicleid': self.vehicle.id,
+            'subscriberaddressid': self.address.id, 'garageid': self.garage.id,
+            'bookingdate': (timezone.now().date() + timedelta(days=60)).isoformat(),
+            'bookingslot': '10:00-11:00', 'bookingamount': '500',
+        }
+        # Validation, the booking and its first timeline entry, the booking again with its
+        # related rows, then the customer, vehicle brand, model and vehicle get_or_create
+        with self.assertNumQueries(30):
+            response = self.view(self.factory.post('/', data, format='json'))
+        self.assertEqual(response.status_code, 201, response.data)
+        booking = SubscriberBooking.objects.get(id=response.data['data']['id'])
+        self.assertEqual(booking.customer, Customer.objects.get(garage=self.garage, phone=self.subscriber.phone))
+        self.assertEqual(booking.vehicle, Vehicle.objects.get(customer=booking.customer))
+        self.assertEqual(response.data['data']['current_status']['status'], 'booking_confirmed')
+
+
+class BulkDeleteTests(TestCase):
+    """ The multi-select delete: a fixed number of queries, and associated rows reported, not cascaded. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.garage = create_garage(City.objects.create(name='Test city', status='active'))
+        cls.customer = Customer.objects.create(garage=cls.garage, name='Test', phone='9000000000')
+        Vehicle.objects.create(customer=cls.customer, model='Test model')
+        cls.user = Users.objects.create(
+            name='Test', email='test@example.com', password='-', status='active', usertype='business',
+            roles=Roles.objects.create(name='Test role'),
+        )
+        Jobcard.objects.bulk_create([
+            Jobcard(garage=cls.garage, jobcard_number=f'TEST-{i}', mode='offline', created_by=cls.user,
+                    damagephotos=[f'custom-assets/damage_photos/test-{i}/1.jpg'])
+            for i in range(50)
+        ])
+        # Read back, as bulk_create() does not set the ids on MySQL
+        cls.jobcards = list(Jobcard.objects.filter(garage=cls.garage))
+        JobcardCustomerVoice.objects.bulk_create([
+            JobcardCustomerVoice(jobcard=jobcard, customer_voice='Test') for jobcard in cls.jobcards
+        ])
+        JobcardPayment.objects.bulk_create([
+            JobcardPayment(jobcard=jobcard, payment_date=timezone.now().date(), amount=1, payment_mode='cash')
+            for jobcard in cls.jobcards
+        ])
+
+    def test_cascading_relations_block_the_delete(self):
+        # A CASCADE relation missing from the rules would silently delete its rows
+        for model in (Users, Garage):
+            listed = {accessor for accessor, _ in bulkdelete.BULK_DELETE_RULES[model]['associations']}
+            for relation in model._meta.related_objects:
+                if relation.on_delete is CASCADE:
+                    self.assertIn(relation.get_accessor_name(), listed, model.__name__)
+
+    def test_jobcards(self):
+        ids = [str(jobcard.id) for jobcard in self.jobcards]
+        # The savepoint, the rows and their files, the job cards again for the cascade
+        # and the nine child tables, the job cards, the file queue, then the release
+        with self.assertNumQueries(15):
+            deleted = bulkdelete.bulk_delete(Jobcard, ids, Jobcard.objects.filter(garage=self.garage))
+        self.assertEqual(deleted, len(ids))
+        self.assertEqual(PendingFileDeletion.objects.count(), len(ids))
+
+    def test_other_garage(self):
+        other = create_garage(self.garage.city, name='Other garage')
+        deleted = bulkdelete.bulk_delete(Jobcard, [self.jobcards[0].id], Jobcard.objects.filter(garage=other))
+        self.assertEqual(deleted, 0)
+        self.assertTrue(Jobcard.objects.filter(id=self.jobcards[0].id).exists())
+
+    def test_customer_in_use(self):
+        # The savepoint, the rows, one query per association, then the rollback and release
+        queries = 4 + len(bulkdelete.BULK_DELETE_RULES[Customer]['associations'])
+        with self.assertNumQueries(queries), self.assertRaises(ValidationError) as raised:
+            bulkdelete.bulk_delete(Customer, [self.customer.id])
+        self.assertIn(f'ID {self.customer.id}: vehicle', raised.exception.messages[0])
+        self.assertTrue(Customer.objects.filter(id=self.customer.id).exists())
+
+    def test_user_with_jobcards(self):
+        deleted, blocked = bulkdelete.delete_unblocked(Users, [self.user.id])
+        self.assertEqual(deleted, 0)
+        self.assertEqual(blocked, {self.user.id: ['jobcard']})
+        self.assertEqual(Jobcard.objects.filter(created_by=self.user).count(), len(self.jobcards))
+
+
+class KeysetListTests(TestCase):
+    """ The list views' pages: one query each, without OFFSET, every row once and in order. """
+
+    @classmethod
+    def setUpTestData(cls):
+        garage = create_garage(City.objects.create(name='Test city', status='active'))
+        Jobcard.objects.bulk_create([
+            Jobcard(garage=garage, jobcard_number=f'TEST-{i}', mode='offline',
+                    status='closed' if i % 3 == 0 else 'open', pending_total=i % 7)
+            for i in range(250)
+        ])
+        cls.jobcards = Jobcard.objects.filter(garage=garage)
+        # Two distinct created_at values, so the id tie-breaker is exercised
+        created_at = timezone.now()
+        cls.jobcards.filter(status='open').update(created_at=created_at)
+        cls.jobcards.filter(status='closed').update(created_at=created_at - timedelta(days=1))
+
+    def walk(self, paginator, backwards=False):
+        """ Follows the next (or previous, from 'last') cursors; returns the ids of every page. """
+        seen = []
+        cursor = LAST if backwards else None
+        while True:
+            with self.assertNumQueries(1) as queries:
+                page = paginator.get_page(cursor)
+            self.assertNotIn(' OFFSET ', queries.captured_queries[0]['sql'].upper())
+            ids = [obj.id for obj in page]
+            seen = ids + seen if backwards else seen + ids
+            cursor = page.previous_cursor if backwards else page.next_cursor
+            if not cursor:
+                return seen
+
+    def test_status_counts(self):
+        with self.assertNumQueries(1):
+            counts = count_by(self.jobcards, 'status', ['open', 'closed'])
+        self.assertEqual(counts, {
+            'total': self.jobcards.count(),
+            'open': self.jobcards.filter(status='open').count(),
+            'closed': self.jobcards.filter(status='closed').count(),
+        })
 
-# Create your tests here.
+    def test_pages(self):
+        for jobcards in (self.jobcards, self.jobcards.filter(pending_total__gt=0)):
+            expected = list(jobcards.order_by('-created_at', '-id').values_list('id', flat=True))
+            paginator = KeysetPaginator(jobcards, 30)
+            self.assertEqual(self.walk(paginator), expected)
+            self.assertEqual(self.walk(paginator, backwards=True), expected)
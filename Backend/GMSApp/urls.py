@@ -13,6 +13,7 @@ from GMSApp.modules.api.customerUI.garage.listmodel import ModelListAPIView
 from GMSApp.modules.api.customerUI.location.listcity import ActiveCityListAPIView
 from GMSApp.modules.api.customerUI.login.sendsms import SendSMSAPI
 from GMSApp.modules.api.customerUI.login.verifyotp import VerifyOTPAPI
+from GMSApp.modules.api.customerUI.sync.catalogsync import CatalogSyncAPIView
 from GMSApp.modules.api.customerUI.subscriber.address import (
     ListSubscriberAddressAPI,
     SubscriberAddressAPI,
@@ -61,6 +62,7 @@ transactions_urls = [
     path('bulk-upload-invoices/', views.bulk_upload_invoices, name='bulk-upload-invoices'),    
     path('track-invoice-uploads/<int:id>/', views.track_invoice_uploads, name='track-invoice-uploads'),
     path('u-bulk-upload-invoices-final-status/', views.u_bulk_upload_invoices_final_status, name='u-bulk-upload-invoices-final-status'),
+    path('r-background-job/<int:id>/', views.r_background_job, name='r-background-job'),
     path('u-txn-invoices/<int:id>/', views.u_txn_invoices, name='u-txn-invoices'),
     path('v-txn-invoices/<int:id>/', views.v_txn_invoices, name='v-txn-invoices'),
     path('u-txn-invoices-status/', views.u_txn_invoices_status, name='u-txn-invoices-status'),
@@ -320,6 +322,7 @@ api_urls = [
     path('api/accessories/', AccessoryListAPIView.as_view(), name='api-accessories-list'),
     path('api/brands/', BrandListAPIView.as_view(), name='api-brands-list'),
     path('api/models/', ModelListAPIView.as_view(), name='api-models-list'),
+    path('api/sync/', CatalogSyncAPIView.as_view(), name='api-catalog-sync'),
     path('api/subscriber/vehicle/', SubscriberVehicleAPI.as_view(), name='api-subscriber-vehicle'),
     path('api/subscriber/vehicle/<int:id>/', SubscriberVehicleAPI.as_view(), name='api-subscriber-vehicle-detail'),
     path('api/subscriber/vehicles/', ListSubscriberVehicleAPI.as_view(), name='api-subscriber-vehicles'),
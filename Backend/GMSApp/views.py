@@ -31,6 +31,8 @@ from GMSApp.modules.users.users import *
 
 from GMSApp.modules.userauditlog import *
 
+from GMSApp.modules.backgroundjobs import *
+
 from GMSApp.modules.transactions.transactions import *
 from GMSApp.modules.transactions.invoices import *
 from GMSApp.modules.transactions.jobsheets.jobsheet import *